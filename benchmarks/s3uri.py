@@ -0,0 +1,85 @@
+'''Micro-benchmark of S3Uri against the urlparse-based implementation it replaced.
+
+Run with: uv run python benchmarks/s3uri.py [--iterations N]
+'''
+import argparse
+import timeit
+import tracemalloc
+from urllib.parse import urlparse
+
+from botobuddy.s3 import S3Uri
+
+
+class LegacyS3Uri:
+    '''The previous S3Uri, which parsed every URI with urlparse and stored all derived fields.'''
+
+    def __init__(self, s3_uri):
+        self.s3_uri = str(s3_uri)
+        self.parsed_uri = urlparse(self.s3_uri)
+        self.bucket = self.parsed_uri.netloc
+        self.path = self.parsed_uri.path.lstrip('/')
+        self.path_list = self.path.split('/')
+        self.filename = self.path_list[-1] if self.path_list else None
+        self.key = self.path
+
+    def parent(self):
+        return LegacyS3Uri(f's3://{self.bucket}/{"/".join(self.path_list[:-1])}')
+
+    def __truediv__(self, other):
+        return LegacyS3Uri(self.s3_uri.rstrip('/') + '/' + str(other))
+
+
+URI = 's3://my-bucket/datasets/2024/01/15/part-00042.parquet'
+
+# Memory is measured over this many joined URIs
+MEMORY_COUNT = 100000
+
+
+def time_operations(cls, iterations: int) -> dict[str, float]:
+    '''Return the mean time in microseconds of constructing, joining and taking the parent of a URI.'''
+    uri = cls(URI)
+    folder = cls('s3://my-bucket/datasets/2024/01/15')
+
+    operations = {
+        'construct': lambda: cls(URI),
+        'join': lambda: folder / 'part-00042.parquet',
+        'parent': uri.parent,
+    }
+
+    # Best of several repeats, as single runs are noisy on shared machines
+    return {
+        name: min(timeit.repeat(operation, number=iterations, repeat=5)) / iterations * 1e6
+        for name, operation in operations.items()
+    }
+
+
+def measure_memory(cls) -> float:
+    '''Return the memory in MiB held by MEMORY_COUNT joined URIs.'''
+    folder = cls('s3://my-bucket/datasets/2024/01/15')
+
+    tracemalloc.start()
+    uris = [folder / f'part-{number:05d}.parquet' for number in range(MEMORY_COUNT)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del uris
+    return size / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200000)
+    args = parser.parse_args()
+
+    results = {cls.__name__: time_operations(cls, args.iterations) for cls in (LegacyS3Uri, S3Uri)}
+
+    for name in results['S3Uri']:
+        legacy, current = results['LegacyS3Uri'][name], results['S3Uri'][name]
+        print(f'{name:<10} {legacy:6.2f} us -> {current:6.2f} us ({legacy / current:.1f}x)')
+
+    legacy, current = measure_memory(LegacyS3Uri), measure_memory(S3Uri)
+    print(f'{MEMORY_COUNT} joined URIs: {legacy:.1f} MiB -> {current:.1f} MiB ({legacy / current:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,641 @@
+'''Asyncio S3 transfer engine.
+
+Requests are signed with botocore's SigV4 signer and sent over a shared aiohttp connection pool, so
+thousands of transfers can be in flight on a single event loop thread. Requires the optional aiohttp
+dependency (pip install botobuddy[async]).
+
+Use it directly from async code:
+
+    async with AsyncS3Client(session_config=config) as client:
+        async for obj in list_all_objects('s3://bucket/prefix/', client=client):
+            ...
+
+        results = await download_files(targets, client=client, concurrency=1000)
+
+or through sync_folder_from_s3(..., engine='asyncio') from sync code.
+'''
+import os
+import time
+import random
+import asyncio
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Callable, Iterable
+from urllib.parse import quote, urlencode, urlsplit
+from xml.etree import ElementTree
+
+from botocore.auth import S3SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from botobuddy.common import get_aws_session
+from botobuddy.logger import logger
+from botobuddy.s3 import RETRY_BASE_DELAY, RETRY_MAX_DELAY, S3Uri, TransferMetrics, get_s3_client, is_transient_error
+
+try:
+    import aiohttp
+    from yarl import URL
+except ImportError as e:
+    raise ImportError('The asyncio S3 engine requires aiohttp, install it with: pip install botobuddy[async]') from e
+
+
+S3_XML_NAMESPACE = '{http://s3.amazonaws.com/doc/2006-03-01/}'
+
+# Size of the chunks read from response bodies and written to local files
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Largest object that can be uploaded with a single PUT
+MAX_PUT_SIZE = 5 * 1024 * 1024 * 1024
+
+
+class AsyncS3Client:
+    '''A minimal S3 client for asyncio, covering listing, downloads and single-request uploads.
+
+    Credentials, region and endpoint are taken from the boto3 session and S3 client built for
+    session_config, so profiles, assumed roles and AWS_ENDPOINT_URL work as with the threaded engine.
+    Refreshable credentials are re-read when they are close to expiry.
+    '''
+
+    def __init__(
+        self,
+        *,
+        session_config: dict | None = None,
+        profile: str | None = None,
+        concurrency: int = 1000,
+        timeout: float = 300,
+        connect_timeout: float = 60
+    ):
+        '''Initialize the client. The HTTP session is opened lazily on the first request.
+
+        Args:
+            session_config: Configuration for the AWS session (profile, region, etc.)
+            profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
+            concurrency: Maximum number of open connections
+            timeout: Timeout in seconds of each socket read, so long transfers only time out when they stall
+            connect_timeout: Timeout in seconds of opening a connection
+        '''
+        if session_config is None:
+            session_config = {}
+
+        session = get_aws_session(session_config, profile=profile)
+        s3_client = get_s3_client(session_config, profile=profile)
+
+        self.credentials = session.get_credentials()
+
+        if self.credentials is None:
+            raise UserWarning('No AWS credentials found')
+
+        self.region = s3_client.meta.region_name or 'us-east-1'
+        self.endpoint = urlsplit(s3_client.meta.endpoint_url)
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+
+        # Sign with UNSIGNED-PAYLOAD, so bodies are streamed instead of hashed up front
+        self._signing_config = Config(s3={'payload_signing_enabled': False})
+        self._bucket_regions = {}
+        self._frozen_credentials = None
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        '''Close the HTTP session and its connections.'''
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+            # No total timeout, it would also cover streaming the body and cut off large transfers
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.connect_timeout, sock_read=self.timeout)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+        return self._session
+
+    async def _get_credentials(self):
+        '''Return frozen credentials, refreshing them only when they are close to expiry.'''
+        refresh_needed = getattr(self.credentials, 'refresh_needed', None)
+
+        if self._frozen_credentials is None or (refresh_needed is not None and refresh_needed()):
+            # Refreshing credentials may call STS or read files, keep it off the event loop
+            self._frozen_credentials = await asyncio.get_running_loop().run_in_executor(
+                None, self.credentials.get_frozen_credentials
+            )
+
+        return self._frozen_credentials
+
+    def _url(self, bucket: str, key: str = '', query: dict | None = None) -> str:
+        region = self._bucket_regions.get(bucket, self.region)
+        host = self.endpoint.netloc
+
+        if host.endswith('.amazonaws.com'):
+            host = f's3.{region}.amazonaws.com'
+
+        # Virtual-hosted style for AWS, path style for dotted bucket names and custom endpoints
+        if host.endswith('.amazonaws.com') and '.' not in bucket:
+            url = f'{self.endpoint.scheme}://{bucket}.{host}/{quote(key, safe="/~")}'
+        else:
+            url = f'{self.endpoint.scheme}://{host}/{bucket}/{quote(key, safe="/~")}'
+
+        if query:
+            url += '?' + urlencode(sorted(query.items()), quote_via=quote, safe='~')
+
+        return url
+
+    async def _request(
+        self,
+        method: str,
+        bucket: str,
+        key: str = '',
+        *,
+        query: dict | None = None,
+        headers: dict | None = None,
+        data=None,
+        operation: str
+    ) -> aiohttp.ClientResponse:
+        '''Send a signed request, returning the response of a successful one.
+
+        The caller must release the response. S3 error responses are raised as botocore ClientErrors,
+        so they can be classified with is_transient_error.
+        '''
+        for _ in range(2):
+            region = self._bucket_regions.get(bucket, self.region)
+            url = self._url(bucket, key, query)
+
+            credentials = await self._get_credentials()
+
+            request = AWSRequest(method=method, url=url, headers=headers or {})
+            request.context['client_config'] = self._signing_config
+            S3SigV4Auth(credentials, 's3', region).add_auth(request)
+
+            response = await self._get_session().request(
+                method, URL(url, encoded=True), headers=dict(request.headers.items()), data=data,
+                allow_redirects=False
+            )
+
+            if response.status < 300:
+                return response
+
+            body = await response.read()
+            response.release()
+
+            # The bucket lives in another region, retry once against it
+            bucket_region = response.headers.get('x-amz-bucket-region')
+
+            if response.status in (301, 400) and bucket_region and bucket_region != region and data is None:
+                logger.debug(f'Bucket {bucket} is in {bucket_region}, redirecting')
+                self._bucket_regions[bucket] = bucket_region
+                continue
+
+            raise _client_error(response, body, operation)
+
+        raise _client_error(response, body, operation)
+
+    async def list_objects(self, bucket: str, prefix: str = '') -> AsyncIterator[dict]:
+        '''List the objects under a prefix with ListObjectsV2.
+
+        Args:
+            bucket: The name of the bucket.
+            prefix: The key prefix to list.
+
+        Yields:
+            dict: Objects shaped like boto3's: {'Key', 'Size', 'ETag', 'LastModified', 'StorageClass'}
+        '''
+        query = {'list-type': '2', 'prefix': prefix}
+
+        while True:
+            response = await self._request('GET', bucket, query=query, operation='ListObjectsV2')
+
+            try:
+                root = ElementTree.fromstring(await response.read())
+            finally:
+                response.release()
+
+            for item in root.iter(f'{S3_XML_NAMESPACE}Contents'):
+                yield {
+                    'Key': item.findtext(f'{S3_XML_NAMESPACE}Key'),
+                    'Size': int(item.findtext(f'{S3_XML_NAMESPACE}Size', '0')),
+                    'ETag': item.findtext(f'{S3_XML_NAMESPACE}ETag'),
+                    'LastModified': datetime.fromisoformat(item.findtext(f'{S3_XML_NAMESPACE}LastModified')),
+                    'StorageClass': item.findtext(f'{S3_XML_NAMESPACE}StorageClass'),
+                }
+
+            token = root.findtext(f'{S3_XML_NAMESPACE}NextContinuationToken')
+
+            if root.findtext(f'{S3_XML_NAMESPACE}IsTruncated') != 'true' or not token:
+                return
+
+            query = {**query, 'continuation-token': token}
+
+    async def download_file(
+        self, bucket: str, key: str, local_path: str | Path, callback: Callable[[int], None] | None = None
+    ) -> int:
+        '''Download an object, streaming it to a temporary file which is renamed into place.
+
+        Args:
+            bucket: The name of the bucket.
+            key: The key of the object.
+            local_path: The destination path.
+            callback: Optional callback invoked with the size of each chunk written.
+
+        Returns:
+            int: The number of bytes downloaded.
+        '''
+        local_path = Path(local_path)
+        response = await self._request('GET', bucket, key, operation='GetObject')
+        size = 0
+
+        # File system calls can block for a long time on slow or network disks, keep them off the event loop
+        try:
+            fd, temp_path = await asyncio.to_thread(
+                tempfile.mkstemp, dir=local_path.parent, prefix=f'.{local_path.name}.', suffix='.tmp'
+            )
+        except BaseException:
+            response.release()
+            raise
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    await asyncio.to_thread(f.write, chunk)
+                    size += len(chunk)
+
+                    if callback:
+                        callback(len(chunk))
+
+            await asyncio.to_thread(os.replace, temp_path, local_path)
+        except BaseException:
+            await asyncio.shield(asyncio.to_thread(Path(temp_path).unlink, missing_ok=True))
+            raise
+        finally:
+            response.release()
+
+        return size
+
+    async def upload_file(self, local_path: str | Path, bucket: str, key: str) -> int:
+        '''Upload a file with a single PUT request, streaming it from disk.
+
+        Args:
+            local_path: The file to upload.
+            bucket: The name of the bucket.
+            key: The key of the object.
+
+        Returns:
+            int: The number of bytes uploaded.
+
+        Raises:
+            UserWarning: If the file is larger than a single PUT allows.
+        '''
+        local_path = Path(local_path)
+        size = local_path.stat().st_size
+
+        if size > MAX_PUT_SIZE:
+            raise UserWarning(f'{local_path} is too large for the asyncio engine, use the threads engine instead')
+
+        with local_path.open('rb') as f:
+            response = await self._request(
+                'PUT', bucket, key, headers={'Content-Length': str(size)}, data=f, operation='PutObject'
+            )
+            response.release()
+
+        return size
+
+
+def _client_error(response: aiohttp.ClientResponse, body: bytes, operation: str) -> ClientError:
+    code, message = str(response.status), response.reason or ''
+
+    try:
+        root = ElementTree.fromstring(body)
+        code = root.findtext('Code', code)
+        message = root.findtext('Message', message)
+    except ElementTree.ParseError:
+        pass
+
+    error_response = {
+        'Error': {'Code': code, 'Message': message},
+        'ResponseMetadata': {'HTTPStatusCode': response.status, 'HTTPHeaders': dict(response.headers)}
+    }
+
+    return ClientError(error_response, operation)  # type: ignore[arg-type]
+
+
+def is_transient_async_error(error: BaseException | None) -> bool:
+    '''Check whether an asyncio engine error is worth retrying.
+
+    Args:
+        error: The exception raised by the transfer.
+
+    Returns:
+        bool: True for throttling, server-side, network errors and timeouts.
+    '''
+    return is_transient_error(error) or isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+async def _aiter(items: Iterable) -> AsyncIterator:
+    '''Iterate a sync iterable without blocking the event loop, e.g. a generator fed by a boto3 listing.'''
+    iterator = iter(items)
+    done = object()
+
+    while (item := await asyncio.to_thread(next, iterator, done)) is not done:
+        yield item
+
+
+async def _run_bounded(fn: Callable, items, max_in_flight: int) -> AsyncIterator[asyncio.Task]:
+    '''Run fn(*item) for each item with at most max_in_flight tasks, yielding tasks as they complete.
+
+    Like utils.submit_bounded, items are pulled lazily, so a long listing is never materialized.
+    '''
+    if not hasattr(items, '__aiter__'):
+        items = _aiter(items)
+
+    in_flight = set()
+    exhausted = False
+
+    while True:
+        while not exhausted and len(in_flight) < max_in_flight:
+            try:
+                item = await anext(items)
+            except StopAsyncIteration:
+                exhausted = True
+                break
+
+            in_flight.add(asyncio.create_task(fn(*item)))
+
+        if not in_flight:
+            return
+
+        done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+
+        for task in done:
+            yield task
+
+
+async def list_all_objects(
+    s3_path: str | S3Uri,
+    *,
+    client: AsyncS3Client | None = None,
+    session_config: dict | None = None,
+    profile: str | None = None
+) -> AsyncIterator[dict]:
+    '''List all objects under an S3 path.
+
+    Args:
+        s3_path: The S3 path or S3Uri to list.
+        client: Optional AsyncS3Client, one is created and closed if not given.
+        session_config: Configuration for the AWS session.
+        profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
+
+    Yields:
+        dict: The listed objects, shaped like boto3's.
+    '''
+    s3_uri = S3Uri(s3_path)
+    own_client = client is None
+    client = client or AsyncS3Client(session_config=session_config, profile=profile)
+
+    try:
+        async for obj in client.list_objects(s3_uri.bucket, s3_uri.path):
+            yield obj
+    finally:
+        if own_client:
+            await client.close()
+
+
+async def download_files(
+    targets: Iterable[tuple] | AsyncIterator[tuple],
+    *,
+    client: AsyncS3Client | None = None,
+    skip_existing: bool = False,
+    create_folders: bool = True,
+    concurrency: int = 1000,
+    session_config: dict | None = None,
+    profile: str | None = None,
+    on_complete: Callable[[str, str, Path], None] | None = None,
+    metrics: TransferMetrics | None = None,
+    max_retries: int = 3
+) -> dict:
+    '''Download a list of files from S3 concurrently on the event loop.
+
+    The asyncio counterpart of s3.fast_download_s3_files: targets are consumed lazily, a failed
+    download does not abort the others, and transient errors are retried after each pass with
+    jittered exponential backoff. Objects are always downloaded with a single GET.
+
+    Args:
+        targets: Iterable or async iterable of tuples containing (bucket, key, local_path) or
+            (bucket, key, local_path, size). Sync iterables are advanced in a worker thread.
+        client: Optional AsyncS3Client, one is created and closed if not given.
+        skip_existing: Skip files that already exist locally
+        create_folders: Create the folders for the files
+        concurrency: Number of concurrent downloads
+        session_config: Configuration for the AWS session (profile, region, etc.)
+        profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
+        on_complete: Optional callback invoked with (bucket, key, local_path) on the event loop
+            after each successful download
+        metrics: Optional collector of per-object transfer metrics
+        max_retries: Number of retries for transient errors
+
+    Returns:
+        dict: A summary of the downloads, listing the failed targets:
+
+        {
+            'succeeded': int,
+            'skipped': int,
+            'failed': [{'bucket': str, 'key': str, 'local_path': Path, 'error': str}]
+        }
+    '''
+    own_client = client is None
+    client = client or AsyncS3Client(session_config=session_config, profile=profile, concurrency=concurrency)
+    folders = set()
+
+    logger.debug(f'Async downloading files with concurrency {concurrency}')
+
+    async def download_file(bucket_name, key, local_path, attempt):
+        if skip_existing and local_path.exists():
+            logger.debug(f'Skipping {key} because it already exists')
+            return 'skipped'
+
+        if create_folders and local_path.parent not in folders:
+            local_path.parent.mkdir(parents=True, exist_ok=True)
+            folders.add(local_path.parent)
+
+        started = time.monotonic()
+        first_byte_latency = None
+
+        def callback(count):
+            nonlocal first_byte_latency
+
+            if first_byte_latency is None:
+                first_byte_latency = time.monotonic() - started
+
+            if metrics:
+                metrics.add_bytes(count)
+
+        size = await client.download_file(bucket_name, key, local_path, callback)
+
+        if metrics:
+            metrics.record(key, size, time.monotonic() - started, attempt, first_byte_latency)
+
+        if on_complete:
+            on_complete(bucket_name, key, local_path)
+
+        logger.debug(f'Successfully downloaded {key}')
+        return 'succeeded'
+
+    async def items():
+        source = targets if hasattr(targets, '__aiter__') else _aiter(targets)
+
+        async for target in source:
+            yield (target[0], target[1], Path(target[2]))
+
+    results = {'succeeded': 0, 'skipped': 0, 'failed': []}
+
+    try:
+        async for (bucket_name, key, local_path), status, error in _transfer_with_retries(
+            download_file, items(), concurrency, max_retries, 'download'
+        ):
+            if status == 'failed':
+                logger.warning(f'Failed to download {key}: {error}')
+                results['failed'].append(
+                    {'bucket': bucket_name, 'key': key, 'local_path': local_path, 'error': str(error)}
+                )
+            else:
+                results[status] += 1
+    finally:
+        if own_client:
+            await client.close()
+
+    return results
+
+
+async def _transfer_with_retries(
+    transfer: Callable, items: AsyncIterator[tuple], concurrency: int, max_retries: int, action: str
+) -> AsyncIterator[tuple]:
+    '''Run transfer(*item, attempt) for each item, retrying transient errors after each pass.
+
+    Failures do not abort the other transfers. Retries are spread out with jittered exponential
+    backoff between passes, and with a random delay within a pass.
+
+    Yields:
+        tuple: (item, status, error) for each item once it succeeded, was skipped or finally failed,
+        where status is the value returned by transfer, or 'failed'.
+    '''
+    async def run(*args):
+        *item, attempt = args
+
+        if attempt > 0:
+            # Spread retries out so they do not hit S3 in lockstep
+            await asyncio.sleep(random.uniform(0, RETRY_BASE_DELAY))
+
+        try:
+            return tuple(item), attempt, await transfer(*item, attempt), None
+        except Exception as e:
+            return tuple(item), attempt, 'failed', e
+
+    async def first_pass():
+        async for item in items:
+            yield (*item, 0)
+
+    pending = first_pass()
+    attempt = 0
+
+    while True:
+        retry_queue = []
+
+        async for task in _run_bounded(run, pending, concurrency):
+            item, item_attempt, status, error = task.result()
+
+            if status == 'failed' and item_attempt < max_retries and is_transient_async_error(error):
+                logger.debug(f'Transient error during {action} of {item}, queued for retry: {error}')
+                retry_queue.append((*item, item_attempt + 1))
+            else:
+                yield item, status, error
+
+        if not retry_queue:
+            return
+
+        attempt += 1
+        delay = min(RETRY_BASE_DELAY * 2 ** attempt, RETRY_MAX_DELAY) * random.uniform(0.5, 1.5)
+        logger.info(f'Retrying {len(retry_queue)} failed transfers in {delay:.1f}s (attempt {attempt})')
+        await asyncio.sleep(delay)
+        pending = _aiter(retry_queue)
+
+
+async def upload_files(
+    targets: Iterable[tuple] | AsyncIterator[tuple],
+    *,
+    client: AsyncS3Client | None = None,
+    concurrency: int = 1000,
+    session_config: dict | None = None,
+    profile: str | None = None,
+    on_complete: Callable[[Path, str, str], None] | None = None,
+    max_retries: int = 3
+) -> dict:
+    '''Upload a list of files to S3 concurrently on the event loop.
+
+    The asyncio counterpart of s3.fast_upload_s3_files. Like download_files, a failed upload does not
+    abort the others, and transient errors (e.g. SlowDown) are retried with jittered exponential backoff.
+    Each file is uploaded with a single PUT, so files larger than 5 GB must go through the threads engine.
+
+    Args:
+        targets: Iterable or async iterable of tuples containing (local_path, bucket, key)
+        client: Optional AsyncS3Client, one is created and closed if not given.
+        concurrency: Number of concurrent uploads
+        session_config: Configuration for the AWS session (profile, region, etc.)
+        profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
+        on_complete: Optional callback invoked with (local_path, bucket, key) on the event loop
+            after each successful upload
+        max_retries: Number of retries for transient errors
+
+    Returns:
+        dict: A summary of the uploads, listing the failed targets:
+
+        {
+            'succeeded': int,
+            'failed': [{'local_path': Path, 'bucket': str, 'key': str, 'error': str}]
+        }
+    '''
+    own_client = client is None
+    client = client or AsyncS3Client(session_config=session_config, profile=profile, concurrency=concurrency)
+
+    logger.debug(f'Async uploading files with concurrency {concurrency}')
+
+    async def upload_file(local_path, bucket_name, key, attempt):
+        await client.upload_file(local_path, bucket_name, key)
+
+        if on_complete:
+            on_complete(local_path, bucket_name, key)
+
+        logger.debug(f'Successfully uploaded {key}')
+        return 'succeeded'
+
+    async def items():
+        source = targets if hasattr(targets, '__aiter__') else _aiter(targets)
+
+        async for target in source:
+            yield (Path(target[0]), target[1], target[2])
+
+    results = {'succeeded': 0, 'failed': []}
+
+    try:
+        async for (local_path, bucket_name, key), status, error in _transfer_with_retries(
+            upload_file, items(), concurrency, max_retries, 'upload'
+        ):
+            if status == 'failed':
+                logger.warning(f'Failed to upload {key}: {error}')
+                results['failed'].append(
+                    {'local_path': local_path, 'bucket': bucket_name, 'key': key, 'error': str(error)}
+                )
+            else:
+                results[status] += 1
+    finally:
+        if own_client:
+            await client.close()
+
+    return results
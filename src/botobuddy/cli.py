@@ -6,6 +6,7 @@ import click
 from botocore.exceptions import TokenRetrievalError
 
 from botobuddy.logger import setup_logging, logger
+from botobuddy.s3cache import ObjectCache, set_object_cache
 import botobuddy.s3 as s3
 import botobuddy.dynamo as dynamo
 import botobuddy.route53 as route53
@@ -19,17 +20,24 @@ import botobuddy.sagemaker as sagemaker
 @click.option('--profile', help='AWS profile name to use')
 @click.option('--region', help='AWS region to use')
 @click.option('--assume-role', help='AWS role ARN to assume')
+@click.option('--credential-cache', is_flag=True, help='Cache assumed role credentials on disk between invocations')
+@click.option('--s3-cache', is_flag=True, help='Cache downloaded S3 objects on disk, shared between runs and projects')
 @click.version_option(version=version('botobuddy'))
 @click.pass_context
-def cli(ctx, verbose, **kwargs):
+def cli(ctx, verbose, s3_cache, **kwargs):
     """Extended AWS Operations CLI.
 
     Args:
         ctx: The Click context.
         verbose: Whether to enable verbose (debug) logging.
+        s3_cache: Whether to use the local S3 object cache for downloads.
         **kwargs: Additional session configuration options (profile, region, etc.).
     """
     setup_logging(verbose)
+
+    if s3_cache:
+        set_object_cache(ObjectCache())
+
     ctx.ensure_object(dict)
     ctx.obj.update(kwargs)
 
@@ -1,12 +1,104 @@
+import json
+import threading
+from collections import OrderedDict
 from typing import Any
 
 import boto3
+import botocore.session
 from botocore.config import Config
+from botocore.credentials import AssumeRoleCredentialFetcher, DeferredRefreshableCredentials
+from botocore.utils import JSONFileCache
 
 from botobuddy.logger import logger
 
 
-def get_aws_session(session_config: dict | None = None, profile: str | None = None) -> boto3.Session:
+# Upper bound for each of the session and client caches; least recently used entries are evicted first
+AWS_CACHE_MAX_SIZE = 32
+
+_cache_lock = threading.RLock()
+_session_cache: OrderedDict[tuple, boto3.Session] = OrderedDict()
+_client_cache: OrderedDict[tuple, Any] = OrderedDict()
+
+
+def _session_cache_key(session_config: dict, profile: str | None) -> tuple:
+    """Build the cache key identifying a session from the relevant session_config fields."""
+    return (
+        profile or session_config.get('profile'),
+        session_config.get('region'),
+        session_config.get('assume_role'),
+        session_config.get('session_name'),
+        session_config.get('credential_cache'),
+    )
+
+
+def _cache_get(cache: OrderedDict, key: tuple) -> Any:
+    """Return a cached entry and mark it as most recently used, or None if missing."""
+    value = cache.get(key)
+
+    if value is not None:
+        cache.move_to_end(key)
+
+    return value
+
+
+def _cache_put(cache: OrderedDict, key: tuple, value: Any):
+    """Store an entry in the cache, evicting the least recently used ones above AWS_CACHE_MAX_SIZE."""
+    cache[key] = value
+    cache.move_to_end(key)
+
+    while len(cache) > AWS_CACHE_MAX_SIZE:
+        cache.popitem(last=False)
+
+
+def clear_aws_cache():
+    """Drop all cached AWS sessions and clients.
+
+    Subsequent calls to get_aws_session and get_aws_client create fresh objects.
+    """
+    with _cache_lock:
+        logger.debug('Clearing AWS session and client cache')
+        _session_cache.clear()
+        _client_cache.clear()
+
+
+def get_aws_session(
+    session_config: dict | None = None,
+    profile: str | None = None,
+    use_cache: bool = True
+) -> boto3.Session:
+    """Get an AWS session with optional profile and region, reusing a cached one when possible
+
+    Sessions are cached process-wide, keyed by profile, region, assume_role and session_name.
+
+    Args:
+        session_config: A dictionary of session configuration options (see _create_aws_session).
+        profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
+        use_cache: Whether to reuse (and store) a cached session.
+
+    Returns:
+        A boto3.Session object
+    """
+    if session_config is None:
+        session_config = {}
+
+    if not use_cache:
+        return _create_aws_session(session_config, profile=profile)
+
+    key = _session_cache_key(session_config, profile)
+
+    with _cache_lock:
+        session = _cache_get(_session_cache, key)
+
+        if session is None:
+            session = _create_aws_session(session_config, profile=profile)
+            _cache_put(_session_cache, key, session)
+        else:
+            logger.debug('Reusing cached AWS session')
+
+    return session
+
+
+def _create_aws_session(session_config: dict, profile: str | None = None) -> boto3.Session:
     """Create and return an AWS session with optional profile and region
 
     Args:
@@ -15,19 +107,13 @@ def get_aws_session(session_config: dict | None = None, profile: str | None = No
         - region: The AWS region to use
         - assume_role: The AWS role ARN to assume
         - session_name: The name of the session
+        - credential_cache: Persist assumed role credentials on disk. Either True for
+          the default AWS CLI cache directory, or a directory path.
         profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
 
     Returns:
         A boto3.Session object
-
-    Raises:
-        botocore.exceptions.ParamValidationError: If assume_role parameters (e.g. session_name)
-            fail botocore's built-in validation. Parameter validation for sts.assume_role is
-            delegated entirely to botocore.
     """
-    if session_config is None:
-        session_config = {}
-
     profile = profile or session_config.get('profile')
     region = session_config.get('region')
 
@@ -46,32 +132,76 @@ def get_aws_session(session_config: dict | None = None, profile: str | None = No
 
     if assume_role := session_config.get('assume_role'):
         session_name = session_config.get('session_name') or 'botobuddy-session'
-        sts_client = session.client('sts')
+        credential_cache = session_config.get('credential_cache')
+        session = _create_assume_role_session(session, assume_role, session_name, region, credential_cache)
+
+    return session
+
 
-        assumed_role_object = sts_client.assume_role(RoleArn=assume_role, RoleSessionName=session_name)
+def _create_assume_role_session(
+    source_session: boto3.Session,
+    role_arn: str,
+    session_name: str,
+    region: str | None,
+    credential_cache: bool | str | None = None
+) -> boto3.Session:
+    """Create a session whose assumed role credentials refresh automatically before they expire.
 
-        logger.info(f'Assumed role {assume_role} with session name {session_name}')
+    The STS call is deferred until the credentials are first needed and repeated whenever they
+    approach expiry, so long-running operations survive past the initial credential lifetime.
 
-        # Log only the assumed role user details to avoid exposing sensitive credentials in debug logs
-        assumed_role_user = assumed_role_object.get('AssumedRoleUser', {})
-        logger.debug(f'Assumed role user: {assumed_role_user}')
+    Args:
+        source_session: The session providing the credentials used to assume the role.
+        role_arn: The AWS role ARN to assume.
+        session_name: The role session name.
+        region: Optional AWS region for the resulting session.
+        credential_cache: True to cache credentials in the default AWS CLI cache directory,
+            a directory path to use a custom location, or None/False to keep them in memory only.
 
-        credentials = assumed_role_object['Credentials']
+    Returns:
+        A boto3.Session object
 
-        assume_params = {
-            'aws_access_key_id': credentials['AccessKeyId'],
-            'aws_secret_access_key': credentials['SecretAccessKey'],
-            'aws_session_token': credentials['SessionToken'],
-        }
+    Raises:
+        botocore.exceptions.ParamValidationError: If assume_role parameters (e.g. session_name)
+            fail botocore's built-in validation, on the first request made with the session.
+            Parameter validation for sts.assume_role is delegated entirely to botocore.
+    """
+    cache = None
 
-        if region:
-            logger.info(f'Using AWS region: {region} for assumed role')
-            assume_params['region_name'] = region
+    if credential_cache:
+        if isinstance(credential_cache, str):
+            cache = JSONFileCache(working_dir=credential_cache)
+        else:
+            cache = JSONFileCache()
 
-        logger.info('Creating AWS session with assumed role')
-        session = boto3.Session(**assume_params)  # type: ignore
+        logger.debug('Using on-disk credential cache for assumed role credentials')
 
-    return session
+    fetcher = AssumeRoleCredentialFetcher(
+        client_creator=source_session._session.create_client,
+        source_credentials=source_session.get_credentials(),
+        role_arn=role_arn,
+        extra_args={'RoleSessionName': session_name},
+        cache=cache,
+    )
+
+    def refresh():
+        # Log only the expiry to avoid exposing sensitive credentials in debug logs
+        credentials = fetcher.fetch_credentials()
+        logger.debug(f'Assumed role credentials for {role_arn} expire at {credentials["expiry_time"]}')
+        return credentials
+
+    botocore_session = botocore.session.get_session()
+    botocore_session._credentials = DeferredRefreshableCredentials(  # type: ignore
+        refresh_using=refresh,
+        method='assume-role',
+    )
+
+    if region:
+        logger.info(f'Using AWS region: {region} for assumed role')
+        botocore_session.set_config_variable('region', region)
+
+    logger.info(f'Creating AWS session with assumed role {role_arn} and session name {session_name}')
+    return boto3.Session(botocore_session=botocore_session)
 
 
 def get_aws_client(
@@ -79,9 +209,14 @@ def get_aws_client(
     session_config: dict | None = None,
     profile: str | None = None,
     resource: bool = False,
-    core_config: dict | None = None
+    core_config: dict | None = None,
+    use_cache: bool = True
 ) -> Any:
-    """Create and return an AWS client or resource.
+    """Get an AWS client or resource, reusing a cached one when possible.
+
+    Clients and resources are cached process-wide, keyed by the session key, the service,
+    the client/resource kind and core_config. Clients are thread-safe and may be shared;
+    resources are not, so share cached resources across threads with care.
 
     Args:
         service: The AWS service name (e.g., 's3', 'dynamodb').
@@ -89,6 +224,7 @@ def get_aws_client(
         profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
         resource: Whether to return a Boto3 resource instead of a client.
         core_config: Optional botocore configuration dictionary.
+        use_cache: Whether to reuse (and store) a cached session and client.
 
     Returns:
         An AWS client or resource object.
@@ -96,8 +232,42 @@ def get_aws_client(
     if session_config is None:
         session_config = {}
 
-    session = get_aws_session(session_config, profile=profile)
+    if not use_cache:
+        session = get_aws_session(session_config, profile=profile, use_cache=False)
+        return _create_aws_client(session, service, resource, core_config)
+
+    key = (
+        _session_cache_key(session_config, profile),
+        service,
+        resource,
+        json.dumps(core_config or {}, sort_keys=True, default=str),
+    )
+
+    with _cache_lock:
+        result = _cache_get(_client_cache, key)
+
+        if result is None:
+            session = get_aws_session(session_config, profile=profile)
+            result = _create_aws_client(session, service, resource, core_config)
+            _cache_put(_client_cache, key, result)
+        else:
+            logger.debug(f'Reusing cached AWS {"resource" if resource else "client"} for {service}')
+
+    return result
+
+
+def _create_aws_client(session: boto3.Session, service: str, resource: bool, core_config: dict | None) -> Any:
+    """Create an AWS client or resource from the given session.
 
+    Args:
+        session: The boto3 session to create the client from.
+        service: The AWS service name.
+        resource: Whether to return a Boto3 resource instead of a client.
+        core_config: Optional botocore configuration dictionary.
+
+    Returns:
+        An AWS client or resource object.
+    """
     client_params = {'service_name': service}
 
     if core_config:
@@ -0,0 +1,240 @@
+'''Resolve runtime configuration from SSM parameters, Secrets Manager secrets and S3 files in one call.
+
+A spec maps target key paths to references:
+
+- ssm:///app/prod/db/host: an SSM parameter value
+- ssm:///app/prod/: all parameters under a path, nested by the rest of their names
+- secretsmanager://prod/db: a JSON secret (?plain for the raw string, ?stage=AWSPREVIOUS for another version stage)
+- s3://bucket/app.yaml: a JSON, YAML or TOML file (?format=yaml to override the extension)
+
+All references are fetched concurrently, grouped into batched SSM and Secrets Manager requests, and merged
+into one benedict in the order of the spec. Results are memoized for the same TTL as cached secrets, so rotated
+secrets are picked up.
+'''
+import copy
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Iterable, Mapping
+from urllib.parse import parse_qs, urlparse
+
+from benedict import benedict
+
+from botobuddy.common import _session_cache_key
+from botobuddy.logger import logger
+from botobuddy.s3 import load_dicts
+from botobuddy.secman import CURRENT_VERSION_STAGE, SECRET_CACHE_TTL, get_sm_secrets
+from botobuddy.ssm import get_ssm_parameters, get_ssm_parameters_by_path
+from botobuddy.utils import TTLCache
+
+
+CONFIG_SCHEMES = ('ssm', 'secretsmanager', 's3')
+
+_config_cache = TTLCache()
+
+# Per cache key locks with the number of threads holding or waiting for them, dropped once unused
+_config_locks = {}
+_config_locks_lock = threading.Lock()
+
+
+def clear_config_cache():
+    """Drop all memoized configurations."""
+    _config_cache.clear()
+
+
+@contextmanager
+def _resolution_lock(key: tuple):
+    """Serialize the resolutions of one configuration, without blocking those of others."""
+    with _config_locks_lock:
+        entry = _config_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _config_locks_lock:
+            entry[1] -= 1
+
+            if not entry[1]:
+                del _config_locks[key]
+
+
+def parse_reference(reference: str) -> tuple[str, str, dict[str, str]]:
+    """Split a configuration reference into its scheme, name and options.
+
+    Args:
+        reference: An ssm://, secretsmanager:// or s3:// URI.
+
+    Returns:
+        tuple: (scheme, name, options) where name is the parameter name or path, secret id or S3 URI.
+
+    Raises:
+        UserWarning: If the scheme is not supported.
+    """
+    parsed = urlparse(reference)
+
+    if parsed.scheme not in CONFIG_SCHEMES:
+        raise UserWarning(f'Unsupported configuration reference: {reference}')
+
+    options = {key: values[-1] for key, values in parse_qs(parsed.query, keep_blank_values=True).items()}
+
+    if parsed.scheme == 's3':
+        return parsed.scheme, parsed._replace(query='').geturl(), options
+
+    # ssm:///app/key keeps the leading slash of hierarchical names, ssm://key is a plain name
+    return parsed.scheme, parsed.netloc + parsed.path, options
+
+
+def _nest(parameters: dict[str, str], path: str) -> dict:
+    """Turn the parameters under an SSM path into a nested dictionary keyed by the rest of their names."""
+    nested = {}
+
+    for name, value in parameters.items():
+        *parents, leaf = name[len(path):].strip('/').split('/')
+        node = nested
+
+        for parent in parents:
+            node = node.setdefault(parent, {})
+
+        node[leaf] = value
+
+    return nested
+
+
+def _fetch_references(references: list[str], session_config: dict, profile: str | None, concurrency: int) -> dict:
+    """Fetch all references concurrently, grouped by service, and return their values by reference."""
+    parsed = {reference: parse_reference(reference) for reference in references}
+    jobs = []
+
+    parameter_names = [name for scheme, name, _ in parsed.values() if scheme == 'ssm' and not name.endswith('/')]
+    parameter_paths = [name for scheme, name, _ in parsed.values() if scheme == 'ssm' and name.endswith('/')]
+
+    common = {'session_config': session_config, 'profile': profile}
+
+    if parameter_names:
+        jobs.append(('ssm', partial(get_ssm_parameters, parameter_names, use_cache=False, **common)))
+
+    for path in parameter_paths:
+        jobs.append((('ssm', path), partial(get_ssm_parameters_by_path, path, use_cache=False, **common)))
+
+    # Secrets are batched per version stage and representation, S3 files per format
+    groups = {}
+
+    for reference, (scheme, name, options) in parsed.items():
+        if scheme == 'secretsmanager':
+            groups[reference] = ('secretsmanager', options.get('stage', CURRENT_VERSION_STAGE), 'plain' in options)
+        elif scheme == 's3':
+            groups[reference] = ('s3', options.get('format', 'auto'))
+
+    grouped_names = {}
+
+    for reference, group in groups.items():
+        grouped_names.setdefault(group, []).append(parsed[reference][1])
+
+    for group, names in grouped_names.items():
+        if group[0] == 'secretsmanager':
+            _, stage, plain = group
+            job = partial(get_sm_secrets, names, plain, version_stage=stage, use_cache=False, **common)
+        else:
+            job = partial(load_dicts, names, in_format=group[1], concurrency=min(concurrency, len(names)), **common)
+
+        jobs.append((group, job))
+
+    results = {}
+
+    if jobs:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(jobs))) as executor:
+            futures = [(job_key, executor.submit(job)) for job_key, job in jobs]
+            results = {job_key: future.result() for job_key, future in futures}
+
+    values = {}
+
+    for reference, (scheme, name, options) in parsed.items():
+        if scheme == 'ssm' and name.endswith('/'):
+            values[reference] = _nest(results[('ssm', name)], name)
+        elif scheme == 'ssm':
+            values[reference] = results['ssm'][name]
+        else:
+            values[reference] = results[groups[reference]][name]
+
+    return values
+
+
+def _merge(config: benedict, target: str | None, value: Any):
+    """Merge a resolved value into the configuration at a key path, or at the root if target is empty."""
+    if not target:
+        if not isinstance(value, Mapping):
+            raise UserWarning(f'Only dictionaries can be merged at the configuration root, got {type(value).__name__}')
+
+        config.merge(value)
+    elif isinstance(value, Mapping) and isinstance(config.get(target), Mapping):
+        config[target].merge(value)
+    else:
+        config[target] = value
+
+
+def resolve_config(
+    spec: Mapping[str, str] | Iterable[str],
+    session_config: dict | None = None,
+    profile: str | None = None,
+    *,
+    ttl: float = SECRET_CACHE_TTL,
+    refresh: bool = False,
+    concurrency: int = 8,
+    keypath_separator: str | None = '.'
+) -> benedict:
+    """Resolve a configuration spec into a single benedict.
+
+    The first call for a spec (and AWS session) fetches all references concurrently; later calls within the TTL
+    return a copy of the memoized configuration.
+
+    Args:
+        spec: Target key paths mapped to references, merged in order; an empty target (or a plain list of
+            references) merges dictionaries at the root.
+        session_config (dict): Optional AWS session configuration.
+        profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
+        ttl (float): Seconds after which the configuration is resolved again, math.inf for the process lifetime.
+        refresh (bool): Resolve the configuration again now, replacing the memoized one.
+        concurrency (int): Maximum number of concurrent requests.
+        keypath_separator (str | None): Separator of the target key paths and of the returned benedict; pass
+            None if configuration keys contain dots.
+
+    Returns:
+        benedict: The merged configuration.
+
+    Raises:
+        UserWarning: If a reference is not supported or not found.
+    """
+    if session_config is None:
+        session_config = {}
+
+    targets = list(spec.items()) if isinstance(spec, Mapping) else [('', reference) for reference in spec]
+    cache_key = (json.dumps(targets), _session_cache_key(session_config, profile), keypath_separator)
+
+    if not refresh:
+        config, status = _config_cache.get(cache_key, ttl)
+
+        if status == 'fresh':
+            return copy.deepcopy(config)
+
+    # Concurrent first calls for a spec wait for a single resolution instead of all hitting AWS at startup
+    with _resolution_lock(cache_key):
+        config, status = _config_cache.get(cache_key, ttl)
+
+        if status == 'fresh' and not refresh:
+            return copy.deepcopy(config)
+
+        references = list(dict.fromkeys(reference for _, reference in targets))
+        logger.debug(f'Resolving {len(references)} configuration references')
+        values = _fetch_references(references, session_config, profile, concurrency)
+
+        config = benedict(keypath_separator=keypath_separator)
+
+        for target, reference in targets:
+            _merge(config, target, values[reference])
+
+        _config_cache.put(cache_key, config)
+        return copy.deepcopy(config)
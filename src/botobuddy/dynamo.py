@@ -1,10 +1,20 @@
+import os
+import json
+import time
+import base64
+import threading
 import click
 
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import cast
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.exceptions import ClientError
 from types_boto3_dynamodb import DynamoDBClient, DynamoDBServiceResource
 
 from botobuddy.common import get_aws_client
 from botobuddy.logger import logger
+from botobuddy.utils import RateLimiter
 
 
 def get_dynamodb_client(session_config: dict | None = None, profile: str | None = None) -> DynamoDBClient:
@@ -57,30 +67,222 @@ def dynamo_group():
 
 @dynamo_group.command(name='truncate-table')
 @click.pass_obj
+@click.option('--segments', type=int, default=1, help='Number of parallel scan segments')
+@click.option('--max-wcu', type=float, help='Maximum write capacity units to consume per second')
+@click.option('--max-rcu', type=float, help='Maximum read capacity units the scans consume per second')
+@click.option('--resume', is_flag=True, help='Resume an interrupted truncate from its state file')
+@click.option(
+    '--state-file', type=click.Path(dir_okay=False, path_type=Path),
+    help='Checkpoint file (default: .botobuddy-truncate-<table_name>.json)'
+)
 @click.argument('table_name')
-def truncate_table_cmd(obj, table_name):
+def truncate_table_cmd(obj, segments, max_wcu, max_rcu, resume, state_file, table_name):
     """Truncate a DynamoDB table.
 
     Args:
         obj: The context object containing session configuration.
+        segments: Number of parallel scan segments.
+        max_wcu: Optional maximum write capacity units to consume per second.
+        max_rcu: Optional maximum read capacity units to consume per second.
+        resume: Whether to resume from the state file.
+        state_file: Optional path of the checkpoint file.
         table_name: The name of the table to truncate.
     """
     client = get_dynamodb_resource(obj)
-    counter = truncate_table(client, table_name)
-    logger.info(f'Deleted {counter} items')
+    state_file = state_file or Path(f'.botobuddy-truncate-{table_name}.json')
+
+    truncate_table(
+        client, table_name,
+        segments=segments,
+        max_wcu=max_wcu,
+        max_rcu=max_rcu,
+        state_file=state_file,
+        resume=resume
+    )
+
+
+# Maximum number of requests accepted by a single BatchWriteItem call
+BATCH_WRITE_SIZE = 25
+
+# Write capacity rate used to start the adaptive controller when no budget is given
+DEFAULT_INITIAL_WCU = 1000
+
+# Number of consecutive throttled attempts for one batch before giving up
+MAX_THROTTLE_RETRIES = 10
 
+THROTTLING_ERROR_CODES = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+}
+
+
+class AdaptiveRateController:
+    """An AIMD (additive increase, multiplicative decrease) controller for consumed capacity.
+
+    The write rate grows by a constant step after every batch that is fully processed, and is cut
+    by a constant factor whenever DynamoDB throttles or returns unprocessed items. Reads are paced by
+    an optional fixed budget, charged after each scan since its cost is only known from the response.
+    The controller also accumulates the consumed capacity and deleted items for the final report.
+    It is shared by all segments and is thread-safe.
+    """
 
-def truncate_table(client: DynamoDBServiceResource, table_name: str):
+    def __init__(
+        self,
+        initial_rate: float,
+        max_rate: float | None = None,
+        min_rate: float = 1,
+        increase: float = BATCH_WRITE_SIZE,
+        decrease_factor: float = 0.5,
+        max_read_rate: float | None = None
+    ):
+        """Initialize AdaptiveRateController.
+
+        Args:
+            initial_rate: The initial write capacity units per second.
+            max_rate: Optional upper bound for the rate (the consumed-capacity budget).
+            min_rate: Lower bound for the rate.
+            increase: Units per second added after each successful batch.
+            decrease_factor: Factor applied to the rate on throttling.
+            max_read_rate: Optional read capacity units per second consumed by the scans.
+        """
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.limiter = RateLimiter(min(initial_rate, max_rate) if max_rate else initial_rate)
+        self.read_limiter = RateLimiter(max_read_rate) if max_read_rate else None
+
+        self.items = 0
+        self.consumed_wcu = 0.0
+        self.consumed_rcu = 0.0
+        self.throttles = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        """The current write capacity units per second."""
+        return self.limiter.rate
+
+    def acquire(self, units: float):
+        """Block until the given number of write capacity units may be consumed."""
+        self.limiter.acquire(units)
+
+    def on_read(self, consumed_capacity: dict | None):
+        """Record the capacity consumed by a scan, blocking while it exceeds the read budget."""
+        units = _capacity_units(consumed_capacity)
+
+        with self._lock:
+            self.consumed_rcu += units
+
+        if self.read_limiter and units:
+            self.read_limiter.acquire(units)
+
+    def on_write(self, items: int, consumed_capacity: list | None) -> float:
+        """Record a batch write in which the given number of items was processed.
+
+        Returns:
+            float: The write capacity units consumed by the batch.
+        """
+        units = sum(_capacity_units(c) for c in consumed_capacity or [])
+
+        with self._lock:
+            self.items += items
+            self.consumed_wcu += units
+
+        return units
+
+    def on_success(self):
+        """Additively increase the rate after a fully processed batch."""
+        with self._lock:
+            rate = self.limiter.rate + self.increase
+            self.limiter.rate = min(rate, self.max_rate) if self.max_rate else rate
+
+    def on_throttle(self):
+        """Multiplicatively decrease the rate after throttling or unprocessed items."""
+        with self._lock:
+            self.throttles += 1
+            self.limiter.rate = max(self.limiter.rate * self.decrease_factor, self.min_rate)
+            logger.debug(f'Throttled, reducing rate to {self.limiter.rate:.1f} WCU/s')
+
+    def on_read_throttle(self):
+        """Record a throttled scan, which is retried after a backoff without changing the write rate."""
+        with self._lock:
+            self.throttles += 1
+
+    def report(self) -> dict:
+        """Return the achieved throughput and consumed capacity so far.
+
+        Returns:
+            dict: A dictionary with the following keys:
+
+            {
+                'items': int,
+                'elapsed_seconds': float,
+                'items_per_second': float,
+                'consumed_wcu': float,
+                'wcu_per_second': float,
+                'consumed_rcu': float,
+                'throttles': int
+            }
+        """
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+
+        return {
+            'items': self.items,
+            'elapsed_seconds': elapsed,
+            'items_per_second': self.items / elapsed,
+            'consumed_wcu': self.consumed_wcu,
+            'wcu_per_second': self.consumed_wcu / elapsed,
+            'consumed_rcu': self.consumed_rcu,
+            'throttles': self.throttles,
+        }
+
+
+def _capacity_units(consumed_capacity: dict | None) -> float:
+    """Extract the capacity units from a ConsumedCapacity structure."""
+    if not consumed_capacity:
+        return 0.0
+
+    return float(consumed_capacity.get('CapacityUnits', 0))
+
+
+def truncate_table(
+    client: DynamoDBServiceResource,
+    table_name: str,
+    *,
+    segments: int = 1,
+    max_wcu: float | None = None,
+    max_rcu: float | None = None,
+    state_file: Path | None = None,
+    resume: bool = False
+):
     """Implementation to truncate a DynamoDB table.
 
-    Scans the table for all keys and deletes items in batches.
+    Scans the table for all keys and deletes items in batches. With more than one segment,
+    the table is scanned in parallel using Segment/TotalSegments, with one writer per segment.
+    Writes are paced by an adaptive rate controller that backs off on throttling and
+    unprocessed items, scans are paced by the optional read budget and retried when throttled,
+    and the achieved throughput is logged at the end.
+
+    With a state file, each segment's LastEvaluatedKey and running counter are checkpointed after
+    every deleted page, so an interrupted truncate can be resumed. The file is removed on completion.
 
     Args:
         client: The Boto3 DynamoDB resource.
         table_name: The name of the table to truncate.
+        segments: Number of parallel scan segments.
+        max_wcu: Optional maximum write capacity units to consume per second, shared by all segments.
+        max_rcu: Optional maximum read capacity units the scans consume per second, shared by all segments.
+        state_file: Optional path of the checkpoint file.
+        resume: Whether to resume from an existing checkpoint in state_file.
 
     Returns:
-        The number of items deleted.
+        The number of items deleted, including those deleted before resuming.
+
+    Raises:
+        UserWarning: If resuming from a checkpoint that does not match the table or segment count.
     """
     table = client.Table(table_name)
 
@@ -88,33 +290,307 @@ def truncate_table(client: DynamoDBServiceResource, table_name: str):
     tableKeyNames = [key.get('AttributeName') for key in table.key_schema]
 
     # Only retrieve the keys for each item in the table (minimize data transfer)
-    projectionExpression = ', '.join('#' + key for key in tableKeyNames)
-    expressionAttrNames = {'#' + key: key for key in tableKeyNames}
+    scanParams = {
+        'ProjectionExpression': ', '.join('#' + key for key in tableKeyNames),
+        'ExpressionAttributeNames': {'#' + key: key for key in tableKeyNames},
+        'ReturnConsumedCapacity': 'TOTAL',
+    }
+
+    controller = AdaptiveRateController(max_wcu or DEFAULT_INITIAL_WCU, max_rate=max_wcu, max_read_rate=max_rcu)
+    segments = max(segments, 1)
+    checkpoint = TruncateCheckpoint(state_file, table_name, segments, resume=resume) if state_file else None
+
+    if segments == 1:
+        counter = truncate_segment(table, scanParams, controller, checkpoint)
+    else:
+        logger.debug(f'Truncating {table_name} with {segments} parallel segments')
+
+        with ThreadPoolExecutor(max_workers=segments) as executor:
+            futures = [
+                executor.submit(
+                    truncate_segment,
+                    table,
+                    {**scanParams, 'Segment': segment, 'TotalSegments': segments},
+                    controller,
+                    checkpoint
+                ) for segment in range(segments)
+            ]
+
+            counter = sum(future.result() for future in futures)
+
+    if checkpoint:
+        checkpoint.remove()
+
+    report = controller.report()
+
+    logger.info(
+        f'Deleted {report["items"]} items in {report["elapsed_seconds"]:.1f}s '
+        f'({report["items_per_second"]:.1f} items/s), '
+        f'consumed {report["consumed_wcu"]:.1f} WCU ({report["wcu_per_second"]:.1f} WCU/s) '
+        f'and {report["consumed_rcu"]:.1f} RCU, throttled {report["throttles"]} times'
+    )
+
+    return counter
+
+
+def truncate_segment(
+    table,
+    scanParams: dict,
+    controller: AdaptiveRateController,
+    checkpoint: 'TruncateCheckpoint | None' = None
+):
+    """Delete all items returned by a (possibly segmented) key-only scan of a table.
+
+    Segments run in parallel threads, so only the table's thread-safe low-level client (table.meta.client,
+    which still converts between Python and DynamoDB types) is used, never the Table resource itself.
+
+    Args:
+        table: The Boto3 DynamoDB Table resource.
+        scanParams: Parameters passed to every scan call (projection and optional segment).
+        controller: The rate controller pacing the deletes.
+        checkpoint: Optional checkpoint to resume from and record progress to.
 
+    Returns:
+        The number of items deleted in this segment, including those deleted before resuming.
+    """
+    client = table.meta.client
+    table_name = table.name
+    segment = scanParams.get('Segment', 0)
     counter = 0
+    startParams = {}
 
-    page = table.scan(
-        ProjectionExpression=projectionExpression,
-        ExpressionAttributeNames=expressionAttrNames
-    )
+    if checkpoint:
+        state = checkpoint.get(segment)
+        counter = state['counter']
 
-    with table.batch_writer() as batch:
-        while page['Count'] > 0:
-            counter += page['Count']
+        if state['done']:
+            logger.debug(f'Segment {segment} already completed, skipping')
+            return counter
 
-            # Delete items in batches
-            for itemKeys in page['Items']:
-                batch.delete_item(Key=itemKeys)
+        if state['last_evaluated_key']:
+            logger.debug(f'Resuming segment {segment} after {counter} deleted items')
+            startParams['ExclusiveStartKey'] = state['last_evaluated_key']
 
-            # Fetch the next page
-            if 'LastEvaluatedKey' in page:
-                page = table.scan(
-                    ProjectionExpression=projectionExpression,
-                    ExpressionAttributeNames=expressionAttrNames,
-                    ExclusiveStartKey=page['LastEvaluatedKey']
-                )
+    page = scan_page(client, {'TableName': table_name, **scanParams, **startParams}, controller)
+
+    while True:
+        controller.on_read(page.get('ConsumedCapacity'))
+
+        # Delete items in batches
+        items = page['Items']
+
+        for i in range(0, len(items), BATCH_WRITE_SIZE):
+            delete_batch(table, items[i:i + BATCH_WRITE_SIZE], controller)
+
+        counter += page['Count']
+        lastEvaluatedKey = page.get('LastEvaluatedKey')
 
-            else:
-                break
+        # Only checkpoint once every item of the page is deleted
+        if checkpoint:
+            checkpoint.update(segment, lastEvaluatedKey, counter, done=lastEvaluatedKey is None)
 
+        # Fetch the next page
+        if lastEvaluatedKey:
+            page = scan_page(
+                client, {'TableName': table_name, **scanParams, 'ExclusiveStartKey': lastEvaluatedKey}, controller
+            )
+        else:
+            break
+
+    logger.debug(f'Deleted {counter} items in segment {segment}')
     return counter
+
+
+def scan_page(client, params: dict, controller: AdaptiveRateController) -> dict:
+    """Scan one page, retrying throttled requests with exponential backoff.
+
+    Args:
+        client: The Boto3 DynamoDB client.
+        params: The parameters of the scan call.
+        controller: The rate controller recording the throttles.
+
+    Returns:
+        dict: The scan response.
+
+    Raises:
+        UserWarning: If the scan keeps being throttled after MAX_THROTTLE_RETRIES attempts.
+    """
+    throttled = 0
+
+    while True:
+        try:
+            return client.scan(**params)
+        except ClientError as e:
+            if e.response['Error']['Code'] not in THROTTLING_ERROR_CODES:
+                raise
+
+        throttled += 1
+
+        if throttled > MAX_THROTTLE_RETRIES:
+            raise UserWarning(f'Giving up on scan after {MAX_THROTTLE_RETRIES} throttled retries')
+
+        controller.on_read_throttle()
+        time.sleep(min(0.05 * 2 ** throttled, 10))
+
+
+class TruncateCheckpoint:
+    """Thread-safe, on-disk checkpoint of a table truncate.
+
+    Stores the LastEvaluatedKey, running counter and completion flag of every scan segment in a JSON file.
+    Keys are stored in DynamoDB's typed JSON format so that number and binary key attributes round-trip exactly.
+    """
+
+    def __init__(self, path: Path, table_name: str, segments: int, resume: bool = False):
+        """Initialize TruncateCheckpoint.
+
+        Args:
+            path: The path of the state file.
+            table_name: The name of the table being truncated.
+            segments: The total number of scan segments.
+            resume: Whether to load the existing state file instead of starting over.
+
+        Raises:
+            UserWarning: If resuming and the state file is missing or belongs to another truncate.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._serializer = TypeSerializer()
+        self._deserializer = TypeDeserializer()
+
+        if resume:
+            if not path.exists():
+                raise UserWarning(f'Cannot resume: state file {path} not found')
+
+            self.state = json.loads(path.read_text())
+
+            if self.state['table_name'] != table_name or self.state['segments'] != segments:
+                raise UserWarning(
+                    f'Cannot resume: state file {path} was created for table {self.state["table_name"]} '
+                    f'with {self.state["segments"]} segments'
+                )
+
+            logger.info(f'Resuming truncate of {table_name} from {path}')
+        else:
+            self.state = {
+                'table_name': table_name,
+                'segments': segments,
+                'segment_state': {
+                    str(segment): {'last_evaluated_key': None, 'counter': 0, 'done': False}
+                    for segment in range(segments)
+                }
+            }
+
+            self._save()
+
+    def get(self, segment: int) -> dict:
+        """Return the saved state of a segment, with the LastEvaluatedKey decoded."""
+        with self._lock:
+            state = dict(self.state['segment_state'][str(segment)])
+
+        if state['last_evaluated_key']:
+            state['last_evaluated_key'] = self._decode_key(state['last_evaluated_key'])
+
+        return state
+
+    def update(self, segment: int, last_evaluated_key: dict | None, counter: int, done: bool):
+        """Record the progress of a segment and persist the state file."""
+        encoded = self._encode_key(last_evaluated_key) if last_evaluated_key else None
+
+        with self._lock:
+            self.state['segment_state'][str(segment)] = {
+                'last_evaluated_key': encoded,
+                'counter': counter,
+                'done': done
+            }
+
+            self._save()
+
+    def remove(self):
+        """Delete the state file after a completed truncate."""
+        logger.debug(f'Removing state file {self.path}')
+        self.path.unlink(missing_ok=True)
+
+    def _save(self):
+        # Write to a temporary file first so an interruption never leaves a truncated state file
+        temp_path = self.path.with_name(self.path.name + '.tmp')
+        temp_path.write_text(json.dumps(self.state))
+        os.replace(temp_path, self.path)
+
+    def _encode_key(self, key: dict) -> dict:
+        encoded = {}
+
+        for name, value in key.items():
+            typed = self._serializer.serialize(value)
+
+            if 'B' in typed:
+                typed = {'B': base64.b64encode(typed['B']).decode('ascii')}
+
+            encoded[name] = typed
+
+        return encoded
+
+    def _decode_key(self, encoded: dict) -> dict:
+        key = {}
+
+        for name, typed in encoded.items():
+            if 'B' in typed:
+                typed = {'B': base64.b64decode(typed['B'])}
+
+            key[name] = self._deserializer.deserialize(typed)
+
+        return key
+
+
+def delete_batch(table, keys: list, controller: AdaptiveRateController):
+    """Delete up to 25 items with BatchWriteItem, retrying unprocessed items and throttled requests.
+
+    Args:
+        table: The Boto3 DynamoDB Table resource.
+        keys: The keys of the items to delete.
+        controller: The rate controller pacing the deletes.
+
+    Raises:
+        UserWarning: If the batch keeps being throttled after MAX_THROTTLE_RETRIES attempts.
+    """
+    client = table.meta.client
+    requests = [{'DeleteRequest': {'Key': key}} for key in keys]
+    throttled = 0
+
+    while requests:
+        # Pre-charge one write capacity unit per delete (items up to 1KB), larger items are settled below
+        charged = len(requests)
+        controller.acquire(charged)
+
+        try:
+            response = client.batch_write_item(
+                RequestItems={table.name: requests},
+                ReturnConsumedCapacity='TOTAL'
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] not in THROTTLING_ERROR_CODES:
+                raise
+
+            response = None
+
+        if response is None:
+            unprocessed = requests
+        else:
+            unprocessed = response.get('UnprocessedItems', {}).get(table.name, [])
+            consumed = controller.on_write(len(requests) - len(unprocessed), response.get('ConsumedCapacity'))
+
+            # Deletes consume capacity by item size, charge the shortfall so large items stay within budget
+            if consumed > charged:
+                controller.acquire(consumed - charged)
+
+        if not unprocessed:
+            controller.on_success()
+            break
+
+        throttled += 1
+
+        if throttled > MAX_THROTTLE_RETRIES:
+            raise UserWarning(f'Giving up on {len(unprocessed)} items after {MAX_THROTTLE_RETRIES} throttled retries')
+
+        controller.on_throttle()
+        time.sleep(min(0.05 * 2 ** throttled, 10))
+        requests = unprocessed
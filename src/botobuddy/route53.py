@@ -1,12 +1,18 @@
+import sys
+import time
 import click
 import json
+import textwrap
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from typing import cast
+from typing import Iterable, Iterator, TextIO, cast
 from types_boto3_route53 import Route53Client
 
 from botobuddy.common import get_aws_client
 from botobuddy.logger import logger
+from botobuddy.utils import RateLimiter
 
 
 def get_route53_client(session_config: dict | None = None, profile: str | None = None) -> Route53Client:
@@ -24,6 +30,11 @@ def get_route53_client(session_config: dict | None = None, profile: str | None =
     return cast(Route53Client, get_aws_client('route53', session_config, profile=profile))
 
 
+# Export formats and the extensions of their files
+EXPORT_FORMATS = ('json', 'ndjson', 'bind')
+EXPORT_EXTENSIONS = {'json': 'json', 'ndjson': 'ndjson', 'bind': 'zone'}
+
+
 def import_commands(parent):
     """Register Route53 commands with the main CLI group.
 
@@ -41,43 +52,430 @@ def route53_group():
 
 @route53_group.command(name='export')
 @click.pass_obj
-@click.argument('hosted_zone_id')
-def export_hosted_zone(obj, hosted_zone_id):
-    """Export all resource record sets from a specified hosted zone.
+@click.option(
+    '--format', 'out_format', type=click.Choice(EXPORT_FORMATS), default='json',
+    help='JSON array, newline-delimited JSON or BIND zone file'
+)
+@click.option('--all-zones', is_flag=True, help='Export every hosted zone of the account')
+@click.option(
+    '--output-dir', type=click.Path(file_okay=False, path_type=Path),
+    help='Write one file per hosted zone to this directory instead of standard output'
+)
+@click.option('--concurrency', type=int, default=4, help='Number of hosted zones exported in parallel')
+@click.argument('hosted_zone_ids', nargs=-1)
+def export_hosted_zone(obj, out_format, all_zones, output_dir, concurrency, hosted_zone_ids):
+    """Export all resource record sets from one or more hosted zones.
 
     Args:
         obj (dict): Global Click configuration object.
-        hosted_zone_id (str): The ID of the Route53 hosted zone to export.
+        out_format (str): The output format, 'json', 'ndjson' or 'bind'.
+        all_zones (bool): Whether to export every hosted zone.
+        output_dir (Path): Optional directory to write one file per zone to.
+        concurrency (int): Number of hosted zones exported in parallel.
+        hosted_zone_ids (tuple[str]): The IDs of the Route53 hosted zones to export.
     """
     client = get_route53_client(obj)
-    response = client.list_resource_record_sets(HostedZoneId=hosted_zone_id)
-    click.echo(json.dumps(response['ResourceRecordSets'], indent=2))
+
+    # Listing the zones and their record sets share the account's request rate
+    limiter = RateLimiter(ROUTE53_MAX_RPS)
+
+    if all_zones:
+        hosted_zone_ids = [zone['Id'] for zone in list_hosted_zones(client, limiter=limiter)]
+
+    if not hosted_zone_ids:
+        raise UserWarning('No hosted zones to export')
+
+    if output_dir is None:
+        if len(hosted_zone_ids) > 1:
+            raise UserWarning('Exporting several hosted zones requires --output-dir')
+
+        export_record_sets(client, hosted_zone_ids[0], sys.stdout, out_format, limiter=limiter)
+        return
+
+    paths = export_hosted_zones(
+        client, hosted_zone_ids, output_dir, out_format, concurrency=concurrency, limiter=limiter
+    )
+    logger.info(f'Exported {len(paths)} hosted zones to {output_dir}')
 
 
 @route53_group.command(name='import')
 @click.pass_obj
 @click.option('--filename', '-f', required=True, type=str)
+@click.option('--delete', is_flag=True, help='Delete record sets that are not in the file (except NS and SOA)')
+@click.option('--dry-run', is_flag=True, help='Print the planned changes without applying them')
+@click.option('--no-wait', is_flag=True, help='Do not wait for the changes to propagate')
 @click.argument('hosted_zone_id')
-def import_hosted_zone(obj, hosted_zone_id, filename):
+def import_hosted_zone(obj, hosted_zone_id, filename, delete, dry_run, no_wait):
     """Import resource record sets into a hosted zone, skipping NS and SOA.
 
+    Only the differences with the current zone are submitted, in as few change batches as possible.
+
     Args:
         obj (dict): Global Click configuration object.
         hosted_zone_id (str): The destination hosted zone ID.
         filename (str): Path to the JSON file containing record sets.
+        delete (bool): Whether to delete record sets missing from the file.
+        dry_run (bool): Whether to only print the planned changes.
+        no_wait (bool): Whether to return without waiting for the changes to be in sync.
     """
     client = get_route53_client(obj)
     records = json.loads(Path(filename).read_text())
 
     logger.info(f'Importing {len(records)} records to {hosted_zone_id}')
 
+    changes = plan_record_changes(list_record_sets(client, hosted_zone_id), records, delete=delete)
+
+    if dry_run:
+        for change in changes:
+            record = change['ResourceRecordSet']
+            click.echo(f'{change["Action"]:6} {record["Type"]:5} {record["Name"]}')
+
+    counts = Counter(change['Action'] for change in changes)
+    batches = batch_record_changes(changes)
+
+    logger.info(
+        f'{counts["CREATE"]} to create, {counts["UPSERT"]} to update, {counts["DELETE"]} to delete '
+        f'in {len(batches)} change batches'
+    )
+
+    if not dry_run:
+        apply_record_changes(client, hosted_zone_id, batches, wait=not no_wait)
+
+
+# Route53 allows five API requests per second per account
+ROUTE53_MAX_RPS = 5
+
+# Limits of a single ChangeResourceRecordSets request, where UPSERT changes count twice
+MAX_BATCH_RECORDS = 1000
+MAX_BATCH_CHARACTERS = 32000
+
+# Seconds between GetChange polls while waiting for changes to propagate
+CHANGE_POLL_INTERVAL = 5
+
+# Record types managed by Route53 itself, which are never imported
+SKIPPED_RECORD_TYPES = ('NS', 'SOA')
+
+
+def list_record_sets(
+    client: Route53Client, hosted_zone_id: str, *, limiter: RateLimiter | None = None
+) -> Iterator[dict]:
+    """List all resource record sets of a hosted zone, following pagination page by page.
+
+    Args:
+        client: The Route53 client to use.
+        hosted_zone_id: The ID of the hosted zone.
+        limiter: Optional rate limiter acquired before each page request.
+
+    Yields:
+        dict: The resource record sets.
+    """
+    pages = client.get_paginator('list_resource_record_sets').paginate(HostedZoneId=hosted_zone_id)
+
+    for page in _limited_pages(pages, limiter):
+        yield from page['ResourceRecordSets']
+
+
+def list_hosted_zones(client: Route53Client, *, limiter: RateLimiter | None = None) -> Iterator[dict]:
+    """List all hosted zones of the account, following pagination.
+
+    Args:
+        client: The Route53 client to use.
+        limiter: Optional rate limiter acquired before each page request.
+
+    Yields:
+        dict: The hosted zones.
+    """
+    for page in _limited_pages(client.get_paginator('list_hosted_zones').paginate(), limiter):
+        yield from page['HostedZones']
+
+
+def _limited_pages(pages: Iterable[dict], limiter: RateLimiter | None) -> Iterator[dict]:
+    """Iterate the pages of a paginator, acquiring the limiter before each page is requested."""
+    if limiter is None:
+        yield from pages
+        return
+
+    limiter.acquire()
+
+    for page in pages:
+        yield page
+
+        if page.get('IsTruncated'):
+            limiter.acquire()
+
+
+def _bind_lines(record: dict) -> Iterator[str]:
+    """Format a record set as BIND zone file lines, with comments for Route53-specific features."""
+    name = record['Name'].replace('\\052', '*')
+
+    if 'SetIdentifier' in record:
+        yield f'; Routing policy set {record["SetIdentifier"]!r} (not representable in BIND)'
+
+    if 'AliasTarget' in record:
+        yield f'; {name} ALIAS {record["Type"]} {record["AliasTarget"]["DNSName"]} (not representable in BIND)'
+        return
+
+    for resource_record in record.get('ResourceRecords', []):
+        yield f'{name}\t{record.get("TTL", 300)}\tIN\t{record["Type"]}\t{resource_record["Value"]}'
+
+
+def write_record_sets(records: Iterable[dict], out: TextIO, out_format: str = 'json') -> int:
+    """Write record sets to a text stream as they are produced, without holding them all in memory.
+
+    The 'json' format produces the same output as json.dumps(list(records), indent=2).
+
+    Args:
+        records: The record sets, e.g. from list_record_sets.
+        out: The stream to write to.
+        out_format: 'json', 'ndjson' or 'bind'.
+
+    Returns:
+        int: The number of record sets written.
+    """
+    count = 0
+
     for record in records:
-        if record['Type'] in ['NS', 'SOA']:
-            continue
+        if out_format == 'ndjson':
+            out.write(json.dumps(record) + '\n')
+        elif out_format == 'bind':
+            out.writelines(line + '\n' for line in _bind_lines(record))
+        else:
+            out.write(',\n' if count else '[\n')
+            out.write(textwrap.indent(json.dumps(record, indent=2), '  '))
+
+        count += 1
+
+    if out_format == 'json':
+        out.write('\n]\n' if count else '[]\n')
+
+    return count
+
+
+def export_record_sets(
+    client: Route53Client,
+    hosted_zone_id: str,
+    out: TextIO,
+    out_format: str = 'json',
+    *,
+    limiter: RateLimiter | None = None
+) -> int:
+    """Stream all record sets of a hosted zone to a text stream.
+
+    Args:
+        client: The Route53 client to use.
+        hosted_zone_id: The ID of the hosted zone.
+        out: The stream to write to.
+        out_format: 'json', 'ndjson' or 'bind'.
+        limiter: Optional rate limiter for the page requests.
+
+    Returns:
+        int: The number of record sets exported.
+    """
+    records = list_record_sets(client, hosted_zone_id, limiter=limiter)
+    return write_record_sets(records, out, out_format)
+
+
+def export_hosted_zones(
+    client: Route53Client,
+    hosted_zone_ids: Iterable[str],
+    output_dir: Path,
+    out_format: str = 'json',
+    *,
+    concurrency: int = 4,
+    max_rps: float = ROUTE53_MAX_RPS,
+    limiter: RateLimiter | None = None
+) -> list[Path]:
+    """Export hosted zones in parallel, one file per zone named after the zone ID.
+
+    Args:
+        client: The Route53 client to use.
+        hosted_zone_ids: The IDs of the hosted zones.
+        output_dir: The directory to write to, created if needed.
+        out_format: 'json', 'ndjson' or 'bind'.
+        concurrency: Number of zones exported in parallel.
+        max_rps: Maximum number of Route53 requests per second, shared by all zones.
+        limiter: Optional rate limiter to share with other requests, replacing max_rps.
 
-        client.change_resource_record_sets(
+    Returns:
+        list[Path]: The written files.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    limiter = limiter or RateLimiter(max_rps)
+
+    def export(hosted_zone_id):
+        zone_id = hosted_zone_id.rsplit('/', 1)[-1]
+        path = output_dir / f'{zone_id}.{EXPORT_EXTENSIONS[out_format]}'
+
+        with path.open('w') as out:
+            count = export_record_sets(client, zone_id, out, out_format, limiter=limiter)
+
+        logger.debug(f'Exported {count} record sets of {zone_id} to {path}')
+        return path
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(export, hosted_zone_ids))
+
+
+def record_set_id(record: dict) -> tuple[str, str, str | None]:
+    """Return the identity of a record set: its normalized name, type and set identifier.
+
+    Args:
+        record: The resource record set.
+
+    Returns:
+        tuple: (name, type, set identifier or None)
+    """
+    name = record['Name'].lower().replace('\\052', '*')
+
+    if not name.endswith('.'):
+        name += '.'
+
+    return (name, record['Type'], record.get('SetIdentifier'))
+
+
+def _normalized(record: dict) -> dict:
+    """Return a record set in a form that compares equal regardless of name spelling and record order."""
+    normalized = dict(record)
+    normalized['Name'] = record_set_id(record)[0]
+
+    if 'ResourceRecords' in record:
+        normalized['ResourceRecords'] = sorted(record['ResourceRecords'], key=lambda r: r['Value'])
+
+    if 'AliasTarget' in record:
+        alias = dict(record['AliasTarget'])
+        alias['DNSName'] = alias['DNSName'].lower().rstrip('.')
+        normalized['AliasTarget'] = alias
+
+    return normalized
+
+
+def plan_record_changes(current: Iterable[dict], desired: Iterable[dict], *, delete: bool = False) -> list[dict]:
+    """Compute the minimal changes turning the current record sets into the desired ones.
+
+    NS and SOA record sets are left alone.
+
+    Args:
+        current: The record sets in the hosted zone.
+        desired: The record sets to import.
+        delete: Whether to delete current record sets that are not desired.
+
+    Returns:
+        list[dict]: Route53 changes ({'Action': 'CREATE' | 'UPSERT' | 'DELETE', 'ResourceRecordSet': dict}),
+            deletions first.
+    """
+    existing = {record_set_id(record): record for record in current if record['Type'] not in SKIPPED_RECORD_TYPES}
+    wanted = {record_set_id(record): record for record in desired if record['Type'] not in SKIPPED_RECORD_TYPES}
+
+    changes = []
+
+    if delete:
+        changes.extend(
+            {'Action': 'DELETE', 'ResourceRecordSet': record}
+            for record_id, record in existing.items() if record_id not in wanted
+        )
+
+    for record_id, record in wanted.items():
+        if record_id not in existing:
+            changes.append({'Action': 'CREATE', 'ResourceRecordSet': record})
+        elif _normalized(record) != _normalized(existing[record_id]):
+            changes.append({'Action': 'UPSERT', 'ResourceRecordSet': record})
+
+    return changes
+
+
+def _change_size(change: dict) -> tuple[int, int]:
+    """Return the number of records and value characters a change counts for against the batch limits."""
+    records = change['ResourceRecordSet'].get('ResourceRecords', [])
+    count = max(len(records), 1)
+    characters = sum(len(record['Value']) for record in records)
+    factor = 2 if change['Action'] == 'UPSERT' else 1
+
+    return count * factor, characters * factor
+
+
+def batch_record_changes(
+    changes: list[dict],
+    *,
+    max_records: int = MAX_BATCH_RECORDS,
+    max_characters: int = MAX_BATCH_CHARACTERS
+) -> list[list[dict]]:
+    """Pack changes into as few change batches as the ChangeResourceRecordSets limits allow.
+
+    Args:
+        changes: The changes, in the order they must be applied.
+        max_records: Maximum number of resource records per batch (UPSERT counts twice).
+        max_characters: Maximum number of characters in record values per batch (UPSERT counts twice).
+
+    Returns:
+        list[list[dict]]: The change batches.
+    """
+    batches = []
+    batch, records, characters = [], 0, 0
+
+    for change in changes:
+        change_records, change_characters = _change_size(change)
+
+        if batch and (records + change_records > max_records or characters + change_characters > max_characters):
+            batches.append(batch)
+            batch, records, characters = [], 0, 0
+
+        batch.append(change)
+        records += change_records
+        characters += change_characters
+
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+
+def apply_record_changes(
+    client: Route53Client,
+    hosted_zone_id: str,
+    batches: list[list[dict]],
+    *,
+    max_rps: float = ROUTE53_MAX_RPS,
+    wait: bool = True,
+    comment: str = 'botobuddy import'
+) -> list[str]:
+    """Submit change batches to a hosted zone, rate limited, and optionally wait until they are in sync.
+
+    Args:
+        client: The Route53 client to use.
+        hosted_zone_id: The ID of the hosted zone.
+        batches: The change batches, as returned by batch_record_changes.
+        max_rps: Maximum number of Route53 requests per second.
+        wait: Whether to poll GetChange until all changes are INSYNC.
+        comment: The comment of the change batches.
+
+    Returns:
+        list[str]: The IDs of the submitted changes.
+    """
+    limiter = RateLimiter(max_rps)
+    change_ids = []
+
+    for number, batch in enumerate(batches, start=1):
+        limiter.acquire()
+
+        response = client.change_resource_record_sets(
             HostedZoneId=hosted_zone_id,
-            ChangeBatch={'Changes': [
-                {'Action': 'UPSERT', 'ResourceRecordSet': record}
-            ]}
+            ChangeBatch={'Comment': comment, 'Changes': batch}  # type: ignore
         )
+
+        change_ids.append(response['ChangeInfo']['Id'])
+        logger.debug(f'Submitted change batch {number}/{len(batches)} ({len(batch)} changes)')
+
+    pending = list(change_ids)
+
+    while wait and pending:
+        time.sleep(CHANGE_POLL_INTERVAL)
+
+        for change_id in list(pending):
+            limiter.acquire()
+
+            if client.get_change(Id=change_id)['ChangeInfo']['Status'] == 'INSYNC':
+                pending.remove(change_id)
+
+        logger.debug(f'{len(change_ids) - len(pending)}/{len(change_ids)} change batches in sync')
+
+    return change_ids
@@ -1,17 +1,38 @@
 import os
+import gzip
+import json
+import math
+import time
+import asyncio
+import queue
+import random
 import tempfile
-from typing import Any, cast
+import threading
+import multiprocessing
+from collections import Counter, OrderedDict
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, cast
 from urllib.parse import urlparse
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from functools import partial
+from itertools import batched
 from pathlib import Path
 
 import click
 from benedict import benedict
+from boto3.exceptions import S3UploadFailedError
 from boto3.s3.transfer import TransferConfig
+from botocore.endpoint import MAX_POOL_CONNECTIONS
+from botocore.exceptions import BotoCoreError, ClientError, HTTPClientError, IncompleteReadError, ResponseStreamingError
+from botocore.exceptions import ConnectionError as BotoConnectionError
+from s3transfer.exceptions import RetriesExceededError
+from rich.progress import DownloadColumn, Progress, SpinnerColumn, TextColumn, TransferSpeedColumn
 from types_boto3_s3 import S3Client
 
 from botobuddy.common import get_aws_client
 from botobuddy.logger import logger
+from botobuddy.s3cache import ObjectCache, get_object_cache
+from botobuddy.utils import RateLimiter, submit_bounded
 
 
 def get_s3_client(session_config: dict | None = None, profile: str | None = None, core_config: dict | None = None) -> S3Client:
@@ -35,7 +56,15 @@ type S3UriCoersible = Any
 
 
 class S3Uri:
-    """A utility class to parse and manipulate S3 URIs."""
+    """A utility class to parse and manipulate S3 URIs.
+
+    S3Uri is an immutable, hashable value type: URIs compare and sort by bucket and key, so they can
+    be used as dict keys. Plain 's3://bucket/key' strings are split without urlparse, derived fields
+    (path_list, filename, parsed_uri) are computed on first use, and joining or taking the parent
+    builds the new URI from the already parsed parts.
+    """
+
+    __slots__ = ('_s3_uri', '_bucket', '_path', '_path_list', '_parsed_uri')
 
     def __init__(self, s3_uri: S3UriCoersible):
         """Initialize S3Uri.
@@ -46,20 +75,74 @@ class S3Uri:
         Raises:
             ValueError: If s3_uri is not a string or S3Uri object.
         """
-        if isinstance(s3_uri, str):
-            pass
-        elif isinstance(s3_uri, S3Uri):
-            s3_uri = str(s3_uri)
-        else:
+        if isinstance(s3_uri, S3Uri):
+            self._s3_uri, self._bucket, self._path = s3_uri._s3_uri, s3_uri._bucket, s3_uri._path
+            return
+
+        if not isinstance(s3_uri, str):
             raise ValueError(f'Invalid type: {type(s3_uri)}. Must be a string or a S3Uri')
 
-        self.s3_uri = s3_uri
-        self.parsed_uri = urlparse(s3_uri)
-        self.bucket = self.parsed_uri.netloc
-        self.path = self.parsed_uri.path.lstrip('/')
-        self.path_list = self.path.split('/')
-        self.filename = self.path_list[-1] if self.path_list else None
-        self.key = self.path
+        if s3_uri.startswith('s3://') and '?' not in s3_uri and '#' not in s3_uri:
+            bucket, _, path = s3_uri[5:].partition('/')
+        else:
+            parsed_uri = urlparse(s3_uri)
+            bucket, path = parsed_uri.netloc, parsed_uri.path
+
+        self._s3_uri, self._bucket, self._path = s3_uri, bucket, path.lstrip('/')
+
+    @classmethod
+    def _from_parts(cls, s3_uri: str, bucket: str, path: str) -> 'S3Uri':
+        """Build an S3Uri from an already parsed bucket and path, skipping parsing."""
+        uri = cls.__new__(cls)
+        uri._s3_uri, uri._bucket, uri._path = s3_uri, bucket, path
+        return uri
+
+    def __reduce__(self):
+        return (S3Uri, (self._s3_uri,))
+
+    @property
+    def s3_uri(self) -> str:
+        """The URI string."""
+        return self._s3_uri
+
+    @property
+    def bucket(self) -> str:
+        """The bucket name."""
+        return self._bucket
+
+    @property
+    def path(self) -> str:
+        """The object key or prefix, without a leading '/'."""
+        return self._path
+
+    @property
+    def key(self) -> str:
+        """The object key, the same as path."""
+        return self._path
+
+    @property
+    def path_list(self) -> list[str]:
+        """The path split on '/'."""
+        try:
+            path_list = self._path_list
+        except AttributeError:
+            path_list = self._path_list = self._path.split('/')
+
+        return list(path_list)
+
+    @property
+    def filename(self) -> str:
+        """The last segment of the path."""
+        return self._path.rpartition('/')[2]
+
+    @property
+    def parsed_uri(self):
+        """The URI as parsed by urllib.parse.urlparse."""
+        try:
+            return self._parsed_uri
+        except AttributeError:
+            self._parsed_uri = urlparse(self._s3_uri)
+            return self._parsed_uri
 
     def parent(self):
         """Get the parent S3Uri.
@@ -67,15 +150,48 @@ class S3Uri:
         Returns:
             S3Uri: The parent URI, or None if no parent exists.
         """
-        if not self.path_list:
-            return None
-
-        parent_path = '/'.join(self.path_list[:-1])
-        return S3Uri(f's3://{self.bucket}/{parent_path}')
+        parent_path = self._path.rpartition('/')[0]
+        return S3Uri._from_parts(f's3://{self._bucket}/{parent_path}', self._bucket, parent_path)
 
     def __str__(self):
         """Return the string representation of the S3 URI."""
-        return self.s3_uri
+        return self._s3_uri
+
+    def __repr__(self):
+        return f'S3Uri({self._s3_uri!r})'
+
+    def __hash__(self):
+        return hash((self._bucket, self._path))
+
+    def __eq__(self, other):
+        if not isinstance(other, S3Uri):
+            return NotImplemented
+
+        return self._bucket == other._bucket and self._path == other._path
+
+    def __lt__(self, other):
+        if not isinstance(other, S3Uri):
+            return NotImplemented
+
+        return (self._bucket, self._path) < (other._bucket, other._path)
+
+    def __le__(self, other):
+        if not isinstance(other, S3Uri):
+            return NotImplemented
+
+        return (self._bucket, self._path) <= (other._bucket, other._path)
+
+    def __gt__(self, other):
+        if not isinstance(other, S3Uri):
+            return NotImplemented
+
+        return (self._bucket, self._path) > (other._bucket, other._path)
+
+    def __ge__(self, other):
+        if not isinstance(other, S3Uri):
+            return NotImplemented
+
+        return (self._bucket, self._path) >= (other._bucket, other._path)
 
     def __truediv__(self, other):
         """Join an S3Uri with a path segment.
@@ -98,7 +214,17 @@ class S3Uri:
         else:
             raise ValueError(f'Invalid type: {type(other)}')
 
-        return S3Uri(self.s3_uri.rstrip('/') + '/' + other_str)
+        joined = self.s3_uri.rstrip('/') + '/' + other_str
+
+        # Segments with a query or fragment marker need urlparse semantics
+        if '?' in joined or '#' in joined or not joined.startswith('s3://'):
+            return S3Uri(joined)
+
+        return S3Uri._from_parts(joined, self._bucket, (self._path.rstrip('/') + '/' + other_str).lstrip('/'))
+
+
+# Transfer engines of the sync functions, see aios3 for the asyncio one
+TRANSFER_ENGINES = ('threads', 'asyncio')
 
 
 def import_commands(parent):
@@ -117,33 +243,48 @@ def s3_group():
 
 
 @s3_group.command(name='delete-bucket')
+@click.option(
+    '--concurrency', type=int, default=10
+)
 @click.argument('bucket_name')
 @click.pass_obj
-def delete_bucket_cmd(obj, bucket_name):
+def delete_bucket_cmd(obj, concurrency, bucket_name):
     """Clean and delete an S3 bucket completely.
 
     Args:
         obj (dict): Global Click configuration object.
+        concurrency (int): Number of concurrent batch deletions.
         bucket_name (str): The name of the S3 bucket to delete.
     """
-    client = get_s3_client(obj)
-    delete_bucket_contents(client, bucket_name)
+    client = get_s3_client(obj, core_config={'max_pool_connections': concurrency})
+    summary = delete_bucket_contents(client, bucket_name, concurrency=concurrency)
+    logger.info(f'Deleted {summary["deleted"]} objects, {len(summary["failed"])} failed')
+
+    if summary['failed']:
+        for error in summary['failed']:
+            logger.warning(f'Failed to delete {error["Key"]} (version {error.get("VersionId")}): {error.get("Message")}')
+
+        raise UserWarning(f'Failed to delete {len(summary["failed"])} objects, bucket {bucket_name} was not deleted')
+
     delete_bucket(client, bucket_name)
 
 
 @s3_group.command(name='ls')
+@click.option(
+    '--list-concurrency', type=int, default=1,
+    help='Number of "/"-delimited prefixes listed in parallel (no effect on a flat keyspace)'
+)
 @click.argument('s3_path')
 @click.pass_obj
-def ls_cmd(obj, s3_path):
+def ls_cmd(obj, list_concurrency, s3_path):
     """List objects at the specified S3 path.
 
     Args:
         obj (dict): Global Click configuration object.
+        list_concurrency (int): Number of prefixes listed in parallel.
         s3_path (str): The S3 path or URI to list.
     """
-    client = get_s3_client(obj)
-
-    for item in list_all_objects(s3_path, s3_client=client):
+    for item in list_all_objects(s3_path, session_config=obj, concurrency=list_concurrency):
         logger.info(item['Key'])  # type: ignore
 
 
@@ -167,12 +308,6 @@ def view_dict_cmd(obj, in_format, out_format, s3_path):
         out_format (str): Output format for display.
         s3_path (str): The S3 path to the file.
     """
-    loaders = {
-        'json': benedict.from_json,
-        'yaml': benedict.from_yaml,
-        'toml': benedict.from_toml
-    }
-
     dumpers = {
         'json': json_dumper,
         'yaml': benedict.to_yaml,
@@ -180,74 +315,288 @@ def view_dict_cmd(obj, in_format, out_format, s3_path):
     }
 
     if in_format == 'auto':
-        in_format = s3_path.split('.')[-1]
+        in_format = infer_dict_format(s3_path)
         logger.info(f'Inferred format: {in_format}')
 
-        if in_format not in loaders:
-            raise UserWarning(f'Unsupported format: {in_format}')
-
-    s3_uri = S3Uri(s3_path)
-    s3 = get_s3_client(obj)
-
-    loader = loaders[in_format]
-    dumper = dumpers[in_format]
-
-    if out_format != 'original':
-        dumper = dumpers[out_format]
-
-    fd, filepath = tempfile.mkstemp()
-    os.close(fd)
-
-    try:
-        s3.download_file(s3_uri.bucket, s3_uri.path, filepath)
-        d = loader(filepath)
-    finally:
-        try:
-            os.remove(filepath)
-        except OSError:
-            pass
+    dumper = dumpers[in_format if out_format == 'original' else out_format]
+    d = load_dict(s3_path, in_format=in_format, s3_client=get_s3_client(obj))
 
     click.echo(dumper(d))
 
 
 @s3_group.command(name='sync')
+@click.option(
+    '--direction', type=click.Choice(['down', 'up']), default='down',
+    help='Download from S3 (down) or upload to S3 (up)'
+)
 @click.option(
     '--recursive', is_flag=True
 )
 @click.option(
     '--skip-existing', is_flag=True
 )
+@click.option(
+    '--incremental', is_flag=True, help='Only download objects that changed since the last sync'
+)
+@click.option(
+    '--delete', is_flag=True, help='Delete files that no longer exist in the source'
+)
 @click.option(
     '--concurrency', type=int, default=100
 )
+@click.option(
+    '--list-concurrency', type=int, default=1,
+    help='Number of "/"-delimited prefixes listed in parallel (no effect on a flat keyspace)'
+)
+@click.option(
+    '--max-bandwidth', type=float, help='Maximum transfer bandwidth in MB/s'
+)
+@click.option(
+    '--max-rps', type=float, help='Maximum transfer requests per second'
+)
+@click.option(
+    '--max-prefix-rps', type=float, help='Maximum transfer requests per second for each key prefix'
+)
+@click.option(
+    '--processes', type=int, default=1, help='Number of download worker processes, each running --concurrency transfers'
+)
+@click.option(
+    '--engine', type=click.Choice(TRANSFER_ENGINES), default='threads',
+    help='Transfer engine: a thread pool, or an asyncio event loop (requires aiohttp)'
+)
+@click.option(
+    '--no-progress', is_flag=True, help='Do not display a progress bar'
+)
+@click.option(
+    '--metrics-json', type=click.Path(dir_okay=False, path_type=Path),
+    help='Write download metrics (throughput, latency percentiles) to a JSON file'
+)
 @click.argument(
     's3_path'
 )
 @click.argument(
-    'local_path', type=click.Path(file_okay=False, dir_okay=True, path_type=Path)
+    'destination'
 )
 @click.pass_obj
-def sync_cmd(obj, recursive, skip_existing, concurrency, s3_path, local_path):
-    """Sync an S3 folder to a local directory.
+def sync_cmd(
+    obj, direction, recursive, skip_existing, incremental, delete, concurrency, list_concurrency,
+    max_bandwidth, max_rps, max_prefix_rps, processes, engine, no_progress, metrics_json, s3_path, destination
+):
+    """Sync an S3 folder to a local directory or another S3 folder, or a local directory to an S3 folder.
+
+    When the destination is an S3 URI, objects are copied server-side, always incrementally; options that
+    only apply to transfers through this host (--direction up, --max-bandwidth, --processes, --engine,
+    --metrics-json) are rejected.
 
     Args:
         obj (dict): Global Click configuration object.
+        direction (str): 'down' to download from S3, 'up' to upload to S3.
         recursive (bool): Whether to sync folders recursively.
-        skip_existing (bool): Whether to skip files that already exist locally.
-        concurrency (int): Number of concurrent downloads.
-        s3_path (str): The source S3 path.
-        local_path (Path): The destination local path.
+        skip_existing (bool): Whether to skip files that already exist in the destination.
+        incremental (bool): Whether to download only changed objects (uploads are always incremental).
+        delete (bool): Whether to delete destination files that no longer exist in the source.
+        concurrency (int): Number of concurrent transfers.
+        list_concurrency (int): Number of prefixes listed in parallel.
+        max_bandwidth (float): Optional maximum transfer bandwidth in MB/s.
+        max_rps (float): Optional maximum transfer requests per second.
+        max_prefix_rps (float): Optional maximum transfer requests per second for each key prefix.
+        processes (int): Number of download worker processes.
+        engine (str): The transfer engine, 'threads' or 'asyncio'.
+        no_progress (bool): Whether to hide the download progress bar.
+        metrics_json (Path): Optional path of a JSON file to write download metrics to.
+        s3_path (str): The S3 path.
+        destination (str): The local path, or the destination S3 path.
     """
+    limiter = None
+
+    if max_bandwidth or max_rps or max_prefix_rps:
+        limiter = TransferLimiter(
+            max_bandwidth=max_bandwidth * 1024 * 1024 if max_bandwidth else None,
+            max_rps=max_rps,
+            max_prefix_rps=max_prefix_rps
+        )
+
+    if destination.startswith('s3://'):
+        unsupported = [
+            option for option, is_set in (
+                ('--direction up', direction == 'up'),
+                ('--max-bandwidth', max_bandwidth),
+                ('--processes', processes > 1),
+                ('--engine asyncio', engine != 'threads'),
+                ('--metrics-json', metrics_json)
+            )
+            if is_set
+        ]
+
+        if unsupported:
+            raise UserWarning(f'{", ".join(unsupported)} cannot be used when syncing to an S3 destination')
+
+        if incremental:
+            logger.warning('--incremental is implied when syncing to an S3 destination')
+
+        logger.info(f'Syncing {s3_path} to {destination}')
+
+        summary = sync_s3_folders(
+            s3_path, destination,
+            session_config=obj,
+            recursive=recursive,
+            skip_existing=skip_existing,
+            delete=delete,
+            concurrency=concurrency,
+            list_concurrency=list_concurrency,
+            limiter=limiter
+        )
+
+        logger.info(
+            f'Copied {summary["copied"]} objects ({summary["bytes_copied"]} bytes), '
+            f'skipped {summary["skipped"]} unchanged objects ({summary["bytes_saved"]} bytes saved), '
+            f'deleted {summary["deleted"]} objects'
+        )
+
+        if summary['failed']:
+            raise UserWarning(f'Failed to copy {len(summary["failed"])} objects')
+
+        return
+
+    # Uploads read an existing directory, downloads create it
+    local_path = click.Path(exists=direction == 'up', file_okay=False, dir_okay=True, path_type=Path).convert(
+        destination, None, click.get_current_context()
+    )
+
+    if direction == 'up':
+        logger.info(f'Syncing {local_path} to {s3_path}')
+
+        summary = sync_folder_to_s3(
+            local_path, s3_path,
+            session_config=obj,
+            recursive=recursive,
+            skip_existing=skip_existing,
+            delete=delete,
+            concurrency=concurrency,
+            list_concurrency=list_concurrency,
+            limiter=limiter,
+            engine=engine
+        )
+
+        logger.info(
+            f'Uploaded {summary["uploaded"]} files ({summary["bytes_uploaded"]} bytes), '
+            f'skipped {summary["skipped"]} unchanged files ({summary["bytes_saved"]} bytes saved), '
+            f'deleted {summary["deleted"]} objects'
+        )
+
+        if summary['failed']:
+            raise UserWarning(f'Failed to upload {len(summary["failed"])} files')
+
+        return
+
     logger.info(f'Syncing {s3_path} to {local_path}')
 
-    sync_folder_from_s3(
-        s3_path, local_path,
-        session_config=obj,
-        recursive=recursive,
-        skip_existing=skip_existing,
-        concurrency=concurrency
+    progress = Progress(
+        SpinnerColumn(),
+        TextColumn('{task.description}'),
+        TextColumn('{task.fields[files]} files'),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        disable=no_progress,
+        transient=True
+    )
+
+    with progress:
+        task = progress.add_task('Downloading', total=None, files=0)
+
+        metrics = TransferMetrics(
+            on_object=lambda record: progress.update(task, files=metrics.objects),
+            on_bytes=lambda count: progress.update(task, advance=count)
+        )
+
+        summary = sync_folder_from_s3(
+            s3_path, local_path,
+            session_config=obj,
+            recursive=recursive,
+            skip_existing=skip_existing,
+            incremental=incremental,
+            delete=delete,
+            concurrency=concurrency,
+            list_concurrency=list_concurrency,
+            limiter=limiter,
+            metrics=metrics,
+            engine=engine,
+            processes=processes
+        )
+
+    report = metrics.summary()
+
+    logger.info(
+        f'Downloaded {summary["downloaded"]} files ({summary["bytes_downloaded"]} bytes), '
+        f'skipped {summary["skipped"]} unchanged files ({summary["bytes_saved"]} bytes saved), '
+        f'deleted {summary["deleted"]} local files'
+    )
+
+    logger.info(
+        f'Throughput {report["mb_per_second"]:.2f} MB/s, '
+        f'duration p50/p95/p99 {report["duration"]["p50"]:.3f}/{report["duration"]["p95"]:.3f}/'
+        f'{report["duration"]["p99"]:.3f}s, {report["retries"]} retries'
     )
 
+    if metrics_json:
+        metrics.dump_json(metrics_json)
+        logger.info(f'Metrics written to {metrics_json}')
+
+    if summary['failed']:
+        raise UserWarning(f'Failed to download {len(summary["failed"])} files')
+
+
+@s3_group.command(name='copy')
+@click.option(
+    '--recursive', is_flag=True, help='Copy all objects under the source prefix'
+)
+@click.option(
+    '--concurrency', type=int, default=100
+)
+@click.argument(
+    'source'
+)
+@click.argument(
+    'destination'
+)
+@click.pass_obj
+def copy_cmd(obj, recursive, concurrency, source, destination):
+    """Copy an S3 object, or a folder with --recursive, to another S3 location server-side.
+
+    Args:
+        obj (dict): Global Click configuration object.
+        recursive (bool): Whether to copy a whole folder.
+        concurrency (int): Number of concurrent copy requests.
+        source (str): The source S3 path.
+        destination (str): The destination S3 path. Ending with '/' copies the object into that folder.
+    """
+    if recursive:
+        summary = sync_s3_folders(
+            source, destination,
+            session_config=obj,
+            recursive=True,
+            incremental=False,
+            concurrency=concurrency
+        )
+
+        logger.info(f'Copied {summary["copied"]} objects ({summary["bytes_copied"]} bytes)')
+        failed = summary['failed']
+    else:
+        source_uri = S3Uri(source)
+        destination_uri = S3Uri(destination)
+        key = destination_uri.key + source_uri.filename if destination.endswith('/') else destination_uri.key
+
+        results = fast_copy_s3_objects(
+            [(source_uri.bucket, source_uri.key, destination_uri.bucket, key)],
+            session_config=obj,
+            concurrency=concurrency
+        )
+
+        failed = results['failed']
+
+    if failed:
+        raise UserWarning(f'Failed to copy {len(failed)} objects')
+
 
 def json_dumper(d):
     """Dump a dictionary as a pretty-printed JSON string.
@@ -261,233 +610,2584 @@ def json_dumper(d):
     return benedict.to_json(d, indent=2)
 
 
-def download(s3_cli: S3Client, s3_uri: S3Uri, local: Path):
-    """This function is a required placeholder. Do not delete."""
-    s3_cli.download_file(
-        s3_uri.bucket, s3_uri.key, local.as_posix()
-    )
-
-
-def list_all_objects(
-    s3_path: str | S3Uri,
-    *,
-    s3_client: S3Client | None = None,
-    session_config: dict | None = None,
-    profile: str | None = None
+def download(
+    s3_cli: S3Client,
+    s3_uri: S3Uri,
+    local: Path,
+    cache: ObjectCache | None = None,
+    limiter: 'TransferLimiter | None' = None
 ):
-    """List all objects in an S3 bucket.
+    """This function is a required placeholder. Do not delete.
 
-    Args:
-        s3_path: The S3 path or S3Uri to list.
-        s3_client: Optional S3 client.
-        session_config: Optional AWS session configuration.
-        profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
-    """
-    if session_config is None:
-        session_config = {}
+    With a cache (explicit or installed with set_object_cache), the object is materialized from the
+    local object cache when its ETag matches, and otherwise downloaded pinned to that ETag and added to
+    the cache. An object overwritten in the meantime (412) is looked up again under its new ETag.
 
-    if isinstance(s3_path, str):
-        s3_uri = S3Uri(s3_path)
-    else:
-        s3_uri = s3_path
+    Requests and downloaded bytes count against the limiter (explicit or installed with set_transfer_limiter).
+    """
+    cache = get_object_cache(cache)
+    limiter = get_transfer_limiter(limiter)
+    callback = limiter.acquire_bytes if limiter else None
 
-    client = s3_client or get_s3_client(session_config=session_config, profile=profile)
+    if not cache:
+        if limiter:
+            limiter.acquire_request(s3_uri.key)
 
-    paginator = client.get_paginator('list_objects_v2')
-    page_iterator = paginator.paginate(
-        Bucket=s3_uri.bucket,
-        Prefix=s3_uri.path
-    )
+        s3_cli.download_file(
+            s3_uri.bucket, s3_uri.key, local.as_posix(), Callback=callback
+        )
 
-    for page in page_iterator:
-        for obj in page.get('Contents', []):
-            yield dict(obj)
+        return
 
+    for attempt in range(2):
+        if limiter:
+            limiter.acquire_request(s3_uri.key)
 
-def delete_bucket_contents(client, bucket_name):
-    """Deletes all objects and object versions from the specified S3 bucket.
+        etag = s3_cli.head_object(Bucket=s3_uri.bucket, Key=s3_uri.key)['ETag']
 
-    Args:
-        client (S3Client): The S3 client to use.
-        bucket_name (str): The name of the bucket to empty.
-    """
-    logger.debug(f'Deleting all objects in bucket: {bucket_name}')
+        if cache.fetch(s3_uri.bucket, s3_uri.key, etag, local):
+            return
 
-    # Delete all objects and their versions
-    paginator = client.get_paginator('list_object_versions')
-    page_iterator = paginator.paginate(Bucket=bucket_name)
+        if limiter:
+            limiter.acquire_request(s3_uri.key)
 
-    for page in page_iterator:
-        # Delete object versions if they exist
-        if 'Versions' in page:
-            for version in page['Versions']:
-                client.delete_object(
-                    Bucket=bucket_name,
-                    Key=version['Key'],
-                    VersionId=version['VersionId']
+        try:
+            with pinned_etag(s3_cli, etag):
+                s3_cli.download_file(
+                    s3_uri.bucket, s3_uri.key, local.as_posix(), Config=PINNED_TRANSFER_CONFIG, Callback=callback
                 )
+        except Exception as e:
+            if attempt or not is_precondition_failed(e):
+                raise
 
-                logger.debug(
-                    f'Deleted object: {version["Key"]} (version {version["VersionId"]})'
-                )
+            logger.debug(f'{s3_uri.key} changed since its ETag {etag} was read, looking it up again')
+            continue
 
-        # Delete delete markers if they exist
-        if 'DeleteMarkers' in page:
-            for marker in page['DeleteMarkers']:
-                client.delete_object(
-                    Bucket=bucket_name,
-                    Key=marker['Key'],
-                    VersionId=marker['VersionId']
-                )
+        cache.put(s3_uri.bucket, s3_uri.key, etag, local)
+        return
 
-                logger.debug(
-                    f'Deleted delete marker: {marker["Key"]} (version {marker["VersionId"]})'
-                )
 
+# Maximum size in bytes of a dictionary-like object, compressed or not
+DICT_MAX_SIZE = 64 * 1024 * 1024
 
-def delete_bucket(client, bucket_name):
-    """Deletes the specified S3 bucket after emptying it.
+# Size in bytes above which a dictionary-like object is buffered on disk rather than in memory
+DICT_SPILL_THRESHOLD = 8 * 1024 * 1024
 
-    Args:
-        client (S3Client): The S3 client to use.
-        bucket_name (str): The name of the bucket to delete.
-    """
+DICT_LOADERS = {
+    'json': benedict.from_json,
+    'yaml': benedict.from_yaml,
+    'toml': benedict.from_toml,
+}
 
-    # Delete the bucket
-    logger.debug(f'Deleting bucket: {bucket_name}')
-    client.delete_bucket(Bucket=bucket_name)
-    logger.debug(f'Bucket {bucket_name} has been deleted successfully')
+COMPRESSION_SUFFIXES = {'gz': 'gzip', 'zst': 'zstd', 'zstd': 'zstd'}
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
 
 
-def fast_download_s3_files(
-    targets: list[tuple[str, str, str | Path]],
-    *,
-    skip_existing: bool = False,
-    create_folders: bool = True,
-    concurrency: int = 10,
-    session_config: dict | None = None,
-    profile: str | None = None
-):
-    '''Download a list of files from S3 in parallel.
+def infer_dict_format(s3_path: str | S3Uri) -> str:
+    """Infer the format of a dictionary-like file from its extension, ignoring compression suffixes.
 
     Args:
-        targets: List of tuples containing (bucket, key, local_path)
-        skip_existing: Skip files that already exist locally
-        create_folders: Create the folders for the files
-        concurrency: Number of concurrent downloads
-        session_config: Configuration for the AWS session (profile, region, etc.)
-        profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
-    '''
-    if session_config is None:
-        session_config = {}
+        s3_path: The S3 path or S3Uri of the file.
 
-    boto_config = {
-        'max_pool_connections': int(1.5 * concurrency)
-    }
+    Returns:
+        str: The format, one of DICT_LOADERS.
 
-    client = get_s3_client(session_config, profile=profile, core_config=boto_config)
-    transfer_config = TransferConfig(use_threads=False)
+    Raises:
+        UserWarning: If the format is not supported.
+    """
+    suffixes = S3Uri(s3_path).key.split('/')[-1].split('.')[1:]
 
-    logger.debug(f'Fast downloading {len(targets)} files')
+    if suffixes and suffixes[-1] in COMPRESSION_SUFFIXES:
+        suffixes.pop()
 
-    if create_folders:
-        folders = set()
+    in_format = suffixes[-1] if suffixes else ''
+    in_format = 'yaml' if in_format == 'yml' else in_format
 
-        for target in targets:
-            folders.add(Path(target[2]).parent)
+    if in_format not in DICT_LOADERS:
+        raise UserWarning(f'Unsupported format: {in_format}')
 
-        for folder in folders:
-            logger.debug(f'Creating folder {folder}')
-            folder.mkdir(parents=True, exist_ok=True)
+    return in_format
 
-    def download_file(bucket_name, key, local_path):
-        if isinstance(local_path, Path):
-            local_path = str(local_path)
 
-        if skip_existing and Path(local_path).exists():
-            return f'Skipping {key} because it already exists'
+def _decompressed(fileobj: BinaryIO) -> BinaryIO:
+    """Wrap a seekable file object with a decompressor if it starts with a gzip or zstd frame."""
+    magic = fileobj.read(4)
+    fileobj.seek(0)
 
-        client.download_file(
-            bucket_name, key, local_path, Config=transfer_config
-        )
+    if magic.startswith(GZIP_MAGIC):
+        return cast(BinaryIO, gzip.GzipFile(fileobj=fileobj, mode='rb'))
 
-        return f'Successfully downloaded {key}'
+    if magic == ZSTD_MAGIC:
+        try:
+            from compression import zstd  # type: ignore[import-not-found]
+            return cast(BinaryIO, zstd.ZstdFile(fileobj, mode='rb'))
+        except ImportError:
+            pass
 
-    with ThreadPoolExecutor(max_workers=concurrency) as executor:
-        futures = [
-            executor.submit(
-                download_file,
-                target[0],
-                target[1],
-                target[2],
-            ) for target in targets
-        ]
+        try:
+            import zstandard  # type: ignore[import-not-found]
+        except ImportError:
+            raise UserWarning('Reading zstd-compressed objects requires zstandard, install botobuddy[zstd]')
 
-        for future in futures:
-            logger.debug(future.result())
+        return cast(BinaryIO, zstandard.ZstdDecompressor().stream_reader(fileobj))
 
+    return fileobj
 
-def sync_folder_from_s3(
-    s3_uri: str | S3Uri,
-    local_dir: Path,
+
+def _read_capped(fileobj: BinaryIO, max_size: int, name: str) -> bytes:
+    """Read a file object to the end, failing once more than max_size bytes were read."""
+    data = fileobj.read(max_size + 1)
+
+    if len(data) > max_size:
+        raise UserWarning(f'{name} is larger than {max_size} bytes')
+
+    return data
+
+
+def load_dict(
+    s3_path: str | S3Uri,
     *,
+    in_format: str = 'auto',
+    s3_client: S3Client | None = None,
     session_config: dict | None = None,
     profile: str | None = None,
-    recursive: bool = False,
-    skip_existing: bool = True,
-    concurrency: int = 10
-):
-    '''Recursively download a folder from S3 using fast_download_s3_files
+    max_size: int = DICT_MAX_SIZE,
+    spill_threshold: int = DICT_SPILL_THRESHOLD,
+    cache: ObjectCache | None = None,
+    limiter: 'TransferLimiter | None' = None
+) -> benedict:
+    """Load a dictionary-like file (JSON, YAML or TOML) from S3 without a temporary file round trip.
+
+    The object body is streamed into a buffer kept in memory up to spill_threshold bytes and spilled
+    to disk beyond it. Gzip and zstd compressed objects are detected from their contents and
+    decompressed transparently.
+
+    With a cache (explicit or installed with set_object_cache), the object is read from the local
+    object cache when its ETag matches, and added to it otherwise.
 
     Args:
-        s3_uri: S3 URI to the folder
-        local_dir: Local directory to save the folder
-        session_config: Configuration for the AWS session.
+        s3_path: The S3 path or S3Uri of the file.
+        in_format: The format of the file, or 'auto' to infer it from the extension.
+        s3_client: Optional S3 client.
+        session_config: Optional AWS session configuration.
         profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
-        recursive: Recursively download the folder
-        concurrency: Number of concurrent downloads
+        max_size: Maximum size in bytes of the object, and of its decompressed contents.
+        spill_threshold: Size in bytes above which the object is buffered on disk.
+        cache: Optional local object cache.
+        limiter: Optional bandwidth and request rate limiter (defaults to the one installed with
+            set_transfer_limiter).
 
-    Note: This function always preserves the folder structure in the local directory,
-        including filenames.
-    '''
-    if session_config is None:
-        session_config = {}
+    Returns:
+        benedict: The loaded dictionary.
 
-    if isinstance(s3_uri, str):
-        s3_uri = S3Uri(s3_uri)
+    Raises:
+        UserWarning: If the format is not supported or the object is too large.
+    """
+    s3_uri = S3Uri(s3_path)
 
-    # List all objects in the S3 folder using list_all_objects
-    targets = []
+    if in_format == 'auto':
+        in_format = infer_dict_format(s3_uri)
 
-    logger.debug(f'Listing objects in {s3_uri}')
+    if in_format not in DICT_LOADERS:
+        raise UserWarning(f'Unsupported format: {in_format}')
 
-    s3_client = get_s3_client(session_config, profile=profile)
-    for obj in list_all_objects(s3_uri, s3_client=s3_client):
-        key = obj['Key']
-        relative_path = Path(key).relative_to(s3_uri.path)
+    client = s3_client or get_s3_client(session_config, profile=profile)
+    cache = get_object_cache(cache)
+    limiter = get_transfer_limiter(limiter)
+    etag = None
 
-        if not recursive and relative_path.parent != Path('.'):
-            continue
+    if cache:
+        if limiter:
+            limiter.acquire_request(s3_uri.key)
 
-        local_path = (local_dir / relative_path).resolve()
+        etag = client.head_object(Bucket=s3_uri.bucket, Key=s3_uri.key)['ETag']
+        cached = cache.get(s3_uri.bucket, s3_uri.key, etag)
 
-        if not local_path.is_relative_to(local_dir.resolve()):
-            logger.warning(f"Skipping {key} due to path traversal attempt outside {local_dir}")
-            continue
+        if cached:
+            with cached.open('rb') as f:
+                data = _read_capped(_decompressed(f), max_size, str(s3_uri))
 
-        targets.append((s3_uri.bucket, key, local_path))
+            return DICT_LOADERS[in_format](data.decode('utf-8'))
 
-    if not targets:
-        logger.debug(f'No files found in {s3_uri}')
-        return
+    if limiter:
+        limiter.acquire_request(s3_uri.key)
 
-    logger.debug(f'Syncing {s3_uri} to {local_dir} with {len(targets)} files')
+    extra_args = {'IfMatch': etag} if etag else {}
+    response = client.get_object(Bucket=s3_uri.bucket, Key=s3_uri.key, **extra_args)
+
+    if response['ContentLength'] > max_size:
+        response['Body'].close()
+        raise UserWarning(f'{s3_uri} is larger than {max_size} bytes')
+
+    with tempfile.SpooledTemporaryFile(max_size=spill_threshold) as buffer:
+        for chunk in response['Body'].iter_chunks(1024 * 1024):
+            if limiter:
+                limiter.acquire_bytes(len(chunk))
+
+            buffer.write(chunk)
+
+        buffer.seek(0)
+
+        if cache:
+            cache.put_fileobj(s3_uri.bucket, s3_uri.key, etag, buffer)
+            buffer.seek(0)
+
+        data = _read_capped(_decompressed(cast(BinaryIO, buffer)), max_size, str(s3_uri))
+
+    return DICT_LOADERS[in_format](data.decode('utf-8'))
+
+
+def load_dicts(
+    s3_paths: Iterable[str | S3Uri],
+    *,
+    concurrency: int = 10,
+    session_config: dict | None = None,
+    profile: str | None = None,
+    **kwargs
+) -> dict[str, benedict]:
+    """Load many dictionary-like files from S3 concurrently with load_dict.
+
+    Args:
+        s3_paths: The S3 paths or S3Uris of the files.
+        concurrency: Number of concurrent downloads.
+        session_config: Optional AWS session configuration.
+        profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
+        **kwargs: Further arguments of load_dict (in_format, max_size, spill_threshold, cache, limiter).
+
+    Returns:
+        dict: The loaded dictionaries by S3 path, in the order given.
+    """
+    s3_paths = [str(s3_path) for s3_path in s3_paths]
+    client = get_transfer_s3_client(concurrency, session_config=session_config, profile=profile)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        dicts = executor.map(partial(load_dict, s3_client=client, **kwargs), s3_paths)
+        return dict(zip(s3_paths, dicts))
+
+
+# Maximum number of key prefixes whose request rate is tracked, the least recently used are dropped
+PREFIX_LIMITERS_MAX_SIZE = 10000
+
+
+class TransferLimiter:
+    """A shared limiter for S3 transfer bandwidth and request rate.
+
+    A single instance can be passed to several transfer helpers (or installed as the default with
+    set_transfer_limiter) so that all of them draw from the same token buckets. Listing, transfers,
+    copies and deletes all count against the request rates; only transfers count against the bandwidth.
+    """
+
+    def __init__(
+        self,
+        max_bandwidth: float | None = None,
+        max_rps: float | None = None,
+        max_prefix_rps: float | None = None
+    ):
+        """Initialize TransferLimiter.
+
+        Args:
+            max_bandwidth: Optional maximum transfer rate in bytes per second.
+            max_rps: Optional maximum number of transfer requests per second.
+            max_prefix_rps: Optional maximum number of transfer requests per second for each key prefix
+                (the key up to its last '/'), matching S3's per-prefix request limits.
+        """
+        self.limits = {'max_bandwidth': max_bandwidth, 'max_rps': max_rps, 'max_prefix_rps': max_prefix_rps}
+        self.bandwidth = RateLimiter(max_bandwidth) if max_bandwidth else None
+        self.requests = RateLimiter(max_rps) if max_rps else None
+        self.max_prefix_rps = max_prefix_rps
+        self._prefix_requests: OrderedDict[str, RateLimiter] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prefix_limiter(self, prefix: str) -> RateLimiter:
+        """Return the request limiter of a key prefix, creating it and evicting the least recently used if needed."""
+        with self._lock:
+            limiter = self._prefix_requests.get(prefix)
+
+            if limiter is not None:
+                self._prefix_requests.move_to_end(prefix)
+                return limiter
+
+            limiter = self._prefix_requests[prefix] = RateLimiter(self.max_prefix_rps)
+
+            if len(self._prefix_requests) > PREFIX_LIMITERS_MAX_SIZE:
+                self._prefix_requests.popitem(last=False)
+
+            return limiter
+
+    def acquire_request(self, key: str, count: int = 1):
+        """Block until the given number of requests for the key may be sent.
+
+        Args:
+            key: The object key (or listed prefix) the requests are for.
+            count: The number of requests.
+        """
+        if self.requests:
+            self.requests.acquire(count)
+
+        if self.max_prefix_rps:
+            self._prefix_limiter(key.rpartition('/')[0]).acquire(count)
+
+    def acquire_keys(self, keys: Iterable[str]):
+        """Block until one request for each of the keys may be sent, e.g. for a DeleteObjects batch.
+
+        Args:
+            keys: The object keys.
+        """
+        keys = list(keys)
+
+        if self.requests:
+            self.requests.acquire(len(keys))
+
+        if self.max_prefix_rps:
+            for prefix, count in Counter(key.rpartition('/')[0] for key in keys).items():
+                self._prefix_limiter(prefix).acquire(count)
+
+    def acquire_bytes(self, count: int):
+        """Block until the given number of bytes may be transferred.
+
+        Suitable as a boto3 transfer Callback, which is invoked with the number of bytes transferred.
+
+        Args:
+            count: The number of bytes.
+        """
+        if self.bandwidth and count > 0:
+            self.bandwidth.acquire(count)
+
+
+_default_transfer_limiter: TransferLimiter | None = None
+
+
+def set_transfer_limiter(limiter: TransferLimiter | None):
+    """Install a process-wide default limiter used by S3 transfer helpers when none is passed explicitly.
+
+    Args:
+        limiter: The limiter to install, or None to remove the default.
+    """
+    global _default_transfer_limiter
+    _default_transfer_limiter = limiter
+
+
+def get_transfer_limiter(limiter: TransferLimiter | None = None) -> TransferLimiter | None:
+    """Return the given limiter, or the process-wide default if none is given.
+
+    Args:
+        limiter: An explicit limiter.
+
+    Returns:
+        TransferLimiter | None: The limiter to use, if any.
+    """
+    return limiter or _default_transfer_limiter
+
+
+def list_all_objects(
+    s3_path: str | S3Uri,
+    *,
+    s3_client: S3Client | None = None,
+    session_config: dict | None = None,
+    profile: str | None = None,
+    concurrency: int = 1,
+    limiter: TransferLimiter | None = None
+):
+    """List all objects in an S3 bucket.
+
+    With concurrency above one, the keyspace is partitioned by common prefixes ('/' delimiter)
+    which are then listed in parallel. Objects are yielded as a merged stream, not in key order.
+    A flat keyspace, without '/' below the listed prefix, is still listed sequentially.
+
+    Args:
+        s3_path: The S3 path or S3Uri to list.
+        s3_client: Optional S3 client.
+        session_config: Optional AWS session configuration.
+        profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
+        concurrency: Number of prefixes listed in parallel.
+        limiter: Optional request rate limiter (defaults to the one installed with set_transfer_limiter)
+    """
+    if session_config is None:
+        session_config = {}
+
+    limiter = get_transfer_limiter(limiter)
+
+    if isinstance(s3_path, str):
+        s3_uri = S3Uri(s3_path)
+    else:
+        s3_uri = s3_path
+
+    client = s3_client or get_transfer_s3_client(concurrency, session_config=session_config, profile=profile)
+
+    if concurrency > 1:
+        yield from list_objects_parallel(client, s3_uri.bucket, s3_uri.path, concurrency, limiter)
+        return
+
+    paginator = client.get_paginator('list_objects_v2')
+    page_iterator = paginator.paginate(
+        Bucket=s3_uri.bucket,
+        Prefix=s3_uri.path
+    )
+
+    for page in limited_pages(page_iterator, limiter, s3_uri.path):
+        for obj in page.get('Contents', []):
+            yield dict(obj)
+
+
+def limited_pages(pages: Iterable[dict], limiter: TransferLimiter | None, prefix: str) -> Iterator[dict]:
+    """Pace a paginated S3 listing with a limiter, acquiring one request before each page is fetched.
+
+    Args:
+        pages: The pages of a paginator.
+        limiter: The limiter, or None to pass the pages through.
+        prefix: The listed prefix, which the requests count against.
+
+    Yields:
+        dict: The pages.
+    """
+    if limiter is None:
+        yield from pages
+        return
+
+    limiter.acquire_request(prefix)
+
+    for page in pages:
+        yield page
+
+        if page.get('IsTruncated'):
+            limiter.acquire_request(prefix)
+
+
+# Maximum number of delimiter levels explored to find prefixes for parallel listing
+LIST_PARTITION_MAX_DEPTH = 3
+
+
+def list_objects_parallel(
+    client: S3Client, bucket: str, prefix: str, concurrency: int, limiter: TransferLimiter | None = None
+):
+    """List all objects under a prefix, listing its common prefixes in parallel.
+
+    Common prefixes are discovered breadth-first with the '/' delimiter until there are at least
+    as many as workers (or LIST_PARTITION_MAX_DEPTH levels were explored); objects found along
+    the way are yielded immediately. Each remaining prefix is then listed by a worker, and pages
+    are merged through a bounded queue.
+
+    Only the delimiter structure is used to partition the keyspace: keys are not split into
+    StartAfter ranges, so a flat keyspace gets no parallelism. Prefix discovery itself lists the
+    prefixes of each level one after the other.
+
+    Args:
+        client: The S3 client to use.
+        bucket: The name of the bucket.
+        prefix: The key prefix to list.
+        concurrency: Number of prefixes listed in parallel.
+        limiter: Optional request rate limiter.
+    """
+    paginator = client.get_paginator('list_objects_v2')
+    prefixes = [prefix]
+
+    for _ in range(LIST_PARTITION_MAX_DEPTH):
+        common_prefixes = []
+
+        for partition in prefixes:
+            pages = paginator.paginate(Bucket=bucket, Prefix=partition, Delimiter='/')
+
+            for page in limited_pages(pages, limiter, partition):
+                for obj in page.get('Contents', []):
+                    yield dict(obj)
+
+                common_prefixes.extend(cp['Prefix'] for cp in page.get('CommonPrefixes', []))
+
+        prefixes = common_prefixes
+
+        if not prefixes or len(prefixes) >= concurrency:
+            break
+
+    if not prefixes:
+        return
+
+    logger.debug(f'Listing {len(prefixes)} prefixes of s3://{bucket}/{prefix} in parallel')
+
+    pages = queue.Queue(maxsize=2 * concurrency)
+    stop = threading.Event()
+
+    def list_partition(partition):
+        for page in limited_pages(paginator.paginate(Bucket=bucket, Prefix=partition), limiter, partition):
+            while True:
+                if stop.is_set():
+                    return
+
+                try:
+                    pages.put(page.get('Contents', []), timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = {executor.submit(list_partition, partition) for partition in prefixes}
+
+        try:
+            while pending or not pages.empty():
+                try:
+                    contents = pages.get(timeout=0.1)
+                except queue.Empty:
+                    done = {future for future in pending if future.done()}
+
+                    # Propagate listing errors
+                    for future in done:
+                        future.result()
+
+                    pending -= done
+                    continue
+
+                for obj in contents:
+                    yield dict(obj)
+        finally:
+            # Let workers exit if the consumer stops early or a listing fails
+            stop.set()
+
+
+# Maximum number of keys accepted by a single DeleteObjects request
+DELETE_OBJECTS_BATCH_SIZE = 1000
+
+
+def delete_bucket_contents(
+    client, bucket_name, *, concurrency: int = 10, max_retries: int = 3, limiter: TransferLimiter | None = None
+) -> dict:
+    """Deletes all objects and object versions from the specified S3 bucket.
+
+    Object versions and delete markers are collected from the list_object_versions pages into
+    batches of up to 1000 keys, which are deleted with DeleteObjects by a pool of workers while
+    listing continues. Keys reported as failed, and whole requests failing with a transient error
+    (e.g. SlowDown or InternalError), are retried up to max_retries times with jittered backoff.
+    Batches whose requests still fail transiently are reported as failed rather than aborting the run.
+
+    Args:
+        client (S3Client): The S3 client to use.
+        bucket_name (str): The name of the bucket to empty.
+        concurrency (int): Number of concurrent DeleteObjects requests.
+        max_retries (int): Number of retries for keys or requests that failed to delete.
+        limiter (TransferLimiter): Optional request rate limiter (defaults to the one installed with
+            set_transfer_limiter), counting one request per listed page and per deleted key.
+
+    Returns:
+        dict: A summary of the operation:
+
+        {
+            'deleted': int,
+            'failed': [{'Key': str, 'VersionId': str, 'Code': str, 'Message': str}]
+        }
+    """
+    logger.debug(f'Deleting all objects in bucket: {bucket_name}')
+    limiter = get_transfer_limiter(limiter)
+
+    def delete_batch(batch):
+        pending = batch
+        errors = []
+
+        for attempt in range(max_retries + 1):
+            if attempt > 0:
+                logger.debug(f'Retrying deletion of {len(pending)} keys (attempt {attempt})')
+                time.sleep(min(2 ** attempt * 0.1, 5) * random.uniform(0.5, 1.5))
+
+            if limiter:
+                limiter.acquire_keys(obj['Key'] for obj in pending)
+
+            try:
+                response = client.delete_objects(
+                    Bucket=bucket_name,
+                    Delete={'Objects': pending, 'Quiet': True}
+                )
+            except ClientError as e:
+                if not is_transient_error(e):
+                    raise
+
+                # The whole request failed, so every pending key is still there
+                error = e.response['Error']
+                errors = [{**obj, 'Code': error.get('Code'), 'Message': error.get('Message')} for obj in pending]
+                logger.debug(f'DeleteObjects failed with a transient error: {e}')
+                continue
+
+            errors = response.get('Errors', [])
+
+            if not errors:
+                break
+
+            failed_keys = {(error['Key'], error.get('VersionId')) for error in errors}
+            pending = [obj for obj in pending if (obj['Key'], obj.get('VersionId')) in failed_keys]
+
+        logger.debug(f'Deleted {len(batch) - len(errors)} of {len(batch)} keys')
+        return len(batch) - len(errors), errors
+
+    def version_batches():
+        paginator = client.get_paginator('list_object_versions')
+        batch = []
+
+        for page in limited_pages(paginator.paginate(Bucket=bucket_name), limiter, ''):
+            # Both object versions and delete markers are removed by version ID
+            for version in page.get('Versions', []) + page.get('DeleteMarkers', []):
+                batch.append({'Key': version['Key'], 'VersionId': version['VersionId']})
+
+                if len(batch) == DELETE_OBJECTS_BATCH_SIZE:
+                    yield (batch,)
+                    batch = []
+
+        if batch:
+            yield (batch,)
+
+    summary = {'deleted': 0, 'failed': []}
+
+    # Bound the number of queued batches so listing does not outrun deletion
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in submit_bounded(executor, delete_batch, version_batches(), 2 * concurrency):
+            deleted, errors = future.result()
+            summary['deleted'] += deleted
+            summary['failed'].extend(errors)
+
+    logger.debug(f'Deleted {summary["deleted"]} keys, failed to delete {len(summary["failed"])} keys')
+    return summary
+
+
+def delete_bucket(client, bucket_name):
+    """Deletes the specified S3 bucket after emptying it.
+
+    Args:
+        client (S3Client): The S3 client to use.
+        bucket_name (str): The name of the bucket to delete.
+    """
+
+    # Delete the bucket
+    logger.debug(f'Deleting bucket: {bucket_name}')
+    client.delete_bucket(Bucket=bucket_name)
+    logger.debug(f'Bucket {bucket_name} has been deleted successfully')
+
+
+def get_transfer_s3_client(
+    concurrency: int,
+    *,
+    session_config: dict | None = None,
+    profile: str | None = None
+) -> S3Client:
+    """Get an S3 client with a connection pool sized for the given number of concurrent requests.
+
+    The pool never shrinks below botocore's default, so low concurrencies (e.g. a sequential listing
+    whose client is then shared with other threads) keep the usual number of connections. The client
+    uses botocore's adaptive retry mode, which backs off and rate-limits itself client-side when S3
+    responds with SlowDown or other throttling errors.
+
+    Args:
+        concurrency: Number of concurrent requests the client is expected to serve.
+        session_config: Configuration for the AWS session (profile, region, etc.)
+        profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
+
+    Returns:
+        S3Client: A Boto3 S3 client.
+    """
+    if session_config is None:
+        session_config = {}
+
+    boto_config = {
+        'max_pool_connections': max(int(1.5 * concurrency), MAX_POOL_CONNECTIONS),
+        'retries': {'mode': 'adaptive', 'max_attempts': 10}
+    }
+
+    return get_s3_client(session_config, profile=profile, core_config=boto_config)
+
+
+# Per-thread count of retries performed by botocore for the requests of the current transfer
+_request_stats = threading.local()
+
+
+def _record_retry_attempts(parsed=None, **kwargs):
+    """Botocore after-call handler accumulating retry attempts for the current thread."""
+    if parsed:
+        attempts = parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+        _request_stats.retries = getattr(_request_stats, 'retries', 0) + attempts
+
+
+def _take_retry_attempts() -> int:
+    """Return and reset the retry attempts recorded for the current thread."""
+    retries = getattr(_request_stats, 'retries', 0)
+    _request_stats.retries = 0
+    return retries
+
+
+# Per-thread ETag that the HEAD and GET requests of the current download must match, see pinned_etag
+_pinned_etags = threading.local()
+
+# Transfer configuration of pinned downloads, whose requests must run in the calling thread
+PINNED_TRANSFER_CONFIG = TransferConfig(use_threads=False)
+
+
+def _apply_pinned_etag(params, **kwargs):
+    """Botocore before-parameter-build handler adding the current thread's pinned ETag as IfMatch."""
+    etag = getattr(_pinned_etags, 'etag', None)
+
+    if etag is not None:
+        params['IfMatch'] = etag
+
+
+@contextmanager
+def pinned_etag(client: S3Client, etag: str):
+    """Make the HeadObject and GetObject requests of the client in the current thread require an ETag.
+
+    The managed download_file does not accept IfMatch, so the condition is added by a request handler.
+    Downloads must run their requests in the calling thread (see PINNED_TRANSFER_CONFIG). A changed
+    object then fails with a 412 error (see is_precondition_failed) instead of being read.
+
+    Args:
+        client: The S3 client of the download.
+        etag: The ETag the object must match.
+    """
+    for operation in ('HeadObject', 'GetObject'):
+        client.meta.events.register(
+            f'before-parameter-build.s3.{operation}', _apply_pinned_etag, unique_id=f'botobuddy-pinned-etag-{operation}'
+        )
+
+    _pinned_etags.etag = etag
+
+    try:
+        yield
+    finally:
+        _pinned_etags.etag = None
+
+
+def is_precondition_failed(error: BaseException | None) -> bool:
+    """Check whether an error is a 412 response to a conditional request.
+
+    HEAD errors carry no error code, and the managed transfers may wrap the ClientError of a failed
+    GET in their own exception, so the chain of causes is checked.
+    """
+    while error is not None and not isinstance(error, ClientError):
+        error = error.__cause__ or error.__context__
+
+    return error is not None and error.response['Error']['Code'] in ('PreconditionFailed', '412')
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """Return the nearest-rank percentile of a sorted list, or 0 if it is empty."""
+    if not values:
+        return 0.0
+
+    rank = max(math.ceil(percent * len(values) / 100) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+class TransferMetrics:
+    """Thread-safe collector of per-object S3 transfer metrics.
+
+    Every completed object is recorded with its size, duration, retries and first-byte latency.
+    Aggregate throughput and latency percentiles are available from summary(), and callbacks can
+    follow progress live (e.g. to drive a progress bar).
+    """
+
+    def __init__(
+        self,
+        on_object: Callable[[dict], None] | None = None,
+        on_bytes: Callable[[int], None] | None = None
+    ):
+        """Initialize TransferMetrics.
+
+        Args:
+            on_object: Optional callback invoked with the record of every completed object:
+                {'key': str, 'bytes': int, 'duration': float, 'retries': int, 'first_byte_latency': float}
+            on_bytes: Optional callback invoked with the number of bytes as they are transferred.
+        """
+        self.on_object = on_object
+        self.on_bytes = on_bytes
+        self.objects = 0
+        self.bytes = 0
+        self.retries = 0
+        self.started = time.monotonic()
+        self._durations = []
+        self._first_byte_latencies = []
+        self._lock = threading.Lock()
+
+    def add_bytes(self, count: int):
+        """Report bytes transferred so far for an object in progress."""
+        if self.on_bytes:
+            self.on_bytes(count)
+
+    def record(self, key: str, size: int, duration: float, retries: int = 0, first_byte_latency: float | None = None):
+        """Record a completed object transfer.
+
+        Args:
+            key: The object key.
+            size: The number of bytes transferred.
+            duration: The transfer duration in seconds.
+            retries: The number of request retries.
+            first_byte_latency: Seconds from the start of the transfer to the first byte received.
+        """
+        record = {
+            'key': key,
+            'bytes': size,
+            'duration': duration,
+            'retries': retries,
+            'first_byte_latency': first_byte_latency if first_byte_latency is not None else duration,
+        }
+
+        with self._lock:
+            self.objects += 1
+            self.bytes += size
+            self.retries += retries
+            self._durations.append(duration)
+            self._first_byte_latencies.append(record['first_byte_latency'])
+
+        if self.on_object:
+            self.on_object(record)
+
+    def summary(self) -> dict:
+        """Return aggregate metrics of the transfers recorded so far.
+
+        Returns:
+            dict: A dictionary with the following keys:
+
+            {
+                'objects': int,
+                'bytes': int,
+                'retries': int,
+                'elapsed_seconds': float,
+                'mb_per_second': float,
+                'duration': {'p50': float, 'p95': float, 'p99': float, 'max': float},
+                'first_byte_latency': {'p50': float, 'p95': float, 'p99': float, 'max': float}
+            }
+        """
+        with self._lock:
+            durations = sorted(self._durations)
+            first_byte_latencies = sorted(self._first_byte_latencies)
+            objects, size, retries = self.objects, self.bytes, self.retries
+
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+
+        def distribution(values):
+            return {
+                'p50': _percentile(values, 50),
+                'p95': _percentile(values, 95),
+                'p99': _percentile(values, 99),
+                'max': values[-1] if values else 0.0,
+            }
+
+        return {
+            'objects': objects,
+            'bytes': size,
+            'retries': retries,
+            'elapsed_seconds': elapsed,
+            'mb_per_second': size / elapsed / (1024 * 1024),
+            'duration': distribution(durations),
+            'first_byte_latency': distribution(first_byte_latencies),
+        }
+
+    def dump_json(self, path: Path):
+        """Write the summary as JSON to the given path."""
+        path.write_text(json.dumps(self.summary(), indent=2))
+
+
+# Base and maximum delays in seconds for retrying transient download errors
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30
+
+TRANSIENT_ERROR_CODES = {
+    'SlowDown',
+    'InternalError',
+    'ServiceUnavailable',
+    'RequestTimeout',
+    'RequestTimeTooSkewed',
+    'Throttling',
+    'ThrottlingException',
+}
+
+
+def is_transient_error(error: BaseException | None) -> bool:
+    """Check whether an S3 transfer error is worth retrying.
+
+    Args:
+        error: The exception raised by the transfer.
+
+    Returns:
+        bool: True for throttling, server-side and network errors.
+    """
+    # upload_file re-raises client errors as S3UploadFailedError, keeping the original as context
+    if isinstance(error, S3UploadFailedError):
+        error = error.__cause__ or error.__context__
+
+    if isinstance(error, ClientError):
+        code = error.response.get('Error', {}).get('Code')
+        status = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0)
+        return code in TRANSIENT_ERROR_CODES or status >= 500
+
+    return isinstance(error, (
+        BotoConnectionError, HTTPClientError, IncompleteReadError, ResponseStreamingError, RetriesExceededError
+    ))
+
+
+# Objects at or above this size are downloaded as parallel byte ranges when their size is known
+RANGED_DOWNLOAD_THRESHOLD = 256 * 1024 * 1024
+
+# Size of each byte range of a ranged download
+RANGED_DOWNLOAD_CHUNK_SIZE = 64 * 1024 * 1024
+
+
+class RangedDownload:
+    """A download of a single large object split into byte ranges that are fetched in parallel.
+
+    The ranges are written into a preallocated temporary file next to the destination, which is
+    moved into place once the last range completes. Every range is requested with If-Match on the
+    object's ETag, so an object overwritten mid-download fails with a precondition error instead of
+    being stitched together from two versions.
+    """
+
+    def __init__(
+        self,
+        client: S3Client,
+        bucket: str,
+        key: str,
+        local_path: Path,
+        size: int,
+        chunk_size: int = RANGED_DOWNLOAD_CHUNK_SIZE,
+        on_complete: Callable[[str, str, Path], None] | None = None,
+        limiter: TransferLimiter | None = None,
+        metrics: TransferMetrics | None = None,
+        etag: str | None = None
+    ):
+        """Initialize RangedDownload and preallocate the temporary file.
+
+        Args:
+            client: The S3 client to use.
+            bucket: The name of the bucket.
+            key: The object key.
+            local_path: The destination path.
+            size: The size of the object in bytes.
+            chunk_size: The size of each byte range.
+            on_complete: Optional callback invoked with (bucket, key, local_path) once the whole object is downloaded.
+            limiter: Optional limiter for bandwidth and request rate.
+            metrics: Optional collector the whole object is recorded to once downloaded.
+            etag: The ETag the ranges must match, so they all come from the same object version.
+                If not given, it is read with a HEAD request before the first range.
+        """
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.local_path = local_path
+        self.size = size
+        self.chunk_size = chunk_size
+        self.on_complete = on_complete
+        self.limiter = limiter
+        self.metrics = metrics
+        self.etag = etag
+        self.started = None
+        self.first_byte_latency = None
+        self.retries = 0
+        self.temp_path = local_path.with_name(local_path.name + '.botobuddy-part')
+        self.remaining = len(self.ranges())
+        self.failed = False
+        self._lock = threading.Lock()
+
+        with open(self.temp_path, 'wb') as f:
+            f.truncate(size)
+
+    def ranges(self) -> list[tuple[int, int]]:
+        """Return the inclusive (start, end) byte ranges of the object."""
+        return [
+            (start, min(start + self.chunk_size, self.size) - 1)
+            for start in range(0, self.size, self.chunk_size)
+        ]
+
+    def pinned_etag(self) -> str:
+        """Return the ETag every range must match, reading it from the object if it is not known yet."""
+        with self._lock:
+            if self.etag is None:
+                self.etag = self.client.head_object(Bucket=self.bucket, Key=self.key)['ETag']
+
+            return self.etag
+
+    def fail(self) -> bool:
+        """Abandon the download and remove the temporary file.
+
+        Returns:
+            bool: True for the first call, so the failure is reported once per object.
+        """
+        with self._lock:
+            if self.failed:
+                return False
+
+            self.failed = True
+
+        self.temp_path.unlink(missing_ok=True)
+        return True
+
+    def download_range(self, start: int, end: int) -> str | None:
+        """Download one byte range and write it at its offset in the temporary file.
+
+        Args:
+            start: The first byte of the range.
+            end: The last byte of the range (inclusive).
+
+        Returns:
+            str | None: 'succeeded' once the last range completed the object, 'skipped' if the
+                download was abandoned, None otherwise.
+
+        Raises:
+            UserWarning: If the object changed since the download started.
+        """
+        if self.failed:
+            return 'skipped'
+
+        etag = self.pinned_etag()
+
+        if self.limiter:
+            self.limiter.acquire_request(self.key)
+
+        with self._lock:
+            if self.started is None:
+                self.started = time.monotonic()
+
+        _take_retry_attempts()
+
+        try:
+            response = self.client.get_object(
+                Bucket=self.bucket, Key=self.key, Range=f'bytes={start}-{end}', IfMatch=etag
+            )
+        except ClientError as e:
+            if not is_precondition_failed(e):
+                raise
+
+            raise UserWarning(f'{self.key} changed during the download (no longer matches ETag {etag})') from e
+
+        retries = _take_retry_attempts()
+
+        with open(self.temp_path, 'r+b') as f:
+            f.seek(start)
+
+            for chunk in response['Body'].iter_chunks(1024 * 1024):
+                if self.first_byte_latency is None:
+                    self.first_byte_latency = time.monotonic() - self.started
+
+                if self.limiter:
+                    self.limiter.acquire_bytes(len(chunk))
+
+                if self.metrics:
+                    self.metrics.add_bytes(len(chunk))
+
+                f.write(chunk)
+
+        with self._lock:
+            self.retries += retries
+            self.remaining -= 1
+            finished = self.remaining == 0
+
+        if not finished:
+            logger.debug(f'Downloaded bytes {start}-{end} of {self.key}')
+            return None
+
+        os.replace(self.temp_path, self.local_path)
+
+        if self.metrics:
+            self.metrics.record(
+                self.key, self.size, time.monotonic() - self.started, self.retries, self.first_byte_latency
+            )
+
+        if self.on_complete:
+            self.on_complete(self.bucket, self.key, self.local_path)
+
+        logger.debug(f'Successfully downloaded {self.key} in {len(self.ranges())} ranges')
+        return 'succeeded'
+
+
+def fast_download_s3_files(
+    targets: Iterable[tuple],
+    *,
+    skip_existing: bool = False,
+    create_folders: bool = True,
+    concurrency: int = 10,
+    session_config: dict | None = None,
+    profile: str | None = None,
+    on_complete: Callable[[str, str, Path], None] | None = None,
+    range_threshold: int = RANGED_DOWNLOAD_THRESHOLD,
+    range_chunk_size: int = RANGED_DOWNLOAD_CHUNK_SIZE,
+    limiter: TransferLimiter | None = None,
+    metrics: TransferMetrics | None = None,
+    max_retries: int = 3,
+    on_result: Callable[[dict], None] | None = None,
+    processes: int = 1,
+    cache: ObjectCache | None = None
+) -> dict:
+    '''Download a list of files from S3 in parallel.
+
+    Targets are consumed lazily with a bounded number of downloads in flight, so a generator
+    (e.g. one fed by a paginated listing) starts downloading before it is exhausted.
+
+    Objects whose size is given and at least range_threshold are split into byte ranges of
+    range_chunk_size, which are downloaded by the same worker pool as whole files, so large and
+    small objects share one concurrency budget.
+
+    With a cache (explicit or installed with set_object_cache), objects are materialized from the local
+    object cache when their ETag matches, and downloaded objects are added to it. Targets without an
+    ETag are looked up with a HEAD request.
+
+    A failed download does not abort the others. Transient errors are put on a retry queue that is
+    processed after each pass with jittered exponential backoff, up to max_retries times. Files are
+    written to temporary files and renamed into place, so partial downloads never look complete.
+
+    Args:
+        targets: Iterable of tuples containing (bucket, key, local_path), (bucket, key, local_path, size)
+            or (bucket, key, local_path, size, etag). The size may be None.
+        skip_existing: Skip files that already exist locally
+        create_folders: Create the folders for the files
+        concurrency: Number of concurrent downloads
+        session_config: Configuration for the AWS session (profile, region, etc.)
+        profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
+        on_complete: Optional callback invoked with (bucket, key, local_path) from the worker
+            thread after each successful download
+        range_threshold: Size in bytes from which an object is downloaded in byte ranges
+        range_chunk_size: Size in bytes of each byte range
+        limiter: Optional bandwidth and request rate limiter (defaults to the one installed with set_transfer_limiter)
+        metrics: Optional collector of per-object transfer metrics
+        max_retries: Number of retries for transient errors
+        on_result: Optional callback invoked from the calling thread with the result of every target:
+            {'bucket': str, 'key': str, 'local_path': Path, 'status': 'succeeded' | 'skipped' | 'failed',
+            'error': str | None}
+        processes: Number of worker processes. Above one, targets are sharded in batches across
+            processes, each downloading with its own client and concurrency threads (see download_with_processes)
+        cache: Optional local object cache (defaults to the one installed with set_object_cache)
+
+    Returns:
+        dict: A summary of the downloads, listing the failed targets:
+
+        {
+            'succeeded': int,
+            'skipped': int,
+            'failed': [{'bucket': str, 'key': str, 'local_path': Path, 'error': str}]
+        }
+    '''
+    if processes > 1:
+        return download_with_processes(
+            targets,
+            processes=processes,
+            skip_existing=skip_existing,
+            create_folders=create_folders,
+            concurrency=concurrency,
+            session_config=session_config,
+            profile=profile,
+            on_complete=on_complete,
+            range_threshold=range_threshold,
+            range_chunk_size=range_chunk_size,
+            limiter=limiter,
+            metrics=metrics,
+            max_retries=max_retries,
+            on_result=on_result,
+            cache=cache
+        )
+
+    client = get_transfer_s3_client(concurrency, session_config=session_config, profile=profile)
+    client.meta.events.register('after-call.s3', _record_retry_attempts, unique_id='botobuddy-retry-attempts')
+    transfer_config = TransferConfig(use_threads=False)
+    limiter = get_transfer_limiter(limiter)
+    cache = get_object_cache(cache)
+
+    logger.debug(f'Fast downloading files with concurrency {concurrency}')
+
+    folders = set()
+    folders_lock = threading.Lock()
+
+    def create_folder(local_path):
+        with folders_lock:
+            if local_path.parent not in folders:
+                logger.debug(f'Creating folder {local_path.parent}')
+                local_path.parent.mkdir(parents=True, exist_ok=True)
+                folders.add(local_path.parent)
+
+    def transfer(bucket_name, key, local_path, etag):
+        if limiter:
+            limiter.acquire_request(key)
+
+        started = time.monotonic()
+        first_byte_latency = None
+        transferred = 0
+
+        def callback(count):
+            nonlocal first_byte_latency, transferred
+
+            if first_byte_latency is None:
+                first_byte_latency = time.monotonic() - started
+
+            transferred += count
+
+            if limiter:
+                limiter.acquire_bytes(count)
+
+            if metrics:
+                metrics.add_bytes(count)
+
+        _take_retry_attempts()
+
+        # Cached downloads are pinned to the ETag they are cached under
+        with pinned_etag(client, etag) if etag else nullcontext():
+            client.download_file(
+                bucket_name, key, str(local_path), Config=transfer_config, Callback=callback
+            )
+
+        if metrics:
+            metrics.record(key, transferred, time.monotonic() - started, _take_retry_attempts(), first_byte_latency)
+
+    def download_file(bucket_name, key, local_path, etag=None):
+        if skip_existing and local_path.exists():
+            logger.debug(f'Skipping {key} because it already exists')
+            return 'skipped'
+
+        if create_folders:
+            create_folder(local_path)
+
+        if not cache:
+            transfer(bucket_name, key, local_path, None)
+        else:
+            # An object overwritten since its ETag was listed is a cache miss, looked up again under its new ETag
+            for attempt in range(2):
+                if etag is None:
+                    etag = client.head_object(Bucket=bucket_name, Key=key)['ETag']
+
+                if cache.fetch(bucket_name, key, etag, local_path):
+                    break
+
+                try:
+                    transfer(bucket_name, key, local_path, etag)
+                except Exception as e:
+                    if attempt or not is_precondition_failed(e):
+                        raise
+
+                    logger.debug(f'{key} changed since its ETag {etag} was read, looking it up again')
+                    etag = None
+                    continue
+
+                cache.put(bucket_name, key, etag, local_path)
+                break
+
+        if on_complete:
+            on_complete(bucket_name, key, local_path)
+
+        logger.debug(f'Successfully downloaded {key}')
+        return 'succeeded'
+
+    results = {'succeeded': 0, 'skipped': 0, 'failed': []}
+
+    def report(bucket_name, key, local_path, status, error=None):
+        if status == 'failed':
+            logger.warning(f'Failed to download {key}: {error}')
+            results['failed'].append({'bucket': bucket_name, 'key': key, 'local_path': local_path, 'error': error})
+        else:
+            results[status] += 1
+
+        if on_result:
+            on_result({'bucket': bucket_name, 'key': key, 'local_path': local_path, 'status': status, 'error': error})
+
+    def cache_ranged(etag, bucket_name, key, local_path):
+        cache.put(bucket_name, key, etag, local_path)
+
+        if on_complete:
+            on_complete(bucket_name, key, local_path)
+
+    # Work items are (task, bucket, key, local_path, ranged download or None)
+    def work_items():
+        for target in targets:
+            bucket_name, key, local_path = target[0], target[1], Path(target[2])
+            size = target[3] if len(target) > 3 else None
+            etag = target[4] if len(target) > 4 else None
+
+            if (
+                size is None or size < range_threshold or (skip_existing and local_path.exists())
+                or (cache and (etag is None or cache.has(bucket_name, key, etag)))
+            ):
+                task = partial(download_file, bucket_name, key, local_path, etag)
+                yield (task, bucket_name, key, local_path, None)
+                continue
+
+            try:
+                if create_folders:
+                    create_folder(local_path)
+
+                ranged = RangedDownload(
+                    client, bucket_name, key, local_path, size,
+                    chunk_size=range_chunk_size,
+                    on_complete=partial(cache_ranged, etag) if cache else on_complete,
+                    limiter=limiter,
+                    metrics=metrics,
+                    etag=etag
+                )
+            except OSError as e:
+                report(bucket_name, key, local_path, 'failed', str(e))
+                continue
+
+            logger.debug(f'Downloading {key} ({size} bytes) in {ranged.remaining} ranges')
+
+            for start, end in ranged.ranges():
+                yield (partial(ranged.download_range, start, end), bucket_name, key, local_path, ranged)
+
+    def run(item, attempt):
+        if attempt > 0:
+            # Spread retries out so they do not hit S3 in lockstep
+            time.sleep(random.uniform(0, RETRY_BASE_DELAY))
+
+        try:
+            return item, item[0](), None
+        except Exception as e:
+            return item, 'failed', e
+
+    items = ((item, 0) for item in work_items())
+    attempt = 0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while True:
+            retry_queue = []
+
+            for future in submit_bounded(executor, run, items, 2 * concurrency):
+                item, status, error = future.result()
+                _, bucket_name, key, local_path, ranged = item
+
+                if status == 'failed' and attempt < max_retries and is_transient_error(error):
+                    logger.debug(f'Transient error downloading {key}, queued for retry: {error}')
+                    retry_queue.append(item)
+                elif status == 'failed':
+                    if ranged is None or ranged.fail():
+                        report(bucket_name, key, local_path, 'failed', str(error))
+                elif status == 'succeeded' or (status == 'skipped' and ranged is None):
+                    report(bucket_name, key, local_path, status)
+
+            if not retry_queue:
+                break
+
+            attempt += 1
+            delay = min(RETRY_BASE_DELAY * 2 ** attempt, RETRY_MAX_DELAY) * random.uniform(0.5, 1.5)
+            logger.info(f'Retrying {len(retry_queue)} failed downloads in {delay:.1f}s (attempt {attempt})')
+            time.sleep(delay)
+            items = ((item, attempt) for item in retry_queue)
+
+    return results
+
+
+# Number of targets sent to a worker process at a time
+PROCESS_BATCH_SIZE = 100
+
+# Seconds between checks that download worker processes are still alive while waiting for their results
+WORKER_POLL_INTERVAL = 1.0
+
+
+def _download_worker(index: int, tasks, events, limits: dict | None, with_metrics: bool, options: dict):
+    """Run one fast_download_s3_files pool in a worker process, fed with batches from the task queue until None.
+
+    Results and per-object metrics are sent over the event queue as they complete, followed by
+    ('done', (index, error)) once the queue is exhausted or the worker failed.
+    """
+    error = None
+
+    def targets():
+        while (batch := tasks.get()) is not None:
+            yield from batch
+
+    try:
+        fast_download_s3_files(
+            targets(),
+            limiter=TransferLimiter(**limits) if limits else None,
+            metrics=TransferMetrics(on_object=lambda record: events.put(('metrics', record))) if with_metrics else None,
+            on_result=lambda result: events.put(('result', result)),
+            **options
+        )
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+
+    events.put(('done', (index, error)))
+
+
+def download_with_processes(
+    targets: Iterable[tuple],
+    *,
+    processes: int,
+    batch_size: int = PROCESS_BATCH_SIZE,
+    on_complete: Callable[[str, str, Path], None] | None = None,
+    limiter: TransferLimiter | None = None,
+    metrics: TransferMetrics | None = None,
+    on_result: Callable[[dict], None] | None = None,
+    **options
+) -> dict:
+    """Download files from S3 with fast_download_s3_files running in a pool of worker processes.
+
+    Request signing and response parsing are CPU-bound, so a single process tops out on the GIL with many
+    small objects. Each worker runs a single download pool for its whole lifetime, with its own clients and
+    connection pools, and pulls batches of targets from a shared queue as its pool needs more work, so the
+    slowest objects of a batch never hold back the next one. Targets are consumed lazily, with at most two
+    batches queued per process.
+
+    Callbacks run in the calling process as results arrive: on_complete and on_result for every target,
+    metrics for every completed object (object-level byte progress). Limits are split evenly between the
+    processes.
+
+    Args:
+        targets: Iterable of tuples containing (bucket, key, local_path) or (bucket, key, local_path, size)
+        processes: Number of worker processes
+        batch_size: Number of targets sent to a worker at a time
+        on_complete: Optional callback invoked with (bucket, key, local_path) after each successful download
+        limiter: Optional bandwidth and request rate limiter (defaults to the one installed with set_transfer_limiter)
+        metrics: Optional collector of per-object transfer metrics
+        on_result: Optional callback invoked with the result of every target (see fast_download_s3_files)
+        **options: Arguments of fast_download_s3_files used by each worker (e.g. concurrency, session_config)
+
+    Returns:
+        dict: A summary of the downloads, as returned by fast_download_s3_files.
+
+    Raises:
+        UserWarning: If a worker process failed or exited unexpectedly.
+    """
+    limiter = get_transfer_limiter(limiter)
+    limits = None
+
+    # Workers do not inherit the default cache, hand it over explicitly
+    options['cache'] = get_object_cache(options.get('cache'))
+
+    if limiter:
+        limits = {name: value / processes for name, value in limiter.limits.items() if value}
+
+    # Spawn rather than fork, as the parent holds clients and listing threads that are not fork-safe
+    context = multiprocessing.get_context('spawn')
+    tasks = context.Queue(maxsize=2 * processes)
+    events = context.Queue()
+
+    workers = [
+        context.Process(
+            target=_download_worker, args=(index, tasks, events, limits, metrics is not None, options), daemon=True
+        )
+        for index in range(processes)
+    ]
+
+    feed_errors = []
+
+    def feed():
+        try:
+            for batch in batched(targets, batch_size):
+                tasks.put(list(batch))
+        except Exception as e:
+            feed_errors.append(e)
+        finally:
+            for _ in workers:
+                tasks.put(None)
+
+    logger.debug(f'Downloading files with {processes} processes')
+
+    for worker in workers:
+        worker.start()
+
+    # The feeder may block on a full queue if the workers die, so it must not keep the process alive
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+
+    results = {'succeeded': 0, 'skipped': 0, 'failed': []}
+    finished = {}
+    lost = set()
+
+    try:
+        while len(finished) < processes:
+            try:
+                kind, payload = events.get(timeout=WORKER_POLL_INTERVAL)
+            except queue.Empty:
+                # A worker that exited without reporting gets one more interval for its last events to arrive
+                exited = {index for index, worker in enumerate(workers) if worker.exitcode is not None} - set(finished)
+
+                if exited & lost:
+                    raise UserWarning(f'Download worker process {min(exited & lost)} exited unexpectedly')
+
+                lost = exited
+                continue
+
+            if kind == 'metrics':
+                metrics.add_bytes(payload['bytes'])
+                metrics.record(
+                    payload['key'], payload['bytes'], payload['duration'], payload['retries'],
+                    payload['first_byte_latency']
+                )
+            elif kind == 'result':
+                if payload['status'] == 'failed':
+                    results['failed'].append({k: payload[k] for k in ('bucket', 'key', 'local_path', 'error')})
+                else:
+                    results[payload['status']] += 1
+
+                if payload['status'] == 'succeeded' and on_complete:
+                    on_complete(payload['bucket'], payload['key'], payload['local_path'])
+
+                if on_result:
+                    on_result(payload)
+            else:
+                index, error = payload
+                finished[index] = error
+    finally:
+        for worker in workers:
+            if len(finished) < processes:
+                worker.terminate()
+
+            worker.join()
+
+    errors = [error for error in finished.values() if error]
+
+    if errors:
+        raise UserWarning(f'Download worker process failed: {errors[0]}')
+
+    if feed_errors:
+        raise feed_errors[0]
+
+    return results
+
+
+# Name of the manifest file kept in the local directory by incremental syncs
+SYNC_MANIFEST_NAME = '.botobuddy-sync.json'
+
+
+def load_sync_manifest(local_dir: Path) -> dict:
+    """Load the incremental sync manifest of a local directory.
+
+    Args:
+        local_dir: The local sync directory.
+
+    Returns:
+        dict: A mapping from S3 key to {'size', 'etag', 'last_modified'}, empty if there is no manifest.
+    """
+    manifest_path = local_dir / SYNC_MANIFEST_NAME
+
+    if not manifest_path.exists():
+        return {}
+
+    try:
+        return json.loads(manifest_path.read_text())
+    except (OSError, json.JSONDecodeError):
+        logger.warning(f'Ignoring unreadable sync manifest {manifest_path}')
+        return {}
+
+
+def save_sync_manifest(local_dir: Path, manifest: dict):
+    """Atomically save the incremental sync manifest of a local directory.
+
+    Args:
+        local_dir: The local sync directory.
+        manifest: A mapping from S3 key to {'size', 'etag', 'last_modified'}.
+    """
+    manifest_path = local_dir / SYNC_MANIFEST_NAME
+    temp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+    temp_path.write_text(json.dumps(manifest))
+    os.replace(temp_path, manifest_path)
+
+
+def is_unchanged(obj: dict, local_path: Path, manifest_entry: dict | None) -> bool:
+    """Check whether a local file is an up-to-date copy of an S3 object.
+
+    The local file must have the object's size and a modification time equal to the object's
+    LastModified (set when the file was downloaded). When the manifest has an entry for the
+    object, its ETag must also match, which catches same-size overwrites within one second.
+
+    Args:
+        obj: The S3 object as returned by list_all_objects.
+        local_path: The local copy of the object.
+        manifest_entry: The manifest entry recorded when the object was last downloaded, if any.
+
+    Returns:
+        bool: True if the object does not need to be downloaded.
+    """
+    try:
+        stat = local_path.stat()
+    except FileNotFoundError:
+        return False
+
+    if stat.st_size != obj['Size'] or int(stat.st_mtime) != int(obj['LastModified'].timestamp()):
+        return False
+
+    if manifest_entry is not None and manifest_entry.get('etag') != obj['ETag']:
+        return False
+
+    return True
+
+
+def sync_folder_from_s3(
+    s3_uri: str | S3Uri,
+    local_dir: Path,
+    *,
+    session_config: dict | None = None,
+    profile: str | None = None,
+    recursive: bool = False,
+    skip_existing: bool = True,
+    incremental: bool = False,
+    delete: bool = False,
+    concurrency: int = 10,
+    list_concurrency: int = 1,
+    limiter: TransferLimiter | None = None,
+    metrics: TransferMetrics | None = None,
+    engine: str = 'threads',
+    processes: int = 1,
+    cache: ObjectCache | None = None
+) -> dict:
+    '''Recursively download a folder from S3 using fast_download_s3_files
+
+    Args:
+        s3_uri: S3 URI to the folder
+        local_dir: Local directory to save the folder
+        session_config: Configuration for the AWS session.
+        profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
+        recursive: Recursively download the folder
+        skip_existing: Skip files that already exist locally (ignored when incremental)
+        incremental: Only download objects whose size, LastModified or ETag differ from the local copy,
+            tracked in a manifest file in local_dir
+        delete: Delete local files that no longer exist in S3 (keeps the set of listed paths in memory)
+        concurrency: Number of concurrent downloads
+        list_concurrency: Number of prefixes listed in parallel (see list_all_objects)
+        limiter: Optional bandwidth and request rate limiter (threads engine only)
+        metrics: Optional collector of per-object transfer metrics
+        engine: 'threads' to download with fast_download_s3_files, or 'asyncio' to download with
+            aios3.download_files on an event loop (requires aiohttp, no byte-range downloads)
+        processes: Number of download worker processes, each with concurrency threads (threads engine only)
+        cache: Optional local object cache, defaults to the one installed with set_object_cache (threads engine only)
+
+    Returns:
+        dict: A summary of the sync:
+
+        {
+            'downloaded': int,
+            'skipped': int,
+            'deleted': int,
+            'bytes_downloaded': int,
+            'bytes_saved': int,
+            'failed': [{'bucket': str, 'key': str, 'local_path': Path, 'error': str}]
+        }
+
+    Note: This function always preserves the folder structure in the local directory,
+        including filenames.
+    '''
+    if session_config is None:
+        session_config = {}
+
+    if isinstance(s3_uri, str):
+        s3_uri = S3Uri(s3_uri)
+
+    _check_engine(engine, limiter)
+
+    if engine == 'asyncio' and processes > 1:
+        raise UserWarning('Worker processes are not supported by the asyncio engine')
+
+    summary = {'downloaded': 0, 'skipped': 0, 'deleted': 0, 'bytes_downloaded': 0, 'bytes_saved': 0, 'failed': []}
+    manifest = load_sync_manifest(local_dir) if incremental else {}
+    remote_paths = set()
+    summary_lock = threading.Lock()
+
+    # Listed objects whose download is pending, so memory stays bounded by the number of downloads in flight
+    pending = {}
+
+    s3_client = get_transfer_s3_client(list_concurrency, session_config=session_config, profile=profile)
+
+    def targets():
+        # Stream targets from the listing, so downloads start with the first page
+        logger.debug(f'Listing objects in {s3_uri}')
+
+        for obj in list_all_objects(s3_uri, s3_client=s3_client, concurrency=list_concurrency, limiter=limiter):
+            key = obj['Key']
+            relative_path = Path(key).relative_to(s3_uri.path)
+
+            if not recursive and relative_path.parent != Path('.'):
+                continue
+
+            local_path = (local_dir / relative_path).resolve()
+
+            if not local_path.is_relative_to(local_dir.resolve()):
+                logger.warning(f"Skipping {key} due to path traversal attempt outside {local_dir}")
+                continue
+
+            if delete:
+                remote_paths.add(local_path)
+
+            if incremental:
+                unchanged = is_unchanged(obj, local_path, manifest.get(key))
+            else:
+                unchanged = skip_existing and local_path.exists()
+
+            with summary_lock:
+                if unchanged:
+                    summary['skipped'] += 1
+                    summary['bytes_saved'] += obj['Size']
+                    continue
+
+                pending[key] = obj
+
+            yield (s3_uri.bucket, key, local_path, obj['Size'], obj['ETag'])
+
+    def on_complete(bucket, key, local_path):
+        with summary_lock:
+            obj = pending.pop(key)
+
+        # Stamp the file with the object's LastModified so later syncs can compare by stat alone
+        mtime = obj['LastModified'].timestamp()
+        os.utime(local_path, (mtime, mtime))
+
+        with summary_lock:
+            summary['downloaded'] += 1
+            summary['bytes_downloaded'] += obj['Size']
+
+            if incremental:
+                manifest[key] = {
+                    'size': obj['Size'],
+                    'etag': obj['ETag'],
+                    'last_modified': obj['LastModified'].isoformat()
+                }
+
+    logger.debug(f'Syncing {s3_uri} to {local_dir}')
 
     # Use fast_download_s3_files to download all files
-    fast_download_s3_files(
-        targets,
-        create_folders=True,
-        skip_existing=skip_existing,
+    try:
+        if engine == 'asyncio':
+            from botobuddy import aios3
+
+            results = asyncio.run(aios3.download_files(
+                targets(),
+                create_folders=True,
+                session_config=session_config,
+                profile=profile,
+                concurrency=concurrency,
+                on_complete=on_complete,
+                metrics=metrics
+            ))
+        else:
+            results = fast_download_s3_files(
+                targets(),
+                create_folders=True,
+                session_config=session_config,
+                profile=profile,
+                concurrency=concurrency,
+                on_complete=on_complete,
+                limiter=limiter,
+                metrics=metrics,
+                processes=processes,
+                cache=cache
+            )
+    finally:
+        if incremental:
+            local_dir.mkdir(parents=True, exist_ok=True)
+            save_sync_manifest(local_dir, manifest)
+
+    summary['failed'] = results['failed']
+
+    for failure in results['failed']:
+        pending.pop(failure['key'], None)
+
+    if delete:
+        summary['deleted'] = delete_local_orphans(local_dir, remote_paths, recursive=recursive)
+
+    return summary
+
+
+def delete_local_orphans(local_dir: Path, remote_paths: set[Path], *, recursive: bool = False) -> int:
+    """Delete local files that have no counterpart in S3.
+
+    Args:
+        local_dir: The local sync directory.
+        remote_paths: Resolved local paths of all objects present in S3.
+        recursive: Whether to consider files in subdirectories.
+
+    Returns:
+        int: The number of deleted files.
+    """
+    if not local_dir.exists():
+        return 0
+
+    deleted = 0
+    candidates = local_dir.rglob('*') if recursive else local_dir.iterdir()
+
+    for path in candidates:
+        if not path.is_file() or path.name in (SYNC_MANIFEST_NAME, SYNC_MANIFEST_NAME + '.tmp'):
+            continue
+
+        if path.resolve() not in remote_paths:
+            logger.debug(f'Deleting {path} as it no longer exists in S3')
+            path.unlink()
+            deleted += 1
+
+    return deleted
+
+
+# Files at or above this size are uploaded with multipart upload
+MULTIPART_THRESHOLD = 64 * 1024 * 1024
+
+
+def fast_upload_s3_files(
+    targets: Iterable[tuple[str | Path, str, str]],
+    *,
+    concurrency: int = 10,
+    part_concurrency: int = 4,
+    multipart_threshold: int = MULTIPART_THRESHOLD,
+    session_config: dict | None = None,
+    profile: str | None = None,
+    on_complete: Callable[[Path, str, str], None] | None = None,
+    limiter: TransferLimiter | None = None,
+    max_retries: int = 3
+) -> dict:
+    '''Upload a list of files to S3 in parallel.
+
+    Files at or above multipart_threshold are uploaded with multipart upload, with up to
+    part_concurrency parts in flight per file.
+
+    Like fast_download_s3_files, a failed upload does not abort the others, and transient errors
+    are retried after each pass with jittered exponential backoff, up to max_retries times.
+
+    Args:
+        targets: Iterable of tuples containing (local_path, bucket, key)
+        concurrency: Number of concurrent uploads
+        part_concurrency: Number of concurrent part uploads for each multipart upload
+        multipart_threshold: Size in bytes from which multipart upload is used
+        session_config: Configuration for the AWS session (profile, region, etc.)
+        profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
+        on_complete: Optional callback invoked with (local_path, bucket, key) from the worker
+            thread after each successful upload
+        limiter: Optional bandwidth and request rate limiter (defaults to the one installed with set_transfer_limiter)
+        max_retries: Number of retries for transient errors
+
+    Returns:
+        dict: A summary of the uploads, listing the failed targets:
+
+        {
+            'succeeded': int,
+            'failed': [{'local_path': Path, 'bucket': str, 'key': str, 'error': str}]
+        }
+    '''
+    client = get_transfer_s3_client(concurrency * part_concurrency, session_config=session_config, profile=profile)
+    multipart_chunksize = max(multipart_threshold // 8, 8 * 1024 * 1024)
+
+    transfer_config = TransferConfig(
+        multipart_threshold=multipart_threshold,
+        multipart_chunksize=multipart_chunksize,
+        max_concurrency=part_concurrency,
+        use_threads=part_concurrency > 1
+    )
+
+    limiter = get_transfer_limiter(limiter)
+    callback = limiter.acquire_bytes if limiter else None
+
+    logger.debug(f'Fast uploading files with concurrency {concurrency}')
+
+    def upload_file(local_path, bucket_name, key):
+        if limiter:
+            size = Path(local_path).stat().st_size
+
+            # A multipart upload issues a request per part plus the create and complete requests
+            requests = -(-size // multipart_chunksize) + 2 if size >= multipart_threshold else 1
+            limiter.acquire_request(key, requests)
+
+        client.upload_file(
+            str(local_path), bucket_name, key, Config=transfer_config, Callback=callback
+        )
+
+        if on_complete:
+            on_complete(Path(local_path), bucket_name, key)
+
+        logger.debug(f'Successfully uploaded {key}')
+
+    def run(item, attempt):
+        if attempt > 0:
+            # Spread retries out so they do not hit S3 in lockstep
+            time.sleep(random.uniform(0, RETRY_BASE_DELAY))
+
+        try:
+            upload_file(*item)
+            return item, 'succeeded', None
+        except Exception as e:
+            return item, 'failed', e
+
+    results = {'succeeded': 0, 'failed': []}
+    items = ((tuple(target), 0) for target in targets)
+    attempt = 0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while True:
+            retry_queue = []
+
+            for future in submit_bounded(executor, run, items, 2 * concurrency):
+                item, status, error = future.result()
+                local_path, bucket_name, key = item
+
+                if status == 'failed' and attempt < max_retries and is_transient_error(error):
+                    logger.debug(f'Transient error uploading {key}, queued for retry: {error}')
+                    retry_queue.append(item)
+                elif status == 'failed':
+                    logger.warning(f'Failed to upload {key}: {error}')
+                    results['failed'].append(
+                        {'local_path': Path(local_path), 'bucket': bucket_name, 'key': key, 'error': str(error)}
+                    )
+                else:
+                    results['succeeded'] += 1
+
+            if not retry_queue:
+                break
+
+            attempt += 1
+            delay = min(RETRY_BASE_DELAY * 2 ** attempt, RETRY_MAX_DELAY) * random.uniform(0.5, 1.5)
+            logger.info(f'Retrying {len(retry_queue)} failed uploads in {delay:.1f}s (attempt {attempt})')
+            time.sleep(delay)
+            items = ((item, attempt) for item in retry_queue)
+
+    return results
+
+
+def sync_folder_to_s3(
+    local_dir: Path,
+    s3_uri: str | S3Uri,
+    *,
+    session_config: dict | None = None,
+    profile: str | None = None,
+    recursive: bool = False,
+    skip_existing: bool = False,
+    delete: bool = False,
+    concurrency: int = 10,
+    list_concurrency: int = 1,
+    limiter: TransferLimiter | None = None,
+    engine: str = 'threads'
+) -> dict:
+    '''Upload a local folder to S3, skipping files that did not change using fast_upload_s3_files
+
+    A file is uploaded if the object is missing, has a different size, or is older than the local file.
+
+    Args:
+        local_dir: Local directory to upload
+        s3_uri: S3 URI to the destination folder
+        session_config: Configuration for the AWS session.
+        profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
+        recursive: Recursively upload the folder
+        skip_existing: Skip files whose objects already exist, regardless of size and age
+        delete: Delete objects that no longer exist locally
+        concurrency: Number of concurrent uploads
+        list_concurrency: Number of prefixes listed in parallel (see list_all_objects)
+        limiter: Optional bandwidth and request rate limiter (threads engine only)
+        engine: 'threads' to upload with fast_upload_s3_files, or 'asyncio' to upload with
+            aios3.upload_files on an event loop (requires aiohttp, single-request uploads only)
+
+    Returns:
+        dict: A summary of the sync:
+
+        {
+            'uploaded': int,
+            'skipped': int,
+            'deleted': int,
+            'bytes_uploaded': int,
+            'bytes_saved': int,
+            'failed': [{'local_path': Path, 'bucket': str, 'key': str, 'error': str}]
+        }
+    '''
+    if session_config is None:
+        session_config = {}
+
+    if isinstance(s3_uri, str):
+        s3_uri = S3Uri(s3_uri)
+
+    if not local_dir.is_dir():
+        raise UserWarning(f'Local directory {local_dir} does not exist')
+
+    _check_engine(engine, limiter)
+
+    summary = {'uploaded': 0, 'skipped': 0, 'deleted': 0, 'bytes_uploaded': 0, 'bytes_saved': 0, 'failed': []}
+
+    # The folder is listed with a trailing slash, so 'data' does not match 'data' itself or 'data-old/...'
+    prefix = s3_uri.path.rstrip('/')
+    folder_prefix = f'{prefix}/' if prefix else ''
+    folder_uri = S3Uri(f's3://{s3_uri.bucket}/{folder_prefix}')
+
+    logger.debug(f'Listing objects in {folder_uri}')
+
+    s3_client = get_transfer_s3_client(list_concurrency, session_config=session_config, profile=profile)
+
+    remote = {
+        obj['Key']: obj
+        for obj in list_all_objects(folder_uri, s3_client=s3_client, concurrency=list_concurrency, limiter=limiter)
+    }
+    local_keys = set()
+    targets = []
+
+    candidates = local_dir.rglob('*') if recursive else local_dir.iterdir()
+
+    for path in candidates:
+        if not path.is_file() or path.name in (SYNC_MANIFEST_NAME, SYNC_MANIFEST_NAME + '.tmp'):
+            continue
+
+        relative_path = path.relative_to(local_dir).as_posix()
+        key = f'{prefix}/{relative_path}' if prefix else relative_path
+        local_keys.add(key)
+
+        stat = path.stat()
+        obj = remote.get(key)
+
+        if obj is not None and (
+            skip_existing
+            or (obj['Size'] == stat.st_size and int(stat.st_mtime) <= int(obj['LastModified'].timestamp()))
+        ):
+            summary['skipped'] += 1
+            summary['bytes_saved'] += stat.st_size
+            continue
+
+        targets.append((path, s3_uri.bucket, key))
+
+    if delete:
+        orphans = [
+            key for key in remote
+            if key.startswith(folder_prefix) and key not in local_keys
+            and (recursive or '/' not in key[len(folder_prefix):])
+        ]
+        summary['deleted'] = delete_s3_objects(s3_client, s3_uri.bucket, orphans, limiter)
+
+    if not targets:
+        logger.debug(f'No files to upload to {s3_uri}')
+        return summary
+
+    logger.debug(f'Syncing {local_dir} to {s3_uri} with {len(targets)} files')
+
+    summary_lock = threading.Lock()
+
+    def on_complete(local_path, bucket, key):
+        with summary_lock:
+            summary['uploaded'] += 1
+            summary['bytes_uploaded'] += local_path.stat().st_size
+
+    if engine == 'asyncio':
+        from botobuddy import aios3
+
+        results = asyncio.run(aios3.upload_files(
+            targets,
+            session_config=session_config,
+            profile=profile,
+            concurrency=concurrency,
+            on_complete=on_complete
+        ))
+    else:
+        results = fast_upload_s3_files(
+            targets,
+            session_config=session_config,
+            profile=profile,
+            concurrency=concurrency,
+            on_complete=on_complete,
+            limiter=limiter
+        )
+
+    summary['failed'] = results['failed']
+    return summary
+
+
+def _check_engine(engine: str, limiter: TransferLimiter | None):
+    if engine not in TRANSFER_ENGINES:
+        raise UserWarning(f'Unknown transfer engine {engine}, expected one of {", ".join(TRANSFER_ENGINES)}')
+
+    if engine == 'asyncio' and get_transfer_limiter(limiter):
+        raise UserWarning('Bandwidth and request rate limits are not supported by the asyncio engine')
+
+
+def delete_s3_objects(
+    client: S3Client, bucket_name: str, keys: list[str], limiter: TransferLimiter | None = None
+) -> int:
+    """Delete the given objects with DeleteObjects requests of up to 1000 keys.
+
+    Args:
+        client: The S3 client to use.
+        bucket_name: The name of the bucket.
+        keys: The keys of the objects to delete.
+        limiter: Optional request rate limiter (defaults to the one installed with set_transfer_limiter)
+
+    Returns:
+        int: The number of deleted objects.
+
+    Raises:
+        UserWarning: If some of the objects could not be deleted.
+    """
+    deleted = 0
+    limiter = get_transfer_limiter(limiter)
+
+    for i in range(0, len(keys), DELETE_OBJECTS_BATCH_SIZE):
+        batch = keys[i:i + DELETE_OBJECTS_BATCH_SIZE]
+
+        if limiter:
+            limiter.acquire_keys(batch)
+
+        response = client.delete_objects(
+            Bucket=bucket_name,
+            Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True}
+        )
+
+        if errors := response.get('Errors', []):
+            raise UserWarning(f'Failed to delete {len(errors)} objects from {bucket_name}: {errors[0].get("Message")}')
+
+        deleted += len(batch)
+        logger.debug(f'Deleted {len(batch)} objects from {bucket_name}')
+
+    return deleted
+
+
+# Objects at or above this size are copied with parallel UploadPartCopy requests
+COPY_MULTIPART_THRESHOLD = 256 * 1024 * 1024
+
+# Size of each part of a multipart copy
+COPY_PART_SIZE = 128 * 1024 * 1024
+
+# Maximum number of parts of a multipart upload
+MAX_MULTIPART_PARTS = 10000
+
+# Headers of the source object carried over to multipart copies, which do not copy metadata themselves
+COPIED_OBJECT_HEADERS = (
+    'CacheControl', 'ContentDisposition', 'ContentEncoding', 'ContentLanguage', 'ContentType', 'Metadata'
+)
+
+
+class MultipartCopy:
+    """A server-side copy of a single large object split into parts that are copied in parallel.
+
+    The multipart upload is created on initialization and completed once the last part is copied,
+    or aborted with fail(). Either way, finished is then true and the upload no longer needs aborting.
+    """
+
+    def __init__(
+        self,
+        client: S3Client,
+        source_bucket: str,
+        source_key: str,
+        bucket: str,
+        key: str,
+        size: int,
+        part_size: int = COPY_PART_SIZE,
+        etag: str | None = None,
+        on_complete: Callable[[str, str, str, str], None] | None = None,
+        limiter: TransferLimiter | None = None
+    ):
+        """Initialize MultipartCopy and create the multipart upload.
+
+        Args:
+            client: The S3 client to use, with credentials for the destination.
+            source_bucket: The name of the source bucket.
+            source_key: The source object key.
+            bucket: The name of the destination bucket.
+            key: The destination object key.
+            size: The size of the object in bytes.
+            part_size: The size of each part, raised as needed to stay within the part count limit.
+            etag: Optional ETag the source must match, so all parts come from the same object version.
+            on_complete: Optional callback invoked with (source_bucket, source_key, bucket, key) once copied.
+            limiter: Optional request rate limiter.
+        """
+        self.client = client
+        self.source = {'Bucket': source_bucket, 'Key': source_key}
+        self.bucket = bucket
+        self.key = key
+        self.size = size
+        self.part_size = max(part_size, -(-size // MAX_MULTIPART_PARTS))
+        self.on_complete = on_complete
+        self.limiter = limiter
+        self.parts = {}
+        self.failed = False
+        self.completed = False
+        self._lock = threading.Lock()
+
+        if limiter:
+            limiter.acquire_request(source_key)
+            limiter.acquire_request(key)
+
+        head = client.head_object(Bucket=source_bucket, Key=source_key, **({'IfMatch': etag} if etag else {}))
+        self.etag = head['ETag']
+        headers = {name: head[name] for name in COPIED_OBJECT_HEADERS if name in head}
+
+        self.upload_id = client.create_multipart_upload(Bucket=bucket, Key=key, **headers)['UploadId']
+        self.remaining = len(self.ranges())
+
+    def ranges(self) -> list[tuple[int, int, int]]:
+        """Return the (part number, start, end) inclusive byte ranges of the parts."""
+        return [
+            (number, start, min(start + self.part_size, self.size) - 1)
+            for number, start in enumerate(range(0, self.size, self.part_size), start=1)
+        ]
+
+    @property
+    def finished(self) -> bool:
+        """Whether the multipart upload was completed or aborted."""
+        return self.completed or self.failed
+
+    def fail(self) -> bool:
+        """Abort the multipart upload.
+
+        Returns:
+            bool: True for the first call, so the failure is reported once per object.
+        """
+        with self._lock:
+            if self.failed:
+                return False
+
+            self.failed = True
+
+        try:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+        except (ClientError, BotoCoreError) as e:
+            logger.warning(f'Failed to abort the multipart copy of {self.key}: {e}')
+
+        return True
+
+    def copy_part(self, number: int, start: int, end: int) -> str | None:
+        """Copy one part, completing the multipart upload after the last one.
+
+        Args:
+            number: The part number.
+            start: The first byte of the part.
+            end: The last byte of the part (inclusive).
+
+        Returns:
+            str | None: 'succeeded' once the last part completed the object, 'skipped' if the
+                copy was abandoned, None otherwise.
+        """
+        if self.failed:
+            return 'skipped'
+
+        if self.limiter:
+            self.limiter.acquire_request(self.key)
+
+        response = self.client.upload_part_copy(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            PartNumber=number,
+            CopySource=self.source,
+            CopySourceRange=f'bytes={start}-{end}',
+            CopySourceIfMatch=self.etag
+        )
+
+        with self._lock:
+            self.parts[number] = response['CopyPartResult']['ETag']
+            self.remaining -= 1
+            finished = self.remaining == 0
+
+        if not finished:
+            logger.debug(f'Copied bytes {start}-{end} of {self.key}')
+            return None
+
+        if self.limiter:
+            self.limiter.acquire_request(self.key)
+
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={'Parts': [{'PartNumber': n, 'ETag': self.parts[n]} for n in sorted(self.parts)]}
+        )
+        self.completed = True
+
+        if self.on_complete:
+            self.on_complete(self.source['Bucket'], self.source['Key'], self.bucket, self.key)
+
+        logger.debug(f'Successfully copied {self.key} in {len(self.parts)} parts')
+        return 'succeeded'
+
+
+def fast_copy_s3_objects(
+    targets: Iterable[tuple],
+    *,
+    concurrency: int = 10,
+    session_config: dict | None = None,
+    profile: str | None = None,
+    on_complete: Callable[[str, str, str, str], None] | None = None,
+    multipart_threshold: int = COPY_MULTIPART_THRESHOLD,
+    part_size: int = COPY_PART_SIZE,
+    max_retries: int = 3,
+    limiter: TransferLimiter | None = None
+) -> dict:
+    '''Copy objects between S3 locations server-side, without the bytes passing through this host.
+
+    Objects below multipart_threshold are copied with CopyObject, larger ones with UploadPartCopy
+    parts that share the object-level worker pool. Multipart copies carry over the content headers
+    and user metadata of the source, but not its tags.
+
+    Failures and retries follow fast_download_s3_files: a failed copy does not abort the others, and
+    transient errors are retried after each pass with jittered exponential backoff. Errors looking up
+    or starting a copy are reported per target, and multipart uploads left unfinished by an aborted run
+    are aborted.
+
+    Args:
+        targets: Iterable of tuples containing (source_bucket, source_key, bucket, key), optionally
+            followed by the size and ETag of the source. Missing sizes are looked up with HeadObject.
+        concurrency: Number of concurrent copy requests
+        session_config: Configuration for the AWS session of the destination, which must be able to read the source
+        profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
+        on_complete: Optional callback invoked with (source_bucket, source_key, bucket, key) from the
+            worker thread after each successful copy
+        multipart_threshold: Size in bytes from which objects are copied in parts
+        part_size: Size in bytes of each part
+        max_retries: Number of retries for transient errors
+        limiter: Optional request rate limiter (defaults to the one installed with set_transfer_limiter). Copies
+            are server-side, so only their requests are limited, not their bytes.
+
+    Returns:
+        dict: A summary of the copies, listing the failed targets:
+
+        {
+            'succeeded': int,
+            'failed': [{'source_bucket': str, 'source_key': str, 'bucket': str, 'key': str, 'error': str}]
+        }
+    '''
+    client = get_transfer_s3_client(concurrency, session_config=session_config, profile=profile)
+    limiter = get_transfer_limiter(limiter)
+
+    logger.debug(f'Fast copying objects with concurrency {concurrency}')
+
+    def copy_object(source_bucket, source_key, bucket_name, key, etag):
+        extra_args = {'CopySourceIfMatch': etag} if etag else {}
+
+        if limiter:
+            limiter.acquire_request(key)
+
+        client.copy_object(
+            CopySource={'Bucket': source_bucket, 'Key': source_key}, Bucket=bucket_name, Key=key, **extra_args
+        )
+
+        if on_complete:
+            on_complete(source_bucket, source_key, bucket_name, key)
+
+        logger.debug(f'Successfully copied {key}')
+        return 'succeeded'
+
+    results = {'succeeded': 0, 'failed': []}
+
+    def report_failure(target, error):
+        source_bucket, source_key, bucket_name, key = target
+        logger.warning(f'Failed to copy {source_key} to {key}: {error}')
+
+        results['failed'].append({
+            'source_bucket': source_bucket, 'source_key': source_key, 'bucket': bucket_name, 'key': key,
+            'error': str(error)
+        })
+
+    # Multipart copies that were started, so they can be aborted if the run is interrupted
+    multiparts = set()
+
+    # Work items are (task, target, multipart copy or None)
+    def work_items():
+        for target in targets:
+            source_bucket, source_key, bucket_name, key = target[:4]
+            size = target[4] if len(target) > 4 else None
+            etag = target[5] if len(target) > 5 else None
+
+            try:
+                if size is None:
+                    if limiter:
+                        limiter.acquire_request(source_key)
+
+                    head = client.head_object(Bucket=source_bucket, Key=source_key)
+                    size, etag = head['ContentLength'], head['ETag']
+
+                if size < multipart_threshold:
+                    task = partial(copy_object, source_bucket, source_key, bucket_name, key, etag)
+                    yield (task, target[:4], None)
+                    continue
+
+                multipart = MultipartCopy(
+                    client, source_bucket, source_key, bucket_name, key, size,
+                    part_size=part_size,
+                    etag=etag,
+                    on_complete=on_complete,
+                    limiter=limiter
+                )
+            except (ClientError, BotoCoreError) as e:
+                # Connection and read timeout errors of one target must not abort the whole run
+                report_failure(target[:4], e)
+                continue
+
+            multiparts.add(multipart)
+
+            logger.debug(f'Copying {source_key} ({size} bytes) in {multipart.remaining} parts')
+
+            for number, start, end in multipart.ranges():
+                yield (partial(multipart.copy_part, number, start, end), target[:4], multipart)
+
+    def run(item, attempt):
+        if attempt > 0:
+            # Spread retries out so they do not hit S3 in lockstep
+            time.sleep(random.uniform(0, RETRY_BASE_DELAY))
+
+        try:
+            return item, item[0](), None
+        except Exception as e:
+            return item, 'failed', e
+
+    items = ((item, 0) for item in work_items())
+    attempt = 0
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            while True:
+                retry_queue = []
+
+                for future in submit_bounded(executor, run, items, 2 * concurrency):
+                    item, status, error = future.result()
+                    _, target, multipart = item
+
+                    if status == 'failed' and attempt < max_retries and is_transient_error(error):
+                        logger.debug(f'Transient error copying {target[1]}, queued for retry: {error}')
+                        retry_queue.append(item)
+                    elif status == 'failed':
+                        if multipart is None or multipart.fail():
+                            report_failure(target, error)
+                    elif status == 'succeeded':
+                        results['succeeded'] += 1
+
+                    if multipart is not None and multipart.finished:
+                        multiparts.discard(multipart)
+
+                if not retry_queue:
+                    break
+
+                attempt += 1
+                delay = min(RETRY_BASE_DELAY * 2 ** attempt, RETRY_MAX_DELAY) * random.uniform(0.5, 1.5)
+                logger.info(f'Retrying {len(retry_queue)} failed copies in {delay:.1f}s (attempt {attempt})')
+                time.sleep(delay)
+                items = ((item, attempt) for item in retry_queue)
+    finally:
+        # The run was interrupted (e.g. by the listing or Ctrl-C), do not leave billed parts behind
+        for multipart in multiparts:
+            if not multipart.finished:
+                logger.debug(f'Aborting the unfinished multipart copy of {multipart.key}')
+                multipart.fail()
+
+    return results
+
+
+def is_same_object(source: dict, destination: dict | None) -> bool:
+    """Check whether a destination object is an up-to-date copy of a source object.
+
+    ETags are compared when both are plain (single-part) ETags. Multipart ETags depend on the part
+    size, so such objects are compared by size and age instead.
+
+    Args:
+        source: The listed source object.
+        destination: The listed destination object, if it exists.
+
+    Returns:
+        bool: True if the destination does not need to be copied again.
+    """
+    if destination is None or destination['Size'] != source['Size']:
+        return False
+
+    if '-' not in source['ETag'] and '-' not in destination['ETag']:
+        return source['ETag'] == destination['ETag']
+
+    return destination['LastModified'] >= source['LastModified']
+
+
+def sync_s3_folders(
+    source: str | S3Uri,
+    destination: str | S3Uri,
+    *,
+    session_config: dict | None = None,
+    profile: str | None = None,
+    source_session_config: dict | None = None,
+    recursive: bool = False,
+    skip_existing: bool = False,
+    incremental: bool = True,
+    delete: bool = False,
+    concurrency: int = 10,
+    list_concurrency: int = 1,
+    limiter: TransferLimiter | None = None
+) -> dict:
+    '''Sync an S3 folder to another S3 folder with server-side copies using fast_copy_s3_objects
+
+    Args:
+        source: S3 URI of the source folder
+        destination: S3 URI of the destination folder, in the same or another bucket or account
+        session_config: Configuration for the AWS session of the destination, which must be able to read the source
+        profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
+        source_session_config: Optional configuration for the AWS session listing the source (defaults to the destination's)
+        recursive: Recursively sync the folder
+        skip_existing: Skip objects that already exist in the destination, regardless of size and ETag
+        incremental: Skip objects whose destination has the same size and ETag (see is_same_object)
+        delete: Delete destination objects that no longer exist in the source
+        concurrency: Number of concurrent copy requests
+        list_concurrency: Number of prefixes listed in parallel (see list_all_objects)
+        limiter: Optional request rate limiter for the listings, copies and deletes (defaults to the one
+            installed with set_transfer_limiter)
+
+    Returns:
+        dict: A summary of the sync:
+
+        {
+            'copied': int,
+            'skipped': int,
+            'deleted': int,
+            'bytes_copied': int,
+            'bytes_saved': int,
+            'failed': [{'source_bucket': str, 'source_key': str, 'bucket': str, 'key': str, 'error': str}]
+        }
+    '''
+    if session_config is None:
+        session_config = {}
+
+    source = S3Uri(source)
+    destination = S3Uri(destination)
+    limiter = get_transfer_limiter(limiter)
+
+    # Folders are listed with a trailing slash, so 'data' does not match 'data-old'
+    source_prefix = source.path.rstrip('/') + '/' if source.path.rstrip('/') else ''
+    prefix = destination.path.rstrip('/')
+    source_uri = S3Uri(f's3://{source.bucket}/{source_prefix}')
+    destination_uri = S3Uri(f's3://{destination.bucket}/{prefix}/' if prefix else f's3://{destination.bucket}/')
+
+    source_client = get_transfer_s3_client(
+        list_concurrency,
+        session_config=source_session_config if source_session_config is not None else session_config,
+        profile=None if source_session_config is not None else profile
+    )
+    client = get_transfer_s3_client(list_concurrency, session_config=session_config, profile=profile)
+
+    logger.debug(f'Listing objects in {destination}')
+
+    remote = {
+        obj['Key']: obj
+        for obj in list_all_objects(destination_uri, s3_client=client, concurrency=list_concurrency, limiter=limiter)
+    }
+
+    summary = {'copied': 0, 'skipped': 0, 'deleted': 0, 'bytes_copied': 0, 'bytes_saved': 0, 'failed': []}
+    summary_lock = threading.Lock()
+    source_keys = set()
+    sizes = {}
+
+    def targets():
+        logger.debug(f'Listing objects in {source}')
+
+        for obj in list_all_objects(
+            source_uri, s3_client=source_client, concurrency=list_concurrency, limiter=limiter
+        ):
+            relative_key = obj['Key'][len(source_prefix):]
+
+            if not relative_key or (not recursive and '/' in relative_key):
+                continue
+
+            key = f'{prefix}/{relative_key}' if prefix else relative_key
+            source_keys.add(key)
+            existing = remote.get(key)
+
+            if (skip_existing and existing is not None) or (incremental and is_same_object(obj, existing)):
+                with summary_lock:
+                    summary['skipped'] += 1
+                    summary['bytes_saved'] += obj['Size']
+
+                continue
+
+            with summary_lock:
+                sizes[key] = obj['Size']
+
+            yield (source.bucket, obj['Key'], destination.bucket, key, obj['Size'], obj['ETag'])
+
+    def on_complete(source_bucket, source_key, bucket, key):
+        with summary_lock:
+            summary['copied'] += 1
+            summary['bytes_copied'] += sizes.pop(key)
+
+    logger.debug(f'Syncing {source} to {destination}')
+
+    results = fast_copy_s3_objects(
+        targets(),
         session_config=session_config,
-        concurrency=concurrency
+        profile=profile,
+        concurrency=concurrency,
+        on_complete=on_complete,
+        limiter=limiter
     )
+
+    summary['failed'] = results['failed']
+
+    if delete:
+        orphans = [
+            key for key in remote
+            if key not in source_keys and (recursive or '/' not in key[len(prefix):].lstrip('/'))
+        ]
+        summary['deleted'] = delete_s3_objects(client, destination.bucket, orphans, limiter)
+
+    return summary
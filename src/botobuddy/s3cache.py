@@ -0,0 +1,313 @@
+'''Local on-disk cache of S3 objects, shared between runs and projects on the same machine.
+
+Objects are stored under a digest of their bucket, key and ETag, so a changed object is never served
+from the cache. An SQLite index tracks sizes and last use, and the least recently used entries are
+evicted once the cache grows beyond its maximum size.
+
+Objects enter the cache and are materialized into target directories as reflinks where the filesystem
+supports them, falling back to copies, so repeated downloads do not duplicate bytes on disk. Materializing
+as hardlinks is opt-in, as a hardlinked file modified in place corrupts the cache entry.
+'''
+import os
+import time
+import shutil
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Callable
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from botobuddy.logger import logger
+
+
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'botobuddy' / 's3'
+DEFAULT_CACHE_MAX_SIZE = 10 * 1024 * 1024 * 1024
+
+# Linux ioctl cloning a file's extents (copy-on-write) on btrfs, XFS and similar filesystems
+FICLONE = 0x40049409
+
+# Number of least recently used entries evicted at a time
+EVICTION_BATCH_SIZE = 100
+
+
+def _reflink(source: Path, target: Path):
+    '''Clone source into a new target file sharing its extents, raising OSError if unsupported.'''
+    if fcntl is None:
+        raise OSError('Reflinks are not supported on this platform')
+
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            target.unlink(missing_ok=True)
+            raise
+
+
+def link_or_copy(source: Path, target: Path, *, hardlinks: bool = True) -> str:
+    '''Create target with the contents of source, without duplicating bytes on disk where possible.
+
+    Args:
+        source: The existing file.
+        target: The file to create, which must not exist.
+        hardlinks: Whether hardlinks may be used when reflinks are not supported.
+
+    Returns:
+        str: How the file was created: 'reflink', 'hardlink' or 'copy'.
+    '''
+    try:
+        _reflink(source, target)
+        return 'reflink'
+    except OSError:
+        pass
+
+    if hardlinks:
+        try:
+            os.link(source, target)
+            return 'hardlink'
+        except OSError:
+            pass
+
+    shutil.copyfile(source, target)
+    return 'copy'
+
+
+class ObjectCache:
+    '''An LRU cache of S3 objects keyed by bucket, key and ETag, bounded by total size.
+
+    The cache is safe to use from several threads and processes. Instances can be pickled
+    (they reopen the index on unpickling), so they can be handed to worker processes.
+
+    Downloaded files are never hardlinked into the cache. With hardlinks=True, materialized files may be
+    hardlinks sharing their contents with the cache entry, so they must not be modified in place.
+    '''
+
+    def __init__(
+        self,
+        root: str | Path | None = None,
+        *,
+        max_size: int = DEFAULT_CACHE_MAX_SIZE,
+        hardlinks: bool = False
+    ):
+        '''Initialize ObjectCache, creating its directory and index if needed.
+
+        Args:
+            root: Cache directory, defaults to $BOTOBUDDY_S3_CACHE_DIR or ~/.cache/botobuddy/s3.
+            max_size: Maximum total size of the cached objects in bytes.
+            hardlinks: Whether objects may be materialized as hardlinks where reflinks are unavailable.
+        '''
+        self.root = Path(root or os.environ.get('BOTOBUDDY_S3_CACHE_DIR') or DEFAULT_CACHE_DIR)
+        self.max_size = max_size
+        self.hardlinks = hardlinks
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        (self.root / 'objects').mkdir(parents=True, exist_ok=True)
+
+        self._db = sqlite3.connect(
+            self.root / 'index.sqlite', timeout=60, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'digest TEXT PRIMARY KEY, bucket TEXT, key TEXT, etag TEXT, size INTEGER, last_used REAL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)')
+        self._size = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def __reduce__(self):
+        return (_unpickle_cache, (self.root, self.max_size, self.hardlinks))
+
+    @staticmethod
+    def digest(bucket: str, key: str, etag: str) -> str:
+        '''Return the digest identifying an object version in the cache.'''
+        return hashlib.sha256(f'{bucket}\0{key}\0{etag}'.encode()).hexdigest()
+
+    def path(self, digest: str) -> Path:
+        '''Return the path of a cache entry.'''
+        return self.root / 'objects' / digest[:2] / digest
+
+    def has(self, bucket: str, key: str, etag: str) -> bool:
+        '''Check whether an object is cached, without marking it as used.'''
+        return self.path(self.digest(bucket, key, etag)).exists()
+
+    def get(self, bucket: str, key: str, etag: str) -> Path | None:
+        '''Look up an object, marking it as recently used.
+
+        Args:
+            bucket: The name of the bucket.
+            key: The object key.
+            etag: The ETag of the object.
+
+        Returns:
+            Path | None: The path of the cached object, or None if it is not cached.
+        '''
+        digest = self.digest(bucket, key, etag)
+        path = self.path(digest)
+
+        with self._lock:
+            cursor = self._db.execute('UPDATE entries SET last_used = ? WHERE digest = ?', (time.time(), digest))
+
+            if cursor.rowcount and path.exists():
+                self.hits += 1
+                return path
+
+            if cursor.rowcount:
+                # The file was removed behind our back
+                self._db.execute('DELETE FROM entries WHERE digest = ?', (digest,))
+
+            self.misses += 1
+            return None
+
+    def fetch(self, bucket: str, key: str, etag: str, target: Path) -> bool:
+        '''Materialize a cached object at target, replacing any existing file.
+
+        Args:
+            bucket: The name of the bucket.
+            key: The object key.
+            etag: The ETag of the object.
+            target: The destination path.
+
+        Returns:
+            bool: True if the object was cached and materialized, False on a cache miss.
+        '''
+        path = self.get(bucket, key, etag)
+
+        if path is None:
+            return False
+
+        temp = target.with_name(f'.{target.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+
+        try:
+            method = link_or_copy(path, temp, hardlinks=self.hardlinks)
+            os.replace(temp, target)
+        except FileNotFoundError:
+            # Evicted by another process in the meantime
+            temp.unlink(missing_ok=True)
+            return False
+
+        logger.debug(f'Materialized {key} from the cache ({method})')
+        return True
+
+    def put(self, bucket: str, key: str, etag: str, source: Path) -> Path:
+        '''Add a downloaded object to the cache, evicting the least recently used entries if it is full.
+
+        Args:
+            bucket: The name of the bucket.
+            key: The object key.
+            etag: The ETag of the object.
+            source: The downloaded file, which is reflinked or copied into the cache so that later changes
+                to it do not affect the entry.
+
+        Returns:
+            Path: The path of the cache entry.
+        '''
+        return self._add(bucket, key, etag, lambda temp: link_or_copy(source, temp, hardlinks=False))
+
+    def put_fileobj(self, bucket: str, key: str, etag: str, fileobj: BinaryIO) -> Path:
+        '''Add an object read from a file object (from its current position) to the cache.
+
+        Args:
+            bucket: The name of the bucket.
+            key: The object key.
+            etag: The ETag of the object.
+            fileobj: The object contents.
+
+        Returns:
+            Path: The path of the cache entry.
+        '''
+        def write(temp):
+            with open(temp, 'wb') as f:
+                shutil.copyfileobj(fileobj, f)
+
+        return self._add(bucket, key, etag, write)
+
+    def _add(self, bucket: str, key: str, etag: str, create: Callable[[Path], Any]) -> Path:
+        '''Create an entry with the given function writing a temporary file, then index it.'''
+        digest = self.digest(bucket, key, etag)
+        path = self.path(digest)
+        path.parent.mkdir(exist_ok=True)
+
+        temp = path.with_name(f'.{digest}.{os.getpid()}.{threading.get_ident()}.tmp')
+        create(temp)
+        os.replace(temp, path)
+        size = path.stat().st_size
+
+        with self._lock:
+            previous = self._db.execute('SELECT size FROM entries WHERE digest = ?', (digest,)).fetchone()
+            self._db.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)',
+                (digest, bucket, key, etag, size, time.time())
+            )
+            self._size += size - (previous[0] if previous else 0)
+
+            if self._size > self.max_size:
+                self._evict()
+
+        return path
+
+    def _evict(self):
+        '''Remove least recently used entries until the cache fits in max_size. Called with the lock held.'''
+        # Other processes share the index, so start from its actual total
+        self._size = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+        while self._size > self.max_size:
+            rows = self._db.execute(
+                'SELECT digest, size FROM entries ORDER BY last_used LIMIT ?', (EVICTION_BATCH_SIZE,)
+            ).fetchall()
+
+            if not rows:
+                break
+
+            for digest, size in rows:
+                self.path(digest).unlink(missing_ok=True)
+                self._db.execute('DELETE FROM entries WHERE digest = ?', (digest,))
+                self._size -= size
+                logger.debug(f'Evicted {digest} ({size} bytes) from the cache')
+
+                if self._size <= self.max_size:
+                    break
+
+    def clear(self):
+        '''Remove all entries from the cache.'''
+        with self._lock:
+            for (digest,) in self._db.execute('SELECT digest FROM entries').fetchall():
+                self.path(digest).unlink(missing_ok=True)
+
+            self._db.execute('DELETE FROM entries')
+            self._size = 0
+
+
+def _unpickle_cache(root: Path, max_size: int, hardlinks: bool) -> ObjectCache:
+    return ObjectCache(root, max_size=max_size, hardlinks=hardlinks)
+
+
+_default_object_cache: ObjectCache | None = None
+
+
+def set_object_cache(cache: ObjectCache | None):
+    '''Install a process-wide default cache used by S3 download helpers when none is passed explicitly.
+
+    Args:
+        cache: The cache to install, or None to remove the default.
+    '''
+    global _default_object_cache
+    _default_object_cache = cache
+
+
+def get_object_cache(cache: ObjectCache | None = None) -> ObjectCache | None:
+    '''Return the given cache, or the process-wide default if none is given.
+
+    Args:
+        cache: An explicit cache.
+
+    Returns:
+        ObjectCache | None: The cache to use, if any.
+    '''
+    return cache or _default_object_cache
@@ -154,15 +154,18 @@ def analyse_human_effort(job_name: str, data_dir: Path, session_config: dict | N
                             logger.warning(f"Skipping {key} due to path traversal attempt outside {target_dir}")
                             continue
 
-                        targets.append((manifest_uri.bucket, key, target_file_path))
+                        targets.append((manifest_uri.bucket, key, target_file_path, item['Size'], item['ETag']))  # type: ignore
 
-            fast_download_s3_files(
+            results = fast_download_s3_files(
                 targets=targets,
                 skip_existing=True,
                 session_config=session_config,
                 profile=profile
             )
 
+            if results['failed']:
+                raise UserWarning(f'Failed to download {len(results["failed"])} worker responses')
+
         annotations = Counter()
         time_spent = Counter()
         cognito_user_ids = dict()
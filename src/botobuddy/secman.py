@@ -1,8 +1,28 @@
+import copy
 import json
-from typing import cast, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Any, Callable, Iterable, cast, Optional
+
+from botocore.exceptions import ClientError
 from types_boto3_secretsmanager import SecretsManagerClient
 
 from botobuddy.common import get_aws_client
+from botobuddy.logger import logger
+from botobuddy.utils import TTLCache
+
+
+# Maximum number of secrets accepted by a BatchGetSecretValue request
+BATCH_GET_SECRETS_SIZE = 20
+
+CURRENT_VERSION_STAGE = 'AWSCURRENT'
+
+# Default seconds a cached secret is fresh, and served stale while it is refreshed in the background
+SECRET_CACHE_TTL = 300
+SECRET_CACHE_STALE_TTL = 0
+
+_secret_cache = TTLCache()
 
 
 def get_secretsmanager_client(session_config: dict | None = None, profile: str | None = None) -> SecretsManagerClient:
@@ -20,9 +40,95 @@ def get_secretsmanager_client(session_config: dict | None = None, profile: str |
     return cast(SecretsManagerClient, get_aws_client('secretsmanager', session_config, profile=profile))
 
 
-def get_sm_secret(name, plain: bool = False, session_config=None, profile: str | None = None, sm_client: Optional[SecretsManagerClient] = None):
+class _Secret:
+    """A fetched secret value, parsed as JSON at most once and copied for every caller."""
+
+    def __init__(self, response: dict):
+        self.string = response.get('SecretString', response.get('SecretBinary'))
+
+    @cached_property
+    def parsed(self) -> Any:
+        return json.loads(self.string)
+
+    def value(self, plain: bool) -> Any:
+        # Callers may modify what they get, which must not change the cached value
+        return self.string if plain else copy.deepcopy(self.parsed)
+
+
+def clear_secret_cache():
+    """Drop all cached secrets."""
+    _secret_cache.clear()
+
+
+def _cache_scope(sm: SecretsManagerClient) -> tuple:
+    """Return the part of cache keys identifying where secrets were read: the client itself, as in ssm."""
+    return (sm,)
+
+
+def _fetch_secret(sm: SecretsManagerClient, secret_id: str, version_stage: str) -> _Secret:
+    """Fetch one secret version with GetSecretValue."""
+    return _Secret(sm.get_secret_value(SecretId=secret_id, VersionStage=version_stage))
+
+
+def _fetch_secrets(
+    sm: SecretsManagerClient, secret_ids: list[str], version_stage: str, concurrency: int
+) -> dict[str, _Secret]:
+    """Fetch secrets by id, with BatchGetSecretValue where possible and parallel GetSecretValue calls otherwise."""
+    secrets = {}
+    remaining = secret_ids
+
+    # BatchGetSecretValue only returns the current version, and needs its own IAM permission
+    if version_stage == CURRENT_VERSION_STAGE:
+        try:
+            for i in range(0, len(secret_ids), BATCH_GET_SECRETS_SIZE):
+                batch = secret_ids[i:i + BATCH_GET_SECRETS_SIZE]
+                response = sm.batch_get_secret_value(SecretIdList=batch)
+
+                if response.get('Errors'):
+                    errors = ', '.join(f'{e["SecretId"]} ({e["ErrorCode"]})' for e in response['Errors'])
+                    raise UserWarning(f'Could not get secrets: {errors}')
+
+                # Secrets may have been requested by name or ARN
+                by_id = {}
+
+                for value in response['SecretValues']:
+                    by_id[value['Name']] = by_id[value['ARN']] = _Secret(value)
+
+                secrets.update({secret_id: by_id[secret_id] for secret_id in batch if secret_id in by_id})
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'AccessDeniedException':
+                raise
+
+            logger.debug(f'BatchGetSecretValue is not allowed, falling back to GetSecretValue: {e}')
+
+        # Partial ARNs are not matched above
+        remaining = [secret_id for secret_id in secret_ids if secret_id not in secrets]
+
+    if remaining:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(remaining))) as executor:
+            fetched = executor.map(lambda secret_id: _fetch_secret(sm, secret_id, version_stage), remaining)
+            secrets.update(zip(remaining, fetched))
+
+    return secrets
+
+
+def get_sm_secret(
+    name,
+    plain: bool = False,
+    session_config=None,
+    profile: str | None = None,
+    sm_client: Optional[SecretsManagerClient] = None,
+    *,
+    version_stage: str = CURRENT_VERSION_STAGE,
+    use_cache: bool = True,
+    ttl: float = SECRET_CACHE_TTL,
+    stale_ttl: float = SECRET_CACHE_STALE_TTL
+):
     """Retrieve a secret from AWS Secrets Manager.
 
+    Secrets are cached in-process per client and version stage, and their JSON is parsed once, so repeated
+    lookups are served from memory. Every call returns its own copy of the parsed value.
+
     Args:
         name (str): The name of the secret to retrieve.
         plain (bool): If True, returns the raw secret string. If False (default), 
@@ -31,18 +137,155 @@ def get_sm_secret(name, plain: bool = False, session_config=None, profile: str |
         profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
         sm_client (Optional[SecretsManagerClient]): An existing Secrets Manager 
             client to use. If not provided, a new one will be created.
+        version_stage (str): The version stage to retrieve, e.g. 'AWSPREVIOUS' during a rotation.
+        use_cache (bool): Whether to read and update the in-process cache.
+        ttl (float): Seconds a cached secret is fresh.
+        stale_ttl (float): Further seconds an expired secret may be served while it is refreshed.
 
     Returns:
         Union[dict, str]: The secret value, either as a dictionary or a string.
     """
+    secrets = get_sm_secrets(
+        [name], plain, session_config, profile, sm_client,
+        version_stage=version_stage, use_cache=use_cache, ttl=ttl, stale_ttl=stale_ttl
+    )
+    return secrets[name]
+
+
+def get_sm_secrets(
+    names: Iterable[str],
+    plain: bool = False,
+    session_config: dict | None = None,
+    profile: str | None = None,
+    sm_client: Optional[SecretsManagerClient] = None,
+    *,
+    version_stage: str = CURRENT_VERSION_STAGE,
+    use_cache: bool = True,
+    ttl: float = SECRET_CACHE_TTL,
+    stale_ttl: float = SECRET_CACHE_STALE_TTL,
+    concurrency: int = 8
+) -> dict[str, Any]:
+    """Retrieve many secrets from AWS Secrets Manager.
+
+    Current versions are fetched with BatchGetSecretValue, 20 secrets per request. Other version stages,
+    partial ARNs, and principals without the secretsmanager:BatchGetSecretValue permission fall back to
+    parallel GetSecretValue calls. Secrets are cached like get_sm_secret.
+
+    Args:
+        names: The names or ARNs of the secrets.
+        plain (bool): If True, returns the raw secret strings. If False (default), the JSON-parsed secrets.
+        session_config (dict): Optional AWS session configuration.
+        profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
+        sm_client (Optional[SecretsManagerClient]): An existing Secrets Manager client to use.
+        version_stage (str): The version stage to retrieve.
+        use_cache (bool): Whether to read and update the in-process cache.
+        ttl (float): Seconds a cached secret is fresh.
+        stale_ttl (float): Further seconds an expired secret may be served while it is refreshed.
+        concurrency (int): Number of parallel GetSecretValue calls when falling back.
+
+    Returns:
+        dict[str, Any]: The secret values by the given name or ARN.
+
+    Raises:
+        UserWarning: If some of the secrets could not be retrieved in a batch.
+    """
+    if session_config is None:
+        session_config = {}
+
+    names = list(dict.fromkeys(names))
+    sm = sm_client or get_secretsmanager_client(session_config, profile=profile)
+
+    if not use_cache:
+        secrets = _fetch_secrets(sm, names, version_stage, concurrency) if names else {}
+        return {name: secrets[name].value(plain) for name in names}
+
+    scope = _cache_scope(sm)
+    secrets, missing, stale = {}, [], []
+
+    for name in names:
+        secret, status = _secret_cache.get((scope, name, version_stage), ttl, stale_ttl)
+
+        if status == 'missing':
+            missing.append(name)
+            continue
+
+        secrets[name] = secret
+
+        if status == 'stale':
+            stale.append(name)
+
+    if stale:
+        _secret_cache.refresh(
+            [(scope, name, version_stage) for name in stale], _loader(sm, scope, version_stage, concurrency)
+        )
+
+    if missing:
+        for name, secret in _fetch_secrets(sm, missing, version_stage, concurrency).items():
+            _secret_cache.put((scope, name, version_stage), secret)
+            secrets[name] = secret
+
+    return {name: secrets[name].value(plain) for name in names}
+
+
+def _loader(sm: SecretsManagerClient, scope: tuple, version_stage: str, concurrency: int) -> Callable[[list], dict]:
+    """Return a TTLCache loader fetching the secrets of cache keys."""
+    def load(keys):
+        fetched = _fetch_secrets(sm, [key[1] for key in keys], version_stage, concurrency)
+        return {(scope, name, version_stage): secret for name, secret in fetched.items()}
+
+    return load
+
+
+def start_secret_refresher(
+    names: Iterable[str],
+    session_config: dict | None = None,
+    profile: str | None = None,
+    sm_client: Optional[SecretsManagerClient] = None,
+    *,
+    version_stage: str = CURRENT_VERSION_STAGE,
+    interval: float = SECRET_CACHE_TTL / 2,
+    concurrency: int = 8
+) -> threading.Event:
+    """Load secrets into the cache, then keep reloading them in a background thread.
+
+    With an interval shorter than the TTL used for lookups, get_sm_secret and get_sm_secrets always find
+    these secrets fresh in memory. Failed reloads are logged and retried at the next interval, while the
+    previous values stay cached.
+
+    Args:
+        names: The names or ARNs of the secrets.
+        session_config (dict): Optional AWS session configuration.
+        profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
+        sm_client (Optional[SecretsManagerClient]): An existing Secrets Manager client to use.
+        version_stage (str): The version stage to keep loaded.
+        interval (float): Seconds between reloads.
+        concurrency (int): Number of parallel GetSecretValue calls when falling back.
+
+    Returns:
+        threading.Event: Set it to stop the refresher.
+    """
     if session_config is None:
         session_config = {}
 
+    names = list(dict.fromkeys(names))
     sm = sm_client or get_secretsmanager_client(session_config, profile=profile)
-    get_secret_value_response = sm.get_secret_value(SecretId=name)
-    secret_string = get_secret_value_response['SecretString']
+    scope = _cache_scope(sm)
+    keys = [(scope, name, version_stage) for name in names]
+    load = _loader(sm, scope, version_stage, concurrency)
+
+    # The first load is synchronous so that missing secrets or permissions surface to the caller
+    for key, secret in load(keys).items():
+        _secret_cache.put(key, secret)
+
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            try:
+                for key, secret in load(keys).items():
+                    _secret_cache.put(key, secret)
+            except Exception as e:
+                logger.warning(f'Refreshing {len(keys)} secrets failed: {e}')
 
-    if plain:
-        return secret_string
-    else:
-        return json.loads(secret_string)
+    threading.Thread(target=run, name='botobuddy-secret-refresher', daemon=True).start()
+    return stop
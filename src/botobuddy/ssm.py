@@ -1,7 +1,19 @@
-from typing import cast, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, cast, Optional
 from types_boto3_ssm import SSMClient
 
 from botobuddy.common import get_aws_client
+from botobuddy.utils import TTLCache
+
+
+# Maximum number of names accepted by a GetParameters request
+GET_PARAMETERS_BATCH_SIZE = 10
+
+# Default seconds a cached parameter is fresh, and served stale while it is refreshed in the background
+SSM_CACHE_TTL = 300
+SSM_CACHE_STALE_TTL = 0
+
+_parameter_cache = TTLCache()
 
 
 def get_ssm_client(session_config: dict | None = None, profile: str | None = None) -> SSMClient:
@@ -40,3 +52,201 @@ def get_ssm_parameter(name, session_config: dict | None = None, profile: str | N
     ssm = ssm_client or get_ssm_client(session_config, profile=profile)
     value = ssm.get_parameter(Name=name, WithDecryption=with_decryption)['Parameter']['Value']
     return value
+
+
+def clear_ssm_cache():
+    """Drop all cached SSM parameters."""
+    _parameter_cache.clear()
+
+
+def _cache_scope(ssm: SSMClient, with_decryption: bool) -> tuple:
+    """Return the part of cache keys identifying where and how parameters were read.
+
+    The client itself identifies the account, region and credentials: clients created from a session
+    configuration are shared process-wide, and an injected client only ever sees its own entries. Keys
+    hold the client rather than its id, which could be reused by another client once it is collected.
+    """
+    return (ssm, with_decryption)
+
+
+def _fetch_parameters(ssm: SSMClient, names: list[str], with_decryption: bool, concurrency: int) -> dict[str, str]:
+    """Fetch parameters with parallel GetParameters requests of up to 10 names."""
+    batches = [names[i:i + GET_PARAMETERS_BATCH_SIZE] for i in range(0, len(names), GET_PARAMETERS_BATCH_SIZE)]
+
+    def fetch(batch):
+        response = ssm.get_parameters(Names=batch, WithDecryption=with_decryption)
+
+        if response.get('InvalidParameters'):
+            raise UserWarning(f'SSM parameters not found: {", ".join(response["InvalidParameters"])}')
+
+        # Names with a version or label selector are returned without it
+        return {
+            parameter['Name'] + parameter.get('Selector', ''): parameter['Value']
+            for parameter in response['Parameters']
+        }
+
+    values = {}
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(batches))) as executor:
+        for result in executor.map(fetch, batches):
+            values.update(result)
+
+    return values
+
+
+def get_ssm_parameters(
+    names: Iterable[str],
+    session_config: dict | None = None,
+    profile: str | None = None,
+    ssm_client: Optional[SSMClient] = None,
+    *,
+    with_decryption: bool = True,
+    use_cache: bool = True,
+    ttl: float = SSM_CACHE_TTL,
+    stale_ttl: float = SSM_CACHE_STALE_TTL,
+    concurrency: int = 4
+) -> dict[str, str]:
+    """Retrieve many parameter values from AWS SSM Parameter Store.
+
+    Parameters are fetched with GetParameters in batches of 10 names, issued in parallel. Values are kept
+    in an in-process cache, so repeated calls (e.g. warm Lambda invocations) do not call SSM. With
+    stale_ttl, expired values are still returned for that long while they are refreshed in the background.
+
+    Args:
+        names: The names of the parameters, optionally with a ':version' or ':label' selector.
+        session_config (dict): Optional AWS session configuration.
+        profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
+        ssm_client (Optional[SSMClient]): An existing SSM client to use.
+        with_decryption (bool): If True, returns the decrypted value for SecureString parameters.
+        use_cache (bool): Whether to read and update the in-process cache.
+        ttl (float): Seconds a cached value is fresh.
+        stale_ttl (float): Further seconds an expired value may be served while it is refreshed.
+        concurrency (int): Number of parallel GetParameters requests.
+
+    Returns:
+        dict[str, str]: The parameter values by name.
+
+    Raises:
+        UserWarning: If some of the parameters do not exist.
+    """
+    if session_config is None:
+        session_config = {}
+
+    names = list(dict.fromkeys(names))
+    ssm = ssm_client or get_ssm_client(session_config, profile=profile)
+
+    if not use_cache:
+        return _fetch_parameters(ssm, names, with_decryption, concurrency) if names else {}
+
+    scope = _cache_scope(ssm, with_decryption)
+    values, missing, stale = {}, [], []
+
+    for name in names:
+        value, status = _parameter_cache.get((scope, name), ttl, stale_ttl)
+
+        if status == 'missing':
+            missing.append(name)
+            continue
+
+        values[name] = value
+
+        if status == 'stale':
+            stale.append(name)
+
+    if stale:
+        def reload(keys):
+            fetched = _fetch_parameters(ssm, [key[1] for key in keys], with_decryption, concurrency)
+            return {(scope, name): value for name, value in fetched.items()}
+
+        _parameter_cache.refresh([(scope, name) for name in stale], reload)
+
+    if missing:
+        for name, value in _fetch_parameters(ssm, missing, with_decryption, concurrency).items():
+            _parameter_cache.put((scope, name), value)
+            values[name] = value
+
+    return {name: values[name] for name in names}
+
+
+def get_ssm_parameters_by_path(
+    paths: str | Iterable[str],
+    session_config: dict | None = None,
+    profile: str | None = None,
+    ssm_client: Optional[SSMClient] = None,
+    *,
+    recursive: bool = True,
+    with_decryption: bool = True,
+    use_cache: bool = True,
+    ttl: float = SSM_CACHE_TTL,
+    stale_ttl: float = SSM_CACHE_STALE_TTL,
+    concurrency: int = 4
+) -> dict[str, str]:
+    """Retrieve all parameters under one or more paths of AWS SSM Parameter Store.
+
+    Each path is paginated with GetParametersByPath, and several paths are loaded in parallel. The
+    parameters of each path are cached as a whole, like get_ssm_parameters.
+
+    Args:
+        paths: A path or paths, e.g. '/app/prod/'.
+        session_config (dict): Optional AWS session configuration.
+        profile: Explicit AWS profile name. Takes precedence over session_config['profile'].
+        ssm_client (Optional[SSMClient]): An existing SSM client to use.
+        recursive (bool): Whether to include parameters in nested paths.
+        with_decryption (bool): If True, returns the decrypted value for SecureString parameters.
+        use_cache (bool): Whether to read and update the in-process cache.
+        ttl (float): Seconds cached values are fresh.
+        stale_ttl (float): Further seconds expired values may be served while they are refreshed.
+        concurrency (int): Number of paths loaded in parallel.
+
+    Returns:
+        dict[str, str]: The parameter values by full name.
+    """
+    if session_config is None:
+        session_config = {}
+
+    if isinstance(paths, str):
+        paths = [paths]
+
+    paths = list(dict.fromkeys(paths))
+    ssm = ssm_client or get_ssm_client(session_config, profile=profile)
+    scope = _cache_scope(ssm, with_decryption) + ('path', recursive)
+
+    def load(path):
+        paginator = ssm.get_paginator('get_parameters_by_path')
+        pages = paginator.paginate(Path=path, Recursive=recursive, WithDecryption=with_decryption)
+        return {parameter['Name']: parameter['Value'] for page in pages for parameter in page['Parameters']}
+
+    def load_all(keys):
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(keys))) as executor:
+            return dict(zip(keys, executor.map(lambda key: load(key[-1]), keys)))
+
+    by_path, missing, stale = {}, [], []
+
+    for path in paths:
+        value, status = _parameter_cache.get((scope, path), ttl, stale_ttl) if use_cache else (None, 'missing')
+
+        if status == 'missing':
+            missing.append((scope, path))
+            continue
+
+        by_path[path] = value
+
+        if status == 'stale':
+            stale.append((scope, path))
+
+    if stale:
+        _parameter_cache.refresh(stale, load_all)
+
+    if missing:
+        for key, parameters in load_all(missing).items():
+            if use_cache:
+                _parameter_cache.put(key, parameters)
+
+            by_path[key[-1]] = parameters
+
+    values = {}
+
+    for path in paths:
+        values.update(by_path[path])
+
+    return values
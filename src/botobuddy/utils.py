@@ -1,3 +1,11 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Hashable, Iterable, Iterator
+
+from botobuddy.logger import logger
+
+
 # Note to agents: this function is used elsewhere, do not remove it
 def dslice(d, *keys):
     """Slice a dictionary into a new dictionary using specified keys and optional transformations.
@@ -41,3 +49,200 @@ def dslice(d, *keys):
             result[name] = value
 
     return result
+
+
+class RateLimiter:
+    """A thread-safe token bucket limiting the rate at which units (requests, bytes, capacity) are consumed.
+
+    The bucket holds up to one second worth of units, so short bursts are allowed
+    while the long-term rate stays at or below the configured limit.
+    """
+
+    def __init__(self, rate: float):
+        """Initialize RateLimiter.
+
+        Args:
+            rate: The maximum number of units per second.
+
+        Raises:
+            ValueError: If rate is not positive.
+        """
+        if rate <= 0:
+            raise ValueError(f'Invalid rate: {rate}. Must be positive')
+
+        self.rate = rate
+        self._tokens = rate
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, units: float = 1):
+        """Block until the requested number of units is available, then consume them.
+
+        Requests larger than the bucket size are allowed and put the bucket into debt,
+        delaying subsequent callers accordingly.
+
+        Args:
+            units: The number of units to consume.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= units
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+
+        if wait > 0:
+            time.sleep(wait)
+
+
+def submit_bounded(
+    executor: Executor,
+    fn: Callable,
+    items: Iterable[tuple],
+    max_in_flight: int
+) -> Iterator[Future]:
+    """Submit fn(*item) for every item while keeping at most max_in_flight tasks pending.
+
+    Items are pulled from the iterable lazily, so a slow or unbounded producer (e.g. a paginated listing)
+    feeds the executor as it goes and memory stays proportional to max_in_flight.
+
+    Args:
+        executor: The executor to submit tasks to.
+        fn: The callable to run for every item.
+        items: An iterable of argument tuples.
+        max_in_flight: The maximum number of submitted but not yet collected tasks.
+
+    Yields:
+        Future: Completed futures, in completion order.
+    """
+    in_flight = set()
+
+    for item in items:
+        in_flight.add(executor.submit(fn, *item))
+
+        if len(in_flight) >= max_in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            yield from done
+
+    while in_flight:
+        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        yield from done
+
+
+# Default maximum number of entries of a TTLCache
+TTL_CACHE_MAX_SIZE = 4096
+
+
+class TTLCache:
+    """A thread-safe in-process cache whose entries expire after a time-to-live.
+
+    The time-to-live is given on lookup, so one cache can serve callers with different freshness needs.
+    Entries past their TTL but within the stale window are still served as 'stale', and refresh() reloads
+    them in a background thread, at most once at a time per key (stale-while-revalidate).
+
+    Expired entries are dropped when they are looked up, and the least recently stored entries once the
+    cache holds more than max_size, so entries that are never looked up again do not accumulate.
+    """
+
+    def __init__(self, refresh_workers: int = 4, max_size: int = TTL_CACHE_MAX_SIZE):
+        """Initialize TTLCache.
+
+        Args:
+            refresh_workers: Maximum number of concurrent background refreshes.
+            max_size: Maximum number of entries.
+        """
+        self.refresh_workers = refresh_workers
+        self.max_size = max_size
+        self._entries = {}
+        self._refreshing = set()
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, ttl: float, stale_ttl: float = 0) -> tuple[Any, str]:
+        """Look up an entry.
+
+        Args:
+            key: The cache key.
+            ttl: Seconds after which the entry is no longer fresh.
+            stale_ttl: Further seconds during which the expired entry may still be served.
+
+        Returns:
+            tuple: (value, status) where status is 'fresh', 'stale' or 'missing' (value is then None).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None:
+            return None, 'missing'
+
+        value, stored = entry
+        age = time.monotonic() - stored
+
+        if age < ttl:
+            return value, 'fresh'
+
+        if age < ttl + stale_ttl:
+            return value, 'stale'
+
+        with self._lock:
+            # Unless it was stored again in the meantime
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+
+        return None, 'missing'
+
+    def put(self, key: Hashable, value: Any):
+        """Store an entry, resetting its age, and evict the least recently stored entries beyond max_size."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, time.monotonic())
+
+            while len(self._entries) > self.max_size:
+                del self._entries[next(iter(self._entries))]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def invalidate(self, key: Hashable):
+        """Remove an entry if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def refresh(self, keys: Iterable[Hashable], loader: Callable[[list], dict]) -> Future | None:
+        """Reload entries in a background thread, skipping keys that are already being refreshed.
+
+        Args:
+            keys: The keys to reload.
+            loader: Called with the list of keys, returns their new values by key. Errors are logged
+                and leave the current entries in place.
+
+        Returns:
+            Future | None: The background refresh, or None if there was nothing to refresh.
+        """
+        with self._lock:
+            keys = [key for key in keys if key not in self._refreshing]
+
+            if not keys:
+                return None
+
+            self._refreshing.update(keys)
+
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.refresh_workers, thread_name_prefix='botobuddy-refresh')
+
+        def run():
+            try:
+                for key, value in loader(keys).items():
+                    self.put(key, value)
+            except Exception as e:
+                logger.warning(f'Background refresh of {len(keys)} cache entries failed: {e}')
+            finally:
+                with self._lock:
+                    self._refreshing.difference_update(keys)
+
+        return self._executor.submit(run)
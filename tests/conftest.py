@@ -0,0 +1,17 @@
+import pytest
+
+from botobuddy.common import clear_aws_cache
+
+
+@pytest.fixture(autouse=True)
+def aws_environment(monkeypatch):
+    '''Point boto3 at fake credentials and a fixed region, and start each test with empty caches.'''
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    monkeypatch.delenv('AWS_PROFILE', raising=False)
+    monkeypatch.delenv('AWS_ENDPOINT_URL', raising=False)
+
+    clear_aws_cache()
+    yield
+    clear_aws_cache()
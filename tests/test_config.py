@@ -0,0 +1,152 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from botobuddy import config
+
+
+@pytest.mark.parametrize('reference, expected', [
+    ('ssm:///app/prod/db/host', ('ssm', '/app/prod/db/host', {})),
+    ('ssm:///app/prod/', ('ssm', '/app/prod/', {})),
+    ('ssm://plain-name', ('ssm', 'plain-name', {})),
+    ('secretsmanager://prod/db', ('secretsmanager', 'prod/db', {})),
+    (
+        'secretsmanager://prod/db?plain&stage=AWSPREVIOUS',
+        ('secretsmanager', 'prod/db', {'plain': '', 'stage': 'AWSPREVIOUS'})
+    ),
+    ('s3://bkt/conf/app.yaml', ('s3', 's3://bkt/conf/app.yaml', {})),
+    ('s3://bkt/app.conf?format=toml', ('s3', 's3://bkt/app.conf', {'format': 'toml'})),
+])
+def test_parse_reference(reference, expected):
+    assert config.parse_reference(reference) == expected
+
+
+@pytest.mark.parametrize('reference', ['https://example.com/app.yaml', '/app/prod/db/host', 'vault://secret'])
+def test_parse_reference_rejects_unsupported_schemes(reference):
+    with pytest.raises(UserWarning, match='Unsupported'):
+        config.parse_reference(reference)
+
+
+def test_nest_builds_a_tree_from_the_rest_of_the_names():
+    parameters = {'/app/prod/db/host': 'h', '/app/prod/db/port': '5432', '/app/prod/debug': 'false'}
+
+    assert config._nest(parameters, '/app/prod/') == {'db': {'host': 'h', 'port': '5432'}, 'debug': 'false'}
+    assert config._nest({}, '/app/') == {}
+
+
+@pytest.fixture
+def sources():
+    with mock_aws():
+        config.clear_config_cache()
+        ssm = boto3.client('ssm')
+        ssm.put_parameter(Name='/app/prod/db/host', Value='db.internal', Type='String')
+        ssm.put_parameter(Name='/app/prod/db/port', Value='5432', Type='String')
+        ssm.put_parameter(Name='/app/prod/debug', Value='false', Type='String')
+
+        secrets = boto3.client('secretsmanager')
+        secrets.create_secret(Name='prod/db', SecretString=json.dumps({'user': 'app', 'password': 'pw'}))
+        secrets.create_secret(Name='prod/token', SecretString='raw-token')
+
+        s3 = boto3.client('s3')
+        s3.create_bucket(Bucket='bkt')
+        s3.put_object(Bucket='bkt', Key='app.yaml', Body=b'db:\n  pool: 10\n  host: default\nname: app\n')
+
+        yield
+
+        config.clear_config_cache()
+
+
+SPEC = {
+    '': 's3://bkt/app.yaml',
+    'db': 'ssm:///app/prod/db/',
+    'db.credentials': 'secretsmanager://prod/db',
+    'token': 'secretsmanager://prod/token?plain',
+    'debug': 'ssm:///app/prod/debug',
+}
+
+
+def test_resolve_config_merges_all_references_in_order(sources):
+    resolved = config.resolve_config(SPEC)
+
+    assert resolved == {
+        'name': 'app',
+        'db': {'pool': 10, 'host': 'db.internal', 'port': '5432', 'credentials': {'user': 'app', 'password': 'pw'}},
+        'token': 'raw-token',
+        'debug': 'false',
+    }
+    assert resolved['db.credentials.user'] == 'app'
+
+
+def test_resolve_config_is_memoized_until_refreshed(sources):
+    first = config.resolve_config(SPEC)
+    boto3.client('ssm').put_parameter(Name='/app/prod/debug', Value='true', Type='String', Overwrite=True)
+
+    assert config.resolve_config(SPEC) == first
+    assert config.resolve_config(SPEC, ttl=0)['debug'] == 'true'
+    assert config.resolve_config(SPEC, refresh=True)['debug'] == 'true'
+
+
+def test_resolve_config_returns_copies(sources):
+    first = config.resolve_config(SPEC)
+    first['db.credentials.password'] = 'changed'
+
+    assert config.resolve_config(SPEC)['db.credentials.password'] == 'pw'
+
+
+def counting_fetches(monkeypatch):
+    calls = []
+    fetch = config._fetch_references
+
+    def counting(references, session_config, *args):
+        calls.append(session_config)
+        return fetch(references, session_config, *args)
+
+    monkeypatch.setattr(config, '_fetch_references', counting)
+    return calls
+
+
+def test_resolve_config_is_memoized_per_session(sources, monkeypatch):
+    calls = counting_fetches(monkeypatch)
+
+    config.resolve_config(SPEC)
+    config.resolve_config(SPEC, {'session_name': 'other'})
+    config.resolve_config(SPEC, {'credential_cache': True})
+    config.resolve_config(SPEC, {'session_name': 'other'})
+
+    assert calls == [{}, {'session_name': 'other'}, {'credential_cache': True}]
+
+
+def test_resolve_config_only_serializes_resolutions_of_the_same_spec(sources, monkeypatch):
+    fetch = config._fetch_references
+    started, release = threading.Event(), threading.Event()
+
+    def blocking(references, *args):
+        if references == ['s3://bkt/app.yaml']:
+            started.set()
+            release.wait(5)
+
+        return fetch(references, *args)
+
+    monkeypatch.setattr(config, '_fetch_references', blocking)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        slow = executor.submit(config.resolve_config, ['s3://bkt/app.yaml'])
+        started.wait(5)
+
+        # Resolving another spec does not wait for the slow one
+        assert config.resolve_config({'debug': 'ssm:///app/prod/debug'}) == {'debug': 'false'}
+        assert not slow.done()
+
+        release.set()
+        assert slow.result()['name'] == 'app'
+
+    assert config._config_locks == {}
+
+
+def test_resolve_config_rejects_non_dictionaries_at_the_root(sources):
+    with pytest.raises(UserWarning, match='root'):
+        config.resolve_config(['secretsmanager://prod/token?plain'])
@@ -0,0 +1,266 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+from moto import mock_aws
+
+from botobuddy import dynamo
+
+
+@pytest.fixture
+def table():
+    with mock_aws():
+        resource = boto3.resource('dynamodb', region_name='us-east-1')
+        table = resource.create_table(
+            TableName='items',
+            KeySchema=[{'AttributeName': 'pk', 'KeyType': 'HASH'}, {'AttributeName': 'sk', 'KeyType': 'RANGE'}],
+            AttributeDefinitions=[
+                {'AttributeName': 'pk', 'AttributeType': 'S'}, {'AttributeName': 'sk', 'AttributeType': 'N'}
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+
+        with table.batch_writer() as writer:
+            for i in range(300):
+                writer.put_item(Item={'pk': f'p{i % 7}', 'sk': i, 'payload': 'x' * 10})
+
+        yield resource, table
+
+
+@pytest.mark.parametrize('segments', [1, 4])
+def test_truncate_table_deletes_every_item(table, segments):
+    resource, items = table
+
+    assert dynamo.truncate_table(resource, 'items', segments=segments) == 300
+    assert items.scan(Select='COUNT')['Count'] == 0
+
+
+def test_truncate_segments_only_use_the_thread_safe_client(table):
+    resource, items = table
+
+    class ClientOnlyTable:
+        '''Exposes only what segment workers may touch from several threads.'''
+        name = items.name
+        meta = items.meta
+
+    controller = dynamo.AdaptiveRateController(1000)
+    scan_params = {'ProjectionExpression': '#pk, #sk', 'ExpressionAttributeNames': {'#pk': 'pk', '#sk': 'sk'}}
+
+    deleted = sum(
+        dynamo.truncate_segment(ClientOnlyTable(), {**scan_params, 'Segment': segment, 'TotalSegments': 3}, controller)
+        for segment in range(3)
+    )
+
+    assert deleted == 300
+    assert items.scan(Select='COUNT')['Count'] == 0
+
+
+def test_truncate_table_checkpoints_and_removes_state_file(table, tmp_path):
+    resource, items = table
+    state_file = tmp_path / 'state.json'
+
+    assert dynamo.truncate_table(resource, 'items', segments=2, state_file=state_file) == 300
+    assert not state_file.exists()
+
+
+def test_checkpoint_round_trips_typed_keys(tmp_path):
+    path = tmp_path / 'state.json'
+    key = {'pk': 'a', 'sk': Decimal('12.5'), 'bin': b'\x00\xff'}
+
+    checkpoint = dynamo.TruncateCheckpoint(path, 'items', 2)
+    checkpoint.update(1, key, 42, done=False)
+    checkpoint.update(0, None, 7, done=True)
+
+    resumed = dynamo.TruncateCheckpoint(path, 'items', 2, resume=True)
+
+    assert resumed.get(1) == {'last_evaluated_key': key, 'counter': 42, 'done': False}
+    assert resumed.get(0) == {'last_evaluated_key': None, 'counter': 7, 'done': True}
+
+
+def test_checkpoint_rejects_mismatched_resume(tmp_path):
+    path = tmp_path / 'state.json'
+    dynamo.TruncateCheckpoint(path, 'items', 2)
+
+    with pytest.raises(UserWarning):
+        dynamo.TruncateCheckpoint(path, 'items', 3, resume=True)
+
+    with pytest.raises(UserWarning):
+        dynamo.TruncateCheckpoint(path, 'other', 2, resume=True)
+
+    with pytest.raises(UserWarning):
+        dynamo.TruncateCheckpoint(tmp_path / 'missing.json', 'items', 2, resume=True)
+
+
+def test_truncate_table_resumes_from_checkpoint(table, tmp_path):
+    resource, items = table
+    state_file = tmp_path / 'state.json'
+
+    # Segment 0 finished earlier, segment 1 is untouched
+    checkpoint = dynamo.TruncateCheckpoint(state_file, 'items', 2)
+    checkpoint.update(0, None, 5, done=True)
+
+    remaining = items.scan(Select='COUNT', Segment=1, TotalSegments=2)['Count']
+    deleted = dynamo.truncate_table(resource, 'items', segments=2, state_file=state_file, resume=True)
+
+    assert deleted == 5 + remaining
+    assert items.scan(Select='COUNT', Segment=0, TotalSegments=2)['Count'] == 300 - remaining
+
+
+@pytest.fixture
+def stubbed_table(monkeypatch):
+    '''A table backed by a stubbed low-level client, the only part delete_batch and truncate_segment use.'''
+    client = boto3.client('dynamodb')
+    monkeypatch.setattr(dynamo.time, 'sleep', lambda seconds: None)
+
+    with Stubber(client) as stubber:
+        yield SimpleNamespace(name='items', meta=SimpleNamespace(client=client)), stubber
+
+    stubber.assert_no_pending_responses()
+
+
+def delete_requests(count):
+    return [{'DeleteRequest': {'Key': {'pk': {'S': f'p{i}'}}}} for i in range(count)]
+
+
+def write_response(units, unprocessed=None):
+    return {
+        'UnprocessedItems': {'items': unprocessed} if unprocessed else {},
+        'ConsumedCapacity': [{'TableName': 'items', 'CapacityUnits': units}]
+    }
+
+
+def test_delete_batch_charges_the_consumed_capacity_shortfall(stubbed_table, monkeypatch):
+    table, stubber = stubbed_table
+    requests = delete_requests(2)
+    stubber.add_response(
+        'batch_write_item', write_response(10.0),
+        {'RequestItems': {'items': requests}, 'ReturnConsumedCapacity': 'TOTAL'}
+    )
+
+    controller = dynamo.AdaptiveRateController(100)
+    charges = []
+    monkeypatch.setattr(controller, 'acquire', charges.append)
+
+    dynamo.delete_batch(table, [r['DeleteRequest']['Key'] for r in requests], controller)
+
+    # One unit per delete up front, then the 8 units the 5KB items consumed on top
+    assert charges == [2, 8]
+    assert controller.consumed_wcu == 10.0
+
+
+def test_scan_page_retries_throttled_scans_and_paces_reads(stubbed_table, monkeypatch):
+    table, stubber = stubbed_table
+    stubber.add_client_error('scan', 'ProvisionedThroughputExceededException')
+    stubber.add_response('scan', {'Items': [], 'Count': 0, 'ConsumedCapacity': {'CapacityUnits': 64.0}})
+
+    controller = dynamo.AdaptiveRateController(100, max_read_rate=50)
+    reads = []
+    monkeypatch.setattr(controller.read_limiter, 'acquire', reads.append)
+
+    assert dynamo.truncate_segment(table, {}, controller) == 0
+    assert controller.throttles == 1
+    assert controller.consumed_rcu == 64.0
+    assert reads == [64.0]
+    # Throttled reads do not slow down the writes
+    assert controller.rate == 100
+
+
+def test_scan_page_gives_up_after_max_throttle_retries(stubbed_table):
+    table, stubber = stubbed_table
+
+    for _ in range(dynamo.MAX_THROTTLE_RETRIES + 1):
+        stubber.add_client_error('scan', 'ThrottlingException')
+
+    with pytest.raises(UserWarning):
+        dynamo.scan_page(table.meta.client, {'TableName': 'items'}, dynamo.AdaptiveRateController(100))
+
+
+def test_controller_cuts_the_rate_on_throttling_and_recovers():
+    controller = dynamo.AdaptiveRateController(100, max_rate=120, min_rate=10, increase=25)
+
+    controller.on_throttle()
+    assert controller.rate == 50
+
+    for _ in range(3):
+        controller.on_throttle()
+
+    assert controller.rate == 10
+
+    controller.on_success()
+    assert controller.rate == 35
+
+    for _ in range(10):
+        controller.on_success()
+
+    assert controller.rate == 120
+    assert controller.throttles == 4
+
+
+def test_delete_batch_retries_unprocessed_items_at_a_lower_rate(stubbed_table):
+    table, stubber = stubbed_table
+    requests = delete_requests(3)
+
+    stubber.add_client_error('batch_write_item', 'ProvisionedThroughputExceededException')
+    stubber.add_response(
+        'batch_write_item', write_response(2.0, unprocessed=requests[2:]),
+        {'RequestItems': {'items': requests}, 'ReturnConsumedCapacity': 'TOTAL'}
+    )
+    stubber.add_response(
+        'batch_write_item', write_response(1.0),
+        {'RequestItems': {'items': requests[2:]}, 'ReturnConsumedCapacity': 'TOTAL'}
+    )
+
+    controller = dynamo.AdaptiveRateController(100, increase=10)
+    dynamo.delete_batch(table, [r['DeleteRequest']['Key'] for r in requests], controller)
+
+    # Halved twice, then one additive step for the batch that finally went through
+    assert controller.rate == 35
+    assert controller.throttles == 2
+    assert controller.items == 3
+    assert controller.consumed_wcu == 3.0
+
+
+def test_delete_batch_gives_up_after_max_throttle_retries(stubbed_table):
+    table, stubber = stubbed_table
+    requests = delete_requests(2)
+
+    for _ in range(dynamo.MAX_THROTTLE_RETRIES + 1):
+        stubber.add_response('batch_write_item', write_response(1.0, unprocessed=requests[1:]))
+
+    controller = dynamo.AdaptiveRateController(100)
+
+    with pytest.raises(UserWarning, match='Giving up on 1 items'):
+        dynamo.delete_batch(table, [r['DeleteRequest']['Key'] for r in requests], controller)
+
+    assert controller.throttles == dynamo.MAX_THROTTLE_RETRIES
+
+
+def test_delete_batch_raises_other_client_errors(stubbed_table):
+    table, stubber = stubbed_table
+    stubber.add_client_error('batch_write_item', 'ValidationException')
+
+    with pytest.raises(dynamo.ClientError):
+        dynamo.delete_batch(table, [{'pk': {'S': 'p0'}}], dynamo.AdaptiveRateController(100))
+
+
+def test_controller_report_totals(monkeypatch):
+    controller = dynamo.AdaptiveRateController(100)
+    controller.on_read({'CapacityUnits': 12.5})
+    controller.on_read(None)
+    controller.on_write(20, [{'CapacityUnits': 30.0}])
+    controller.on_write(0, None)
+    controller.on_throttle()
+
+    monkeypatch.setattr(dynamo.time, 'monotonic', lambda: controller.started + 4)
+
+    assert controller.report() == {
+        'items': 20,
+        'elapsed_seconds': 4.0,
+        'items_per_second': 5.0,
+        'consumed_wcu': 30.0,
+        'wcu_per_second': 7.5,
+        'consumed_rcu': 12.5,
+        'throttles': 1,
+    }
@@ -0,0 +1,241 @@
+import io
+import json
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+from click.testing import CliRunner
+from moto import mock_aws
+
+from botobuddy import route53
+
+
+def record(name, values, record_type='A', ttl=300, **extra):
+    return {
+        'Name': name, 'Type': record_type, 'TTL': ttl,
+        'ResourceRecords': [{'Value': value} for value in values], **extra
+    }
+
+
+def change(action, values):
+    return {'Action': action, 'ResourceRecordSet': record('x.example.com.', values)}
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(route53.time, 'sleep', lambda seconds: None)
+
+
+def test_plan_record_changes_submits_only_differences():
+    current = [
+        record('example.com.', ['ns1.example.com.'], 'NS'),
+        record('Same.Example.com', ['1.1.1.1', '2.2.2.2']),
+        record('changed.example.com.', ['1.1.1.1']),
+        record('\\052.example.com.', ['3.3.3.3']),
+        record('gone.example.com.', ['4.4.4.4']),
+    ]
+    desired = [
+        record('example.com.', ['ns2.example.com.'], 'NS'),
+        record('same.example.com.', ['2.2.2.2', '1.1.1.1']),
+        record('changed.example.com.', ['9.9.9.9']),
+        record('*.example.com', ['3.3.3.3']),
+        record('new.example.com.', ['5.5.5.5']),
+    ]
+
+    assert route53.plan_record_changes(current, desired) == [
+        {'Action': 'UPSERT', 'ResourceRecordSet': desired[2]},
+        {'Action': 'CREATE', 'ResourceRecordSet': desired[4]},
+    ]
+
+    changes = route53.plan_record_changes(current, desired, delete=True)
+    assert changes[0] == {'Action': 'DELETE', 'ResourceRecordSet': current[4]}
+    assert len(changes) == 3
+
+
+def test_plan_record_changes_keeps_weighted_record_sets_apart():
+    current = [record('w.example.com.', ['1.1.1.1'], SetIdentifier='a', Weight=1)]
+    desired = current + [record('w.example.com.', ['2.2.2.2'], SetIdentifier='b', Weight=1)]
+
+    assert route53.plan_record_changes(current, desired) == [{'Action': 'CREATE', 'ResourceRecordSet': desired[1]}]
+
+
+def test_batch_record_changes_counts_upserts_twice_against_the_record_limit():
+    changes = [change('CREATE', ['1.1.1.1', '2.2.2.2']), change('UPSERT', ['3.3.3.3']), change('DELETE', ['4.4.4.4'])]
+
+    batches = route53.batch_record_changes(changes, max_records=4)
+
+    assert batches == [changes[:2], changes[2:]]
+
+
+def test_batch_record_changes_respects_the_character_limit():
+    changes = [change('CREATE', ['a' * 6]), change('CREATE', ['b' * 5]), change('UPSERT', ['c' * 3])]
+
+    assert route53.batch_record_changes(changes, max_characters=11) == [changes[:2], changes[2:]]
+    assert route53.batch_record_changes(changes, max_characters=10) == [changes[:1], changes[1:2], changes[2:]]
+
+
+def test_batch_record_changes_gives_oversized_changes_their_own_batch():
+    changes = [change('CREATE', ['1.1.1.1']), change('CREATE', ['2.2.2.2'] * 5), change('CREATE', ['3.3.3.3'])]
+
+    assert route53.batch_record_changes(changes, max_records=3) == [[change] for change in changes]
+    assert route53.batch_record_changes([]) == []
+
+
+def test_apply_record_changes_waits_until_all_batches_are_in_sync(no_sleep):
+    client = boto3.client('route53')
+    batches = [[change('CREATE', ['1.1.1.1'])], [change('DELETE', ['2.2.2.2'])]]
+
+    with Stubber(client) as stubber:
+        for number, batch in enumerate(batches):
+            stubber.add_response(
+                'change_resource_record_sets',
+                {'ChangeInfo': {'Id': f'c{number}', 'Status': 'PENDING', 'SubmittedAt': '2026-01-01'}},
+                {'HostedZoneId': 'Z1', 'ChangeBatch': {'Comment': 'botobuddy import', 'Changes': batch}}
+            )
+
+        for change_id, status in [('c0', 'INSYNC'), ('c1', 'PENDING'), ('c1', 'INSYNC')]:
+            stubber.add_response(
+                'get_change', {'ChangeInfo': {'Id': change_id, 'Status': status, 'SubmittedAt': '2026-01-01'}},
+                {'Id': change_id}
+            )
+
+        assert route53.apply_record_changes(client, 'Z1', batches, max_rps=1000) == ['c0', 'c1']
+        stubber.assert_no_pending_responses()
+
+
+def test_import_applies_the_plan_to_a_hosted_zone(no_sleep):
+    with mock_aws():
+        client = boto3.client('route53')
+        zone_id = client.create_hosted_zone(Name='example.com', CallerReference='ref')['HostedZone']['Id']
+        existing = [record('a.example.com.', ['1.1.1.1']), record('b.example.com.', ['2.2.2.2'])]
+        route53.apply_record_changes(
+            client, zone_id, [[{'Action': 'CREATE', 'ResourceRecordSet': r} for r in existing]], wait=False
+        )
+
+        desired = [record('a.example.com.', ['1.1.1.1']), record('c.example.com.', ['3.3.3.3'])]
+        changes = route53.plan_record_changes(route53.list_record_sets(client, zone_id), desired, delete=True)
+
+        assert [(c['Action'], c['ResourceRecordSet']['Name']) for c in changes] == [
+            ('DELETE', 'b.example.com.'), ('CREATE', 'c.example.com.')
+        ]
+
+        route53.apply_record_changes(client, zone_id, route53.batch_record_changes(changes), max_rps=1000)
+
+        names = {r['Name'] for r in route53.list_record_sets(client, zone_id) if r['Type'] == 'A'}
+        assert names == {'a.example.com.', 'c.example.com.'}
+
+
+class CountingLimiter(route53.RateLimiter):
+    def __init__(self, rate=1000):
+        super().__init__(rate)
+        self.acquired = 0
+
+    def acquire(self, units=1):
+        self.acquired += units
+
+
+@pytest.fixture
+def zones():
+    with mock_aws():
+        client = boto3.client('route53')
+        zone_ids = []
+
+        for number, size in enumerate([650, 3, 0]):
+            zone_id = client.create_hosted_zone(
+                Name=f'zone{number}.example.com', CallerReference=f'ref{number}'
+            )['HostedZone']['Id']
+            records = [record(f'r{i}.zone{number}.example.com.', [f'10.0.{i // 256}.{i % 256}']) for i in range(size)]
+            changes = [{'Action': 'CREATE', 'ResourceRecordSet': r} for r in records]
+            route53.apply_record_changes(client, zone_id, route53.batch_record_changes(changes), wait=False)
+            zone_ids.append(zone_id)
+
+        yield client, zone_ids
+
+
+def test_list_record_sets_pages_past_300_records(zones):
+    client, zone_ids = zones
+    limiter = CountingLimiter()
+
+    records = list(route53.list_record_sets(client, zone_ids[0], limiter=limiter))
+
+    # The created A records plus the zone's own NS and SOA
+    assert len(records) == 652
+    assert len({route53.record_set_id(r) for r in records}) == 652
+    assert limiter.acquired == 3
+
+
+EXPORTED = [
+    record('\\052.example.com.', ['1.1.1.1', '2.2.2.2'], ttl=60),
+    record('w.example.com.', ['3.3.3.3'], SetIdentifier='blue', Weight=10),
+    {
+        'Name': 'alias.example.com.', 'Type': 'A',
+        'AliasTarget': {'HostedZoneId': 'Z2', 'DNSName': 'lb.example.net.', 'EvaluateTargetHealth': False}
+    },
+]
+
+
+def test_write_record_sets_json_matches_json_dumps():
+    out = io.StringIO()
+
+    assert route53.write_record_sets(iter(EXPORTED), out) == 3
+    assert out.getvalue() == json.dumps(EXPORTED, indent=2) + '\n'
+
+    empty = io.StringIO()
+    assert route53.write_record_sets([], empty) == 0
+    assert empty.getvalue() == '[]\n'
+
+
+def test_write_record_sets_ndjson():
+    out = io.StringIO()
+
+    assert route53.write_record_sets(iter(EXPORTED), out, 'ndjson') == 3
+    assert [json.loads(line) for line in out.getvalue().splitlines()] == EXPORTED
+
+
+def test_write_record_sets_bind():
+    out = io.StringIO()
+
+    assert route53.write_record_sets(iter(EXPORTED), out, 'bind') == 3
+    assert out.getvalue().splitlines() == [
+        '*.example.com.\t60\tIN\tA\t1.1.1.1',
+        '*.example.com.\t60\tIN\tA\t2.2.2.2',
+        "; Routing policy set 'blue' (not representable in BIND)",
+        'w.example.com.\t300\tIN\tA\t3.3.3.3',
+        '; alias.example.com. ALIAS A lb.example.net. (not representable in BIND)',
+    ]
+
+
+def test_export_hosted_zones_writes_one_file_per_zone(zones, tmp_path):
+    client, zone_ids = zones
+    limiter = CountingLimiter()
+
+    paths = route53.export_hosted_zones(client, zone_ids, tmp_path, 'ndjson', concurrency=3, limiter=limiter)
+
+    assert paths == [tmp_path / f'{zone_id.rsplit("/", 1)[-1]}.ndjson' for zone_id in zone_ids]
+
+    for zone_id, path in zip(zone_ids, paths):
+        exported = [json.loads(line) for line in path.read_text().splitlines()]
+        assert exported == list(route53.list_record_sets(client, zone_id))
+
+    # Three pages for the large zone, one for each of the others
+    assert limiter.acquired == 5
+
+
+def test_export_all_zones_rate_limits_the_zone_listing(zones, tmp_path, monkeypatch):
+    limiters = []
+
+    def counting_limiter(rate):
+        limiters.append(CountingLimiter(rate))
+        return limiters[-1]
+
+    monkeypatch.setattr(route53, 'RateLimiter', counting_limiter)
+
+    result = CliRunner().invoke(
+        route53.route53_group, ['export', '--all-zones', '--format', 'bind', '--output-dir', str(tmp_path)], obj={}
+    )
+
+    assert result.exit_code == 0, result.output
+    assert len(list(tmp_path.glob('*.zone'))) == 3
+
+    # One shared limiter for the zone listing page and the five record set pages
+    assert [limiter.acquired for limiter in limiters] == [6]
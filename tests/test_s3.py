@@ -0,0 +1,855 @@
+import gzip
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import urlparse
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError, ReadTimeoutError
+from botocore.stub import Stubber
+from click.testing import CliRunner
+from moto import mock_aws
+
+from botobuddy import s3
+from botobuddy.s3cache import ObjectCache
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(s3.time, 'sleep', lambda seconds: None)
+
+
+@pytest.fixture
+def stubbed_s3():
+    client = boto3.client('s3', region_name='us-east-1')
+
+    with Stubber(client) as stubber:
+        yield client, stubber
+        stubber.assert_no_pending_responses()
+
+
+def stub_versions(stubber, keys):
+    stubber.add_response(
+        'list_object_versions',
+        {'Versions': [{'Key': key, 'VersionId': f'v-{key}'} for key in keys], 'IsTruncated': False},
+        {'Bucket': 'bkt'}
+    )
+
+
+def delete_params(keys):
+    objects = [{'Key': key, 'VersionId': f'v-{key}'} for key in keys]
+    return {'Bucket': 'bkt', 'Delete': {'Objects': objects, 'Quiet': True}}
+
+
+def test_delete_bucket_contents_retries_failed_keys(stubbed_s3, no_sleep):
+    client, stubber = stubbed_s3
+    stub_versions(stubber, ['a', 'b', 'c'])
+    stubber.add_response(
+        'delete_objects',
+        {'Errors': [{'Key': 'b', 'VersionId': 'v-b', 'Code': 'InternalError', 'Message': 'retry'}]},
+        delete_params(['a', 'b', 'c'])
+    )
+    stubber.add_response('delete_objects', {}, delete_params(['b']))
+
+    assert s3.delete_bucket_contents(client, 'bkt', concurrency=1) == {'deleted': 3, 'failed': []}
+
+
+def test_delete_bucket_contents_retries_transient_request_errors(stubbed_s3, no_sleep):
+    client, stubber = stubbed_s3
+    stub_versions(stubber, ['a', 'b'])
+    stubber.add_client_error(
+        'delete_objects', 'SlowDown', http_status_code=503, expected_params=delete_params(['a', 'b'])
+    )
+    stubber.add_client_error('delete_objects', 'InternalError', http_status_code=500)
+    stubber.add_response('delete_objects', {}, delete_params(['a', 'b']))
+
+    assert s3.delete_bucket_contents(client, 'bkt', concurrency=1) == {'deleted': 2, 'failed': []}
+
+
+def test_delete_bucket_contents_reports_keys_after_exhausting_retries(stubbed_s3, no_sleep):
+    client, stubber = stubbed_s3
+    stub_versions(stubber, ['a'])
+
+    for _ in range(3):
+        stubber.add_client_error('delete_objects', 'SlowDown', http_status_code=503)
+
+    summary = s3.delete_bucket_contents(client, 'bkt', concurrency=1, max_retries=2)
+
+    assert summary['deleted'] == 0
+    assert summary['failed'] == [{'Key': 'a', 'VersionId': 'v-a', 'Code': 'SlowDown', 'Message': ''}]
+
+
+def test_delete_bucket_contents_raises_on_permanent_errors(stubbed_s3, no_sleep):
+    client, stubber = stubbed_s3
+    stub_versions(stubber, ['a'])
+    stubber.add_client_error('delete_objects', 'AccessDenied', http_status_code=403)
+
+    with pytest.raises(ClientError):
+        s3.delete_bucket_contents(client, 'bkt', concurrency=1)
+
+
+@pytest.fixture
+def bucket():
+    with mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket='bkt')
+
+        for key in ['foo', 'foo/keep.txt', 'foo/orphan.txt', 'foo/sub/orphan.txt', 'foobar/x', 'foo-old/y', 'other']:
+            client.put_object(Bucket='bkt', Key=key, Body=b'remote')
+
+        yield client
+
+
+def keys(client):
+    return {obj['Key'] for obj in client.list_objects_v2(Bucket='bkt')['Contents']}
+
+
+@pytest.mark.parametrize('recursive, deleted', [
+    (True, {'foo/orphan.txt', 'foo/sub/orphan.txt'}),
+    (False, {'foo/orphan.txt'}),
+])
+def test_sync_folder_to_s3_only_deletes_orphans_inside_the_folder(bucket, tmp_path, recursive, deleted):
+    (tmp_path / 'keep.txt').write_text('local')
+    (tmp_path / 'new.txt').write_text('local')
+    before = keys(bucket)
+
+    summary = s3.sync_folder_to_s3(tmp_path, 's3://bkt/foo', recursive=recursive, delete=True)
+
+    assert summary['deleted'] == len(deleted)
+    assert keys(bucket) == (before - deleted) | {'foo/new.txt'}
+    assert bucket.get_object(Bucket='bkt', Key='foo/keep.txt')['Body'].read() == b'local'
+
+
+def test_sync_folder_to_s3_bucket_root(bucket, tmp_path):
+    (tmp_path / 'other').write_text('local')
+
+    before = keys(bucket)
+
+    summary = s3.sync_folder_to_s3(tmp_path, 's3://bkt/', delete=True)
+
+    # Without recursion only top-level objects are compared
+    assert summary['deleted'] == 1
+    assert keys(bucket) == before - {'foo'}
+
+
+def zstd_frame(data):
+    '''A single-segment zstd frame holding data in one raw block, so no zstd library is needed to build it.'''
+    assert len(data) < 256
+    block_header = (1 | len(data) << 3).to_bytes(3, 'little')
+    return s3.ZSTD_MAGIC + bytes([0x20, len(data)]) + block_header + data
+
+
+def zstd_available():
+    for module in ('compression.zstd', 'zstandard'):
+        try:
+            __import__(module)
+            return True
+        except ImportError:
+            pass
+
+    return False
+
+
+@pytest.mark.parametrize('key, body', [
+    ('conf/app.json', b'{"name": "app", "db": {"pool": 10}}'),
+    ('conf/app.yml', b'name: app\ndb:\n  pool: 10\n'),
+    ('conf/app.toml.gz', gzip.compress(b'name = "app"\n[db]\npool = 10\n')),
+    # Compression is detected from the contents, not the extension
+    ('conf/app.json', gzip.compress(b'{"name": "app", "db": {"pool": 10}}')),
+])
+def test_load_dict_formats_and_gzip(bucket, key, body):
+    bucket.put_object(Bucket='bkt', Key=key, Body=body)
+
+    loaded = s3.load_dict(f's3://bkt/{key}', s3_client=bucket)
+
+    assert loaded == {'name': 'app', 'db': {'pool': 10}}
+    assert loaded['db.pool'] == 10
+
+
+@pytest.mark.skipif(not zstd_available(), reason='no zstd decompressor installed')
+def test_load_dict_zstd(bucket):
+    bucket.put_object(Bucket='bkt', Key='conf/app.json.zst', Body=zstd_frame(b'{"name": "app"}'))
+
+    assert s3.load_dict('s3://bkt/conf/app.json.zst', s3_client=bucket) == {'name': 'app'}
+
+
+@pytest.mark.skipif(zstd_available(), reason='a zstd decompressor is installed')
+def test_load_dict_zstd_requires_a_decompressor(bucket):
+    bucket.put_object(Bucket='bkt', Key='conf/app.json.zst', Body=zstd_frame(b'{"name": "app"}'))
+
+    with pytest.raises(UserWarning, match='zstandard'):
+        s3.load_dict('s3://bkt/conf/app.json.zst', s3_client=bucket)
+
+
+def test_load_dict_enforces_max_size_before_and_after_decompression(bucket):
+    bucket.put_object(Bucket='bkt', Key='big.json', Body=b'{"pad": "' + b'x' * 200 + b'"}')
+    bucket.put_object(Bucket='bkt', Key='bomb.json', Body=gzip.compress(b'{"pad": "' + b'x' * 10000 + b'"}'))
+
+    with pytest.raises(UserWarning, match='larger than 100 bytes'):
+        s3.load_dict('s3://bkt/big.json', s3_client=bucket, max_size=100)
+
+    # Small compressed, but too large once decompressed
+    with pytest.raises(UserWarning, match='larger than 1000 bytes'):
+        s3.load_dict('s3://bkt/bomb.json', s3_client=bucket, max_size=1000)
+
+    assert len(s3.load_dict('s3://bkt/bomb.json', s3_client=bucket)['pad']) == 10000
+
+
+@pytest.mark.parametrize('spill_threshold, spilled', [(1024, True), (1024 * 1024, False)])
+def test_load_dict_spills_large_bodies_to_disk(bucket, monkeypatch, spill_threshold, spilled):
+    buffers = []
+
+    class RecordingSpooledTemporaryFile(tempfile.SpooledTemporaryFile):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            buffers.append(self)
+
+    # Only replaced for s3, moto buffers the stored objects in spooled files as well
+    monkeypatch.setattr(s3, 'tempfile', SimpleNamespace(SpooledTemporaryFile=RecordingSpooledTemporaryFile))
+    items = {f'key{number}': 'x' * 100 for number in range(100)}
+    bucket.put_object(Bucket='bkt', Key='large.json', Body=json.dumps(items).encode())
+
+    assert s3.load_dict('s3://bkt/large.json', s3_client=bucket, spill_threshold=spill_threshold) == items
+    assert [buffer._rolled for buffer in buffers] == [spilled]
+
+
+def test_load_dicts_keeps_the_given_order(bucket):
+    for number in range(5):
+        bucket.put_object(Bucket='bkt', Key=f'conf/{number}.json', Body=json.dumps({'n': number}).encode())
+
+    paths = [f's3://bkt/conf/{number}.json' for number in (3, 0, 4, 1, 2)]
+    loaded = s3.load_dicts(paths, concurrency=3)
+
+    assert list(loaded) == paths
+    assert [value['n'] for value in loaded.values()] == [3, 0, 4, 1, 2]
+
+
+def test_transfer_metrics_summary(monkeypatch):
+    records = []
+    metrics = s3.TransferMetrics(on_object=records.append)
+
+    # Durations of 1..100 seconds, with first-byte latencies a tenth of that and one missing
+    for number in range(100, 0, -1):
+        latency = number / 10 if number != 100 else None
+        metrics.record(f'k{number}', 1024 * 1024, float(number), retries=number % 2, first_byte_latency=latency)
+
+    monkeypatch.setattr(s3.time, 'monotonic', lambda: metrics.started + 4)
+    summary = metrics.summary()
+
+    assert summary['objects'] == 100
+    assert summary['bytes'] == 100 * 1024 * 1024
+    assert summary['retries'] == 50
+    assert summary['elapsed_seconds'] == 4
+    assert summary['mb_per_second'] == 25
+    assert summary['duration'] == {'p50': 50.0, 'p95': 95.0, 'p99': 99.0, 'max': 100.0}
+
+    # An object without a first-byte latency counts its whole duration
+    assert summary['first_byte_latency'] == {'p50': 5.0, 'p95': 9.5, 'p99': 9.9, 'max': 100.0}
+    assert records[0] == {
+        'key': 'k100', 'bytes': 1024 * 1024, 'duration': 100.0, 'retries': 0, 'first_byte_latency': 100.0
+    }
+
+
+def test_transfer_metrics_percentiles_of_few_values():
+    assert s3._percentile([], 50) == 0.0
+    assert s3._percentile([3.0], 99) == 3.0
+    assert [s3._percentile([1.0, 2.0, 3.0], percent) for percent in (0, 33, 34, 50, 67, 100)] == [
+        1.0, 1.0, 2.0, 2.0, 3.0, 3.0
+    ]
+
+
+def test_transfer_metrics_empty_summary_and_dump_json(tmp_path):
+    path = tmp_path / 'metrics.json'
+    metrics = s3.TransferMetrics()
+    metrics.dump_json(path)
+
+    dumped = json.loads(path.read_text())
+    empty = {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+
+    assert dumped['objects'] == dumped['bytes'] == dumped['retries'] == 0
+    assert dumped['mb_per_second'] == 0.0
+    assert dumped['duration'] == dumped['first_byte_latency'] == empty
+    assert dumped['elapsed_seconds'] > 0
+
+
+def test_transfer_metrics_reports_bytes_in_progress():
+    progress = []
+    metrics = s3.TransferMetrics(on_bytes=progress.append)
+
+    metrics.add_bytes(10)
+    metrics.add_bytes(5)
+
+    assert progress == [10, 5]
+    assert metrics.bytes == 0
+
+
+def sync_down(local_dir, **kwargs):
+    return s3.sync_folder_from_s3('s3://bkt/foo/', local_dir, recursive=True, incremental=True, **kwargs)
+
+
+def test_incremental_sync_skips_unchanged_files(bucket, tmp_path):
+    first = sync_down(tmp_path)
+    second = sync_down(tmp_path)
+
+    assert (first['downloaded'], first['skipped']) == (3, 0)
+    assert (second['downloaded'], second['skipped'], second['bytes_saved']) == (0, 3, 18)
+    assert set(s3.load_sync_manifest(tmp_path)) == {'foo/keep.txt', 'foo/orphan.txt', 'foo/sub/orphan.txt'}
+
+
+@pytest.mark.parametrize('body', [b'REMOTE', b'a longer body'])
+def test_incremental_sync_downloads_objects_with_a_new_etag_or_size(bucket, tmp_path, body):
+    sync_down(tmp_path)
+    bucket.put_object(Bucket='bkt', Key='foo/keep.txt', Body=body)
+
+    # Same LastModified second as the local copy, so only the ETag or size tells them apart
+    mtime = bucket.head_object(Bucket='bkt', Key='foo/keep.txt')['LastModified'].timestamp()
+    os.utime(tmp_path / 'keep.txt', (mtime, mtime))
+
+    summary = sync_down(tmp_path)
+
+    assert (summary['downloaded'], summary['skipped']) == (1, 2)
+    assert (tmp_path / 'keep.txt').read_bytes() == body
+    assert s3.load_sync_manifest(tmp_path)['foo/keep.txt']['etag'] == bucket.head_object(
+        Bucket='bkt', Key='foo/keep.txt'
+    )['ETag']
+
+
+@pytest.mark.parametrize('recursive, deleted', [(True, {'stale.txt', 'sub/stale.txt'}), (False, {'stale.txt'})])
+def test_sync_delete_only_removes_orphans_under_the_target_folder(bucket, tmp_path, recursive, deleted):
+    local_dir = tmp_path / 'local'
+    (local_dir / 'sub').mkdir(parents=True)
+    local_files = {'stale.txt', 'sub/stale.txt', 'keep.txt'}
+
+    for name in local_files:
+        (local_dir / name).write_text('local')
+
+    (tmp_path / 'outside.txt').write_text('local')
+
+    summary = s3.sync_folder_from_s3(
+        's3://bkt/foo/', local_dir, recursive=recursive, incremental=True, delete=True
+    )
+    remaining = {path.relative_to(local_dir).as_posix() for path in local_dir.rglob('*') if path.is_file()}
+
+    assert summary['deleted'] == len(deleted)
+    assert remaining == (local_files | {'orphan.txt', s3.SYNC_MANIFEST_NAME} | (
+        {'sub/orphan.txt'} if recursive else set()
+    )) - deleted
+    assert (tmp_path / 'outside.txt').exists()
+
+
+def test_incremental_sync_saves_the_manifest_after_a_partial_failure(bucket, tmp_path):
+    def deny(params, **kwargs):
+        if params['Key'] == 'foo/orphan.txt':
+            raise ClientError({'Error': {'Code': 'AccessDenied', 'Message': 'denied'}}, 'GetObject')
+
+    s3.get_transfer_s3_client(10).meta.events.register('before-parameter-build.s3.GetObject', deny)
+
+    summary = sync_down(tmp_path)
+
+    assert [failure['key'] for failure in summary['failed']] == ['foo/orphan.txt']
+    assert set(s3.load_sync_manifest(tmp_path)) == {'foo/keep.txt', 'foo/sub/orphan.txt'}
+
+
+def test_incremental_sync_saves_the_manifest_when_interrupted(bucket, tmp_path, monkeypatch):
+    list_all_objects = s3.list_all_objects
+
+    def interrupted_listing(*args, **kwargs):
+        yield from list(list_all_objects(*args, **kwargs))[:2]
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(s3, 'list_all_objects', interrupted_listing)
+
+    with pytest.raises(KeyboardInterrupt):
+        sync_down(tmp_path)
+
+    assert set(s3.load_sync_manifest(tmp_path)) == {'foo/keep.txt', 'foo/orphan.txt'}
+
+    # The next sync only downloads what the interrupted one did not
+    monkeypatch.setattr(s3, 'list_all_objects', list_all_objects)
+    assert sync_down(tmp_path)['downloaded'] == 1
+
+
+def test_fast_upload_reports_failed_files_and_retries_transient_errors(bucket, tmp_path, no_sleep):
+    for name in ('a', 'b', 'c'):
+        (tmp_path / name).write_text(name)
+
+    calls = []
+
+    def slow_down_once(params, **kwargs):
+        calls.append(params['Key'])
+
+        if params['Key'] == 'b' and calls.count('b') == 1:
+            raise ClientError({'Error': {'Code': 'SlowDown', 'Message': ''}}, 'PutObject')
+
+    # The client fast_upload_s3_files picks for its default concurrencies
+    s3.get_transfer_s3_client(40).meta.events.register('before-parameter-build.s3.PutObject', slow_down_once)
+
+    summary = s3.fast_upload_s3_files([
+        (tmp_path / 'a', 'bkt', 'up/a'),
+        (tmp_path / 'b', 'bkt', 'b'),
+        (tmp_path / 'c', 'missing-bucket', 'up/c'),
+    ])
+
+    assert summary['succeeded'] == 2
+    assert [(f['key'], f['local_path']) for f in summary['failed']] == [('up/c', tmp_path / 'c')]
+    assert 'NoSuchBucket' in summary['failed'][0]['error']
+    assert calls.count('b') == 2
+    assert bucket.get_object(Bucket='bkt', Key='b')['Body'].read() == b'b'
+
+
+def test_sync_folder_to_s3_reports_failed_uploads(bucket, tmp_path):
+    (tmp_path / 'ok.txt').write_text('local')
+    (tmp_path / 'denied.txt').write_text('local')
+
+    def deny(params, **kwargs):
+        if params['Key'].endswith('denied.txt'):
+            raise ClientError({'Error': {'Code': 'AccessDenied', 'Message': 'denied'}}, 'PutObject')
+
+    s3.get_transfer_s3_client(40).meta.events.register('before-parameter-build.s3.PutObject', deny)
+
+    summary = s3.sync_folder_to_s3(tmp_path, 's3://bkt/up')
+
+    assert summary['uploaded'] == 1
+    assert [f['key'] for f in summary['failed']] == ['up/denied.txt']
+    assert 'up/ok.txt' in keys(bucket)
+
+
+def test_transfer_client_pool_never_shrinks_below_the_botocore_default():
+    assert s3.get_transfer_s3_client(1).meta.config.max_pool_connections == 10
+    assert s3.get_transfer_s3_client(100).meta.config.max_pool_connections == 150
+
+
+def test_list_all_objects_parallel_matches_sequential(bucket):
+    sequential = [obj['Key'] for obj in s3.list_all_objects('s3://bkt/')]
+    parallel = [obj['Key'] for obj in s3.list_all_objects('s3://bkt/', concurrency=4)]
+
+    assert sorted(parallel) == sequential
+    assert [obj['Key'] for obj in s3.list_all_objects('s3://bkt/foo/')] == [
+        'foo/keep.txt', 'foo/orphan.txt', 'foo/sub/orphan.txt'
+    ]
+
+
+def test_fast_download_streams_a_paginated_listing(bucket, tmp_path):
+    keys = [f'foo/page{number}' for number in range(6)]
+    lister = boto3.client('s3', region_name='us-east-1')
+    log = []
+
+    for key in keys:
+        bucket.put_object(Bucket='bkt', Key=key, Body=key.encode())
+
+    def log_page(params, **kwargs):
+        log.append(('list', params.get('ContinuationToken', 'start')))
+
+    lister.meta.events.register('before-parameter-build.s3.ListObjectsV2', log_page)
+
+    with Stubber(lister) as stubber:
+        # One object per page, as with MaxKeys=1
+        for number, key in enumerate(keys):
+            page = {
+                'Contents': [{'Key': key, 'Size': 9, 'ETag': '"etag"', 'LastModified': '2024-01-01T00:00:00Z'}],
+                'IsTruncated': number < len(keys) - 1,
+            }
+            params = {'Bucket': 'bkt', 'Prefix': 'foo/'}
+
+            if number < len(keys) - 1:
+                page['NextContinuationToken'] = f'token{number + 1}'
+
+            if number:
+                params['ContinuationToken'] = f'token{number}'
+
+            stubber.add_response('list_objects_v2', page, params)
+
+        targets = (
+            ('bkt', obj['Key'], tmp_path / obj['Key'], obj['Size'])
+            for obj in s3.list_all_objects('s3://bkt/foo/', s3_client=lister)
+        )
+        summary = s3.fast_download_s3_files(
+            targets, concurrency=1, on_complete=lambda bucket, key, local_path: log.append(('download', key))
+        )
+
+    assert summary['succeeded'] == 6
+
+    # Downloads start with the first pages, instead of after the listing is exhausted
+    assert log.index(('download', 'foo/page0')) < log.index(('list', 'token3'))
+
+    # At most the bounded number of downloads in flight is buffered from the listing
+    listed = downloaded = 0
+
+    for action, _ in log:
+        listed += action == 'list'
+        downloaded += action == 'download'
+        assert listed - downloaded <= 3
+
+
+def test_ranged_download_reassembles_the_object(bucket, tmp_path):
+    body = bytes(range(256)) * 40
+    bucket.put_object(Bucket='bkt', Key='big', Body=body)
+
+    results = s3.fast_download_s3_files(
+        [('bkt', 'big', tmp_path / 'big', len(body))],
+        range_threshold=1024, range_chunk_size=1000, concurrency=4
+    )
+
+    assert results == {'succeeded': 1, 'skipped': 0, 'failed': []}
+    assert (tmp_path / 'big').read_bytes() == body
+
+
+def test_ranged_download_aborts_when_the_object_changes(bucket, tmp_path):
+    body = b'a' * 5000
+    bucket.put_object(Bucket='bkt', Key='big', Body=body)
+    ranges = []
+
+    def overwrite_after_first_range(params, **kwargs):
+        ranges.append(params['Range'])
+
+        if len(ranges) == 1:
+            boto3.client('s3', region_name='us-east-1').put_object(Bucket='bkt', Key='big', Body=b'b' * 5000)
+
+    client = s3.get_transfer_s3_client(1)
+    client.meta.events.register('before-parameter-build.s3.GetObject', overwrite_after_first_range)
+
+    results = s3.fast_download_s3_files(
+        [('bkt', 'big', tmp_path / 'big', len(body))],
+        range_threshold=1024, range_chunk_size=1000, concurrency=1
+    )
+
+    assert results['succeeded'] == 0
+    assert 'changed during the download' in results['failed'][0]['error']
+    assert ranges == ['bytes=0-999', 'bytes=1000-1999']
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_transfer_limiter_evicts_least_recently_used_prefixes(monkeypatch):
+    monkeypatch.setattr(s3, 'PREFIX_LIMITERS_MAX_SIZE', 2)
+    limiter = s3.TransferLimiter(max_prefix_rps=1000)
+
+    limiter.acquire_request('a/1')
+    limiter.acquire_request('b/1')
+    limiter.acquire_request('a/2')
+    limiter.acquire_request('c/1')
+
+    assert list(limiter._prefix_requests) == ['a', 'c']
+
+
+class CountingLimiter(s3.TransferLimiter):
+    def __init__(self):
+        super().__init__(max_rps=1000)
+        self.keys = []
+        self.bytes = 0
+
+    def acquire_request(self, key, count=1):
+        self.keys.extend([key] * count)
+
+    def acquire_keys(self, keys):
+        self.keys.extend(keys)
+
+    def acquire_bytes(self, count):
+        self.bytes += count
+
+
+def test_listing_and_deletes_count_against_the_limiter(bucket):
+    limiter = CountingLimiter()
+
+    listed = [obj['Key'] for obj in s3.list_all_objects('s3://bkt/foo/', s3_client=bucket, limiter=limiter)]
+    assert limiter.keys == ['foo/']
+
+    s3.delete_s3_objects(bucket, 'bkt', listed, limiter)
+    assert limiter.keys == ['foo/', *listed]
+
+
+def test_single_object_reads_count_against_the_limiter(bucket, tmp_path):
+    limiter = CountingLimiter()
+    bucket.put_object(Bucket='bkt', Key='conf/app.json', Body=b'{"name": "app"}')
+
+    s3.download(bucket, s3.S3Uri('s3://bkt/foo/keep.txt'), tmp_path / 'keep.txt', limiter=limiter)
+    assert limiter.keys == ['foo/keep.txt']
+    assert limiter.bytes == len(b'remote')
+
+    assert s3.load_dict('s3://bkt/conf/app.json', s3_client=bucket, limiter=limiter) == {'name': 'app'}
+    assert limiter.keys == ['foo/keep.txt', 'conf/app.json']
+    assert limiter.bytes == len(b'remote') + len(b'{"name": "app"}')
+
+
+def test_sync_s3_folders_counts_copies_against_the_limiter(bucket):
+    limiter = CountingLimiter()
+
+    summary = s3.sync_s3_folders('s3://bkt/foo', 's3://bkt/copy', recursive=True, limiter=limiter)
+
+    assert summary['copied'] == 3
+    assert sorted(key for key in limiter.keys if key.startswith('copy/') and key != 'copy/') == [
+        'copy/keep.txt', 'copy/orphan.txt', 'copy/sub/orphan.txt'
+    ]
+
+
+@pytest.fixture
+def moto_server(monkeypatch):
+    # Worker processes are spawned, so they reach the mocked S3 through a server rather than in-process patches
+    from moto.server import ThreadedMotoServer
+
+    server = ThreadedMotoServer(port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    monkeypatch.setenv('AWS_ENDPOINT_URL', f'http://{host}:{port}')
+
+    yield boto3.client('s3', region_name='us-east-1')
+
+    server.stop()
+
+
+def test_download_with_processes_feeds_one_pool_per_process(moto_server, tmp_path):
+    moto_server.create_bucket(Bucket='bkt')
+    targets = []
+
+    for number in range(25):
+        moto_server.put_object(Bucket='bkt', Key=f'k{number}', Body=str(number).encode())
+        targets.append(('bkt', f'k{number}', tmp_path / f'k{number}'))
+
+    targets.append(('bkt', 'missing', tmp_path / 'missing'))
+    completed = []
+
+    summary = s3.download_with_processes(
+        targets, processes=2, batch_size=4, concurrency=2, max_retries=0,
+        on_complete=lambda bucket, key, local_path: completed.append(key)
+    )
+
+    assert summary['succeeded'] == 25
+    assert [failure['key'] for failure in summary['failed']] == ['missing']
+    assert sorted(completed) == sorted(f'k{number}' for number in range(25))
+    assert all((tmp_path / f'k{number}').read_text() == str(number) for number in range(25))
+
+
+def overwrite_on_first_get(client, key, body):
+    # Overwrite the object after the download pinned its ETag, as a concurrent writer would
+    writer = boto3.client('s3', region_name='us-east-1')
+    calls = []
+
+    def overwrite(**kwargs):
+        if not calls:
+            writer.put_object(Bucket='bkt', Key=key, Body=body)
+
+        calls.append(kwargs)
+
+    client.meta.events.register('before-call.s3.GetObject', overwrite)
+    return calls
+
+
+def fail_downloads(client, errors):
+    '''Fail the next download of each key with the queued error codes, e.g. {'a': ['SlowDown', 'SlowDown']}.'''
+    calls = []
+
+    def fail(params, **kwargs):
+        calls.append(params['Key'])
+
+        if errors.get(params['Key']):
+            code = errors[params['Key']].pop(0)
+            raise ClientError({'Error': {'Code': code, 'Message': code}}, 'GetObject')
+
+    client.meta.events.register('before-parameter-build.s3.GetObject', fail)
+    return calls
+
+
+def test_fast_download_retries_transient_errors_and_reports_permanent_ones(bucket, tmp_path, no_sleep):
+    calls = fail_downloads(s3.get_transfer_s3_client(10), {'foo/keep.txt': ['SlowDown'], 'other': ['AccessDenied']})
+    results = []
+
+    summary = s3.fast_download_s3_files(
+        [('bkt', key, tmp_path / key) for key in ('foo/keep.txt', 'foo/orphan.txt', 'other')],
+        on_result=results.append
+    )
+
+    assert summary['succeeded'] == 2
+    assert summary['skipped'] == 0
+    assert [(f['key'], f['local_path']) for f in summary['failed']] == [('other', tmp_path / 'other')]
+    assert 'AccessDenied' in summary['failed'][0]['error']
+
+    # The transient error was retried on the next pass, the permanent one was not
+    assert calls.count('foo/keep.txt') == 2
+    assert calls.count('other') == 1
+    assert (tmp_path / 'foo/keep.txt').read_bytes() == b'remote'
+    assert not (tmp_path / 'other').exists()
+    assert sorted((r['key'], r['status']) for r in results) == [
+        ('foo/keep.txt', 'succeeded'), ('foo/orphan.txt', 'succeeded'), ('other', 'failed')
+    ]
+
+
+def test_fast_download_reports_transient_errors_after_exhausting_retries(bucket, tmp_path, no_sleep):
+    calls = fail_downloads(s3.get_transfer_s3_client(10), {'other': ['SlowDown'] * 3})
+
+    summary = s3.fast_download_s3_files([('bkt', 'other', tmp_path / 'other')], max_retries=2)
+
+    assert summary['succeeded'] == 0
+    assert [f['key'] for f in summary['failed']] == ['other']
+    assert 'SlowDown' in summary['failed'][0]['error']
+    assert len(calls) == 3
+
+
+def test_download_with_cache_does_not_cache_an_overwritten_object(bucket, tmp_path):
+    cache = ObjectCache(tmp_path / 'cache')
+    old_etag = bucket.head_object(Bucket='bkt', Key='other')['ETag']
+    calls = overwrite_on_first_get(bucket, 'other', b'updated')
+
+    s3.download(bucket, s3.S3Uri('s3://bkt/other'), tmp_path / 'other', cache=cache)
+    new_etag = bucket.head_object(Bucket='bkt', Key='other')['ETag']
+
+    assert len(calls) == 2
+    assert (tmp_path / 'other').read_bytes() == b'updated'
+    assert not cache.has('bkt', 'other', old_etag)
+    assert cache.get('bkt', 'other', new_etag).read_bytes() == b'updated'
+
+
+def test_fast_download_treats_a_stale_etag_as_a_cache_miss(bucket, tmp_path):
+    cache = ObjectCache(tmp_path / 'cache')
+    old_etag = bucket.head_object(Bucket='bkt', Key='other')['ETag']
+    bucket.put_object(Bucket='bkt', Key='other', Body=b'updated')
+
+    summary = s3.fast_download_s3_files(
+        [('bkt', 'other', tmp_path / 'other', 7, old_etag)], cache=cache, concurrency=1
+    )
+
+    assert summary == {'succeeded': 1, 'skipped': 0, 'failed': []}
+    assert (tmp_path / 'other').read_bytes() == b'updated'
+    assert not cache.has('bkt', 'other', old_etag)
+
+
+@pytest.mark.parametrize('recursive, remaining', [
+    (False, {'copy/keep.txt', 'copy/sub/stale.txt', 'copyrest/x'}),
+    (True, {'copy/keep.txt', 'copyrest/x'}),
+])
+def test_sync_s3_folders_only_deletes_orphans_inside_the_destination(bucket, recursive, remaining):
+    for key in ['copy/keep.txt', 'copy/stale.txt', 'copy/sub/stale.txt', 'copyrest/x']:
+        bucket.put_object(Bucket='bkt', Key=key, Body=b'old')
+
+    bucket.delete_object(Bucket='bkt', Key='foo/orphan.txt')
+    bucket.delete_object(Bucket='bkt', Key='foo/sub/orphan.txt')
+
+    summary = s3.sync_s3_folders('s3://bkt/foo', 's3://bkt/copy', recursive=recursive, delete=True)
+
+    assert summary['copied'] == 1
+    assert summary['failed'] == []
+    assert {key for key in keys(bucket) if key.startswith('copy')} == remaining
+    assert bucket.get_object(Bucket='bkt', Key='copy/keep.txt')['Body'].read() == b'remote'
+
+
+def test_fast_copy_reports_lookup_timeouts_per_target(bucket):
+    def time_out(params, **kwargs):
+        if params['Key'] == 'foo/orphan.txt':
+            raise ReadTimeoutError(endpoint_url='https://s3.amazonaws.com')
+
+    s3.get_transfer_s3_client(10).meta.events.register('before-parameter-build.s3.HeadObject', time_out)
+
+    summary = s3.fast_copy_s3_objects([
+        ('bkt', 'foo/keep.txt', 'bkt', 'copy/keep.txt'),
+        ('bkt', 'foo/orphan.txt', 'bkt', 'copy/orphan.txt'),
+    ])
+
+    assert summary['succeeded'] == 1
+    assert [failure['key'] for failure in summary['failed']] == ['copy/orphan.txt']
+    assert 'copy/keep.txt' in keys(bucket)
+
+
+def test_fast_copy_aborts_unfinished_multipart_copies_when_interrupted(bucket):
+    bucket.put_object(Bucket='bkt', Key='big', Body=b'x' * 12)
+
+    def deny(**kwargs):
+        raise ClientError({'Error': {'Code': 'AccessDenied', 'Message': 'denied'}}, 'UploadPartCopy')
+
+    s3.get_transfer_s3_client(10).meta.events.register('before-parameter-build.s3.UploadPartCopy', deny)
+
+    def targets():
+        yield ('bkt', 'big', 'bkt', 'copy/big')
+        raise RuntimeError('listing failed')
+
+    with pytest.raises(RuntimeError):
+        s3.fast_copy_s3_objects(targets(), multipart_threshold=5, part_size=5)
+
+    assert bucket.list_multipart_uploads(Bucket='bkt').get('Uploads', []) == []
+    assert 'copy/big' not in keys(bucket)
+
+
+@pytest.mark.parametrize('option', [
+    ['--direction', 'up'], ['--max-bandwidth', '10'], ['--processes', '2'], ['--engine', 'asyncio']
+])
+def test_sync_cmd_rejects_local_only_options_for_s3_destinations(bucket, option):
+    result = CliRunner().invoke(s3.s3_group, ['sync', *option, 's3://bkt/foo', 's3://bkt/copy'], obj={})
+
+    assert isinstance(result.exception, UserWarning)
+    assert 'copy/keep.txt' not in keys(bucket)
+
+
+def test_sync_cmd_requires_an_existing_local_directory_to_upload(bucket, tmp_path):
+    file_path = tmp_path / 'file'
+    file_path.write_text('x')
+
+    for local_path in [tmp_path / 'missing', file_path]:
+        result = CliRunner().invoke(
+            s3.s3_group, ['sync', '--direction', 'up', 's3://bkt/foo', str(local_path)], obj={}
+        )
+
+        assert result.exit_code == 2
+
+
+class ReferenceS3Uri:
+    '''The urlparse-based S3Uri that the value type replaced, kept to check that every attribute is unchanged.'''
+
+    def __init__(self, s3_uri):
+        self.s3_uri = str(s3_uri)
+        self.parsed_uri = urlparse(self.s3_uri)
+        self.bucket = self.parsed_uri.netloc
+        self.path = self.parsed_uri.path.lstrip('/')
+        self.path_list = self.path.split('/')
+        self.filename = self.path_list[-1]
+        self.key = self.path
+
+    def parent(self):
+        return ReferenceS3Uri(f's3://{self.bucket}/{"/".join(self.path_list[:-1])}')
+
+    def __truediv__(self, other):
+        other = other.as_posix() if isinstance(other, Path) else str(other)
+        return ReferenceS3Uri(self.s3_uri.rstrip('/') + '/' + other)
+
+
+URIS = [
+    's3://bkt', 's3://bkt/', 's3://bkt/key', 's3://bkt/a/b/c.txt', 's3://bkt/folder/', 's3://bkt//double//slash',
+    's3://bkt/with space/ü.txt', 's3://bkt/a?versionId=1', 's3://bkt/a#fragment', 's3://bkt:1234/key',
+    'S3://BKT/Key', 'bkt/key', '/key', '', 's3:///key'
+]
+
+SEGMENTS = ['x', 'x/y', '/x', 'x/', '', 'q?x', Path('p/q')]
+
+
+def assert_same(uri, reference):
+    assert str(uri) == reference.s3_uri
+    assert uri.s3_uri == reference.s3_uri
+    assert uri.parsed_uri == reference.parsed_uri
+
+    for name in ('bucket', 'path', 'key', 'path_list', 'filename'):
+        assert getattr(uri, name) == getattr(reference, name), name
+
+
+@pytest.mark.parametrize('value', URIS)
+def test_s3uri_matches_the_urlparse_implementation(value):
+    uri, reference = s3.S3Uri(value), ReferenceS3Uri(value)
+
+    assert_same(uri, reference)
+    assert_same(uri.parent(), reference.parent())
+    assert_same(s3.S3Uri(uri), reference)
+
+    for segment in SEGMENTS:
+        assert_same(uri / segment, reference / segment)
+
+
+def test_s3uri_is_a_value_type():
+    uri = s3.S3Uri('s3://bkt/a/b')
+
+    assert uri == s3.S3Uri('s3://bkt/a') / 'b' == s3.S3Uri('s3://bkt//a/b')
+    assert len({uri, s3.S3Uri('s3://bkt/a/b'), uri.parent()}) == 2
+    first, second = s3.S3Uri('s3://a/z'), s3.S3Uri('s3://b/a')
+    assert sorted([second, first, uri]) == [first, second, uri]
+    assert pickle.loads(pickle.dumps(uri)) == uri
+
+    with pytest.raises(AttributeError):
+        uri.bucket = 'other'
@@ -0,0 +1,30 @@
+import os
+
+from botobuddy.s3cache import ObjectCache
+
+
+def test_put_does_not_share_the_downloaded_file(tmp_path):
+    cache = ObjectCache(tmp_path / 'cache')
+    source = tmp_path / 'file'
+    source.write_bytes(b'original')
+
+    entry = cache.put('bkt', 'key', '"etag"', source)
+    source.write_bytes(b'modified')
+
+    assert entry.read_bytes() == b'original'
+    assert os.stat(entry).st_ino != os.stat(source).st_ino
+
+
+def test_fetch_copies_unless_hardlinks_are_enabled(tmp_path):
+    cache = ObjectCache(tmp_path / 'cache')
+    source = tmp_path / 'file'
+    source.write_bytes(b'original')
+    entry = cache.put('bkt', 'key', '"etag"', source)
+
+    target = tmp_path / 'target'
+    assert cache.fetch('bkt', 'key', '"etag"', target)
+    target.write_bytes(b'modified')
+
+    assert entry.read_bytes() == b'original'
+    assert not cache.fetch('bkt', 'key', '"other"', tmp_path / 'missing')
+    assert (cache.hits, cache.misses) == (1, 1)
@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from botobuddy import s3, sagemaker
+
+
+@pytest.fixture
+def labeling_job(monkeypatch):
+    with mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket='bkt')
+
+        for name in ('a', 'b'):
+            client.put_object(Bucket='bkt', Key=f'job/annotations/worker-response/{name}.json', Body=b'{}')
+
+        output = {'OutputDatasetS3Uri': 's3://bkt/job/manifests/output/output.manifest'}
+        job = SimpleNamespace(
+            describe_labeling_job=lambda **kwargs: {'LabelingJobStatus': 'Completed', 'LabelingJobOutput': output}
+        )
+        monkeypatch.setattr(sagemaker, 'get_sagemaker_client', lambda *args, **kwargs: job)
+
+        yield client
+
+
+def test_analyse_human_effort_raises_when_worker_responses_fail_to_download(labeling_job, tmp_path):
+    def deny(params, **kwargs):
+        if params['Key'].endswith('b.json'):
+            raise ClientError({'Error': {'Code': 'AccessDenied', 'Message': 'denied'}}, 'GetObject')
+
+    s3.get_transfer_s3_client(10).meta.events.register('before-parameter-build.s3.GetObject', deny)
+
+    with pytest.raises(UserWarning, match='Failed to download 1 worker responses'):
+        sagemaker.analyse_human_effort('job', tmp_path)
+
+    assert (tmp_path / 'metadata/job/human-effort/annotations/worker-response/a.json').exists()
@@ -0,0 +1,104 @@
+import json
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from botocore.stub import Stubber
+from moto import mock_aws
+
+from botobuddy import secman
+
+
+@pytest.fixture
+def secrets():
+    with mock_aws():
+        secman.clear_secret_cache()
+        client = boto3.client('secretsmanager')
+
+        for number in range(25):
+            client.create_secret(Name=f'app/s{number}', SecretString=json.dumps({'number': number, 'tags': []}))
+
+        client.create_secret(Name='app/plain', SecretString='not json')
+
+        yield client
+
+        secman.clear_secret_cache()
+
+
+def count_calls(client, operation):
+    calls = []
+    client.meta.events.register(f'before-call.secretsmanager.{operation}', lambda **kwargs: calls.append(kwargs))
+    return calls
+
+
+def test_get_sm_secrets_batches_and_caches(secrets):
+    names = [f'app/s{number}' for number in range(25)]
+    calls = count_calls(secrets, 'BatchGetSecretValue')
+
+    values = secman.get_sm_secrets(names, sm_client=secrets)
+
+    assert values == {name: {'number': number, 'tags': []} for number, name in enumerate(names)}
+    assert len(calls) == 2
+
+    assert secman.get_sm_secret('app/s3', sm_client=secrets) == {'number': 3, 'tags': []}
+    assert secman.get_sm_secret('app/plain', plain=True, sm_client=secrets) == 'not json'
+    assert len(calls) == 3
+
+
+def test_get_sm_secret_returns_a_copy_of_the_cached_value(secrets):
+    secman.get_sm_secret('app/s1', sm_client=secrets)['tags'].append('modified')
+
+    assert secman.get_sm_secret('app/s1', sm_client=secrets) == {'number': 1, 'tags': []}
+
+
+OTHER_ARN = 'arn:aws:secretsmanager:us-east-1:210987654321:secret:app/s1'
+
+
+def test_get_sm_secrets_cache_is_scoped_to_the_client(secrets):
+    other = boto3.client('secretsmanager')
+
+    with Stubber(other) as stubber:
+        stubber.add_response(
+            'batch_get_secret_value',
+            {'SecretValues': [{'ARN': OTHER_ARN, 'Name': 'app/s1', 'SecretString': '{"number": -1}'}]},
+            {'SecretIdList': ['app/s1']}
+        )
+
+        assert secman.get_sm_secret('app/s1', sm_client=secrets)['number'] == 1
+        assert secman.get_sm_secret('app/s1', sm_client=other)['number'] == -1
+
+
+def deny_batch_get(client):
+    def deny(**kwargs):
+        raise ClientError({'Error': {'Code': 'AccessDeniedException', 'Message': 'denied'}}, 'BatchGetSecretValue')
+
+    client.meta.events.register('before-call.secretsmanager.BatchGetSecretValue', deny)
+
+
+def test_get_sm_secrets_falls_back_without_the_batch_permission(secrets):
+    deny_batch_get(secrets)
+    calls = count_calls(secrets, 'GetSecretValue')
+
+    values = secman.get_sm_secrets(['app/s1', 'app/s2'], sm_client=secrets)
+
+    assert values == {'app/s1': {'number': 1, 'tags': []}, 'app/s2': {'number': 2, 'tags': []}}
+    assert len(calls) == 2
+
+
+def test_refresh_loader_is_bounded_by_the_callers_concurrency(secrets, monkeypatch):
+    deny_batch_get(secrets)
+    workers = []
+    executor = secman.ThreadPoolExecutor
+
+    def recording_executor(max_workers, **kwargs):
+        workers.append(max_workers)
+        return executor(max_workers, **kwargs)
+
+    monkeypatch.setattr(secman, 'ThreadPoolExecutor', recording_executor)
+    scope = secman._cache_scope(secrets)
+    load = secman._loader(secrets, scope, 'AWSCURRENT', 3)
+
+    loaded = load([(scope, f'app/s{number}', 'AWSCURRENT') for number in range(10)])
+
+    assert len(loaded) == 10
+    assert workers == [3]
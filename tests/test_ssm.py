@@ -0,0 +1,68 @@
+import boto3
+import pytest
+from botocore.stub import Stubber
+from moto import mock_aws
+
+from botobuddy import ssm
+
+
+@pytest.fixture
+def parameters():
+    with mock_aws():
+        ssm.clear_ssm_cache()
+        client = boto3.client('ssm')
+
+        for number in range(15):
+            client.put_parameter(Name=f'/app/p{number}', Value=f'v{number}', Type='String')
+
+        client.put_parameter(Name='/app/nested/secret', Value='s3cr3t', Type='SecureString')
+
+        yield client
+
+        ssm.clear_ssm_cache()
+
+
+def count_calls(client, operation):
+    calls = []
+    client.meta.events.register(f'before-call.ssm.{operation}', lambda **kwargs: calls.append(kwargs))
+    return calls
+
+
+def test_get_ssm_parameters_batches_and_caches(parameters):
+    names = [f'/app/p{number}' for number in range(15)]
+    calls = count_calls(parameters, 'GetParameters')
+
+    assert ssm.get_ssm_parameters(names, ssm_client=parameters) == {name: f'v{name[6:]}' for name in names}
+    assert len(calls) == 2
+
+    assert ssm.get_ssm_parameters(names[:3], ssm_client=parameters) == {name: f'v{name[6:]}' for name in names[:3]}
+    assert len(calls) == 2
+
+
+def test_get_ssm_parameters_raises_on_missing_names(parameters):
+    with pytest.raises(UserWarning, match='/app/missing'):
+        ssm.get_ssm_parameters(['/app/p1', '/app/missing'], ssm_client=parameters)
+
+
+def test_get_ssm_parameters_cache_is_scoped_to_the_client(parameters):
+    # Same region and configuration, but e.g. credentials of another account
+    other = boto3.client('ssm')
+
+    with Stubber(other) as stubber:
+        stubber.add_response(
+            'get_parameters',
+            {'Parameters': [{'Name': '/app/p1', 'Value': 'other account'}]},
+            {'Names': ['/app/p1'], 'WithDecryption': True}
+        )
+
+        assert ssm.get_ssm_parameters(['/app/p1'], ssm_client=parameters) == {'/app/p1': 'v1'}
+        assert ssm.get_ssm_parameters(['/app/p1'], ssm_client=other) == {'/app/p1': 'other account'}
+
+
+def test_get_ssm_parameters_by_path(parameters):
+    flat = ssm.get_ssm_parameters_by_path('/app/', ssm_client=parameters, recursive=False)
+    nested = ssm.get_ssm_parameters_by_path('/app/', ssm_client=parameters)
+
+    assert len(flat) == 15
+    assert nested['/app/nested/secret'] == 's3cr3t'
+    assert len(nested) == 16
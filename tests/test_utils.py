@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+
+from botobuddy import utils
+from botobuddy.utils import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(utils.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_ttl_cache_serves_fresh_then_stale_then_missing(clock):
+    cache = TTLCache()
+    cache.put('key', 'value')
+
+    clock[0] += 5
+    assert cache.get('key', ttl=10, stale_ttl=10) == ('value', 'fresh')
+
+    clock[0] += 10
+    assert cache.get('key', ttl=10, stale_ttl=10) == ('value', 'stale')
+    assert cache.get('key', ttl=30) == ('value', 'fresh')
+
+    clock[0] += 10
+    assert cache.get('key', ttl=10, stale_ttl=10) == (None, 'missing')
+    assert cache.get('key', ttl=100) == (None, 'missing')
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_the_least_recently_stored_entries():
+    cache = TTLCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.put('a', 3)
+    cache.put('c', 4)
+
+    assert len(cache) == 2
+    assert cache.get('b', ttl=60) == (None, 'missing')
+    assert cache.get('a', ttl=60) == (3, 'fresh')
+
+
+def test_ttl_cache_refreshes_each_key_once_at_a_time(clock):
+    cache = TTLCache()
+    cache.put('a', 'old')
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def loader(keys):
+        calls.append(keys)
+        started.set()
+        release.wait(5)
+        return {key: 'new' for key in keys}
+
+    future = cache.refresh(['a', 'b'], loader)
+    started.wait(5)
+
+    assert cache.refresh(['a'], loader) is None
+    assert cache.get('a', ttl=60) == ('old', 'fresh')
+
+    release.set()
+    future.result()
+
+    assert calls == [['a', 'b']]
+    assert cache.get('a', ttl=60) == ('new', 'fresh')
+    assert cache.refresh(['a'], lambda keys: {}) is not None
+
+
+def test_ttl_cache_keeps_entries_when_a_refresh_fails():
+    cache = TTLCache()
+    cache.put('a', 'old')
+
+    def loader(keys):
+        raise RuntimeError('boom')
+
+    cache.refresh(['a'], loader).result()
+
+    assert cache.get('a', ttl=60) == ('old', 'fresh')